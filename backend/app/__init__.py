@@ -28,4 +28,8 @@ def create_app():
     app.register_blueprint(upload_bp, url_prefix='/api')
     app.register_blueprint(detection_bp, url_prefix='/api')
     
+    # Maintenance commands (flask rebuild-stats, ...)
+    from .cli import register_commands
+    register_commands(app)
+    
     return app
\ No newline at end of file
@@ -1,100 +1,336 @@
 import os
 import time
-import cv2
-import numpy as np
-from flask import Blueprint, jsonify, current_app, send_file, request
-from PIL import Image
-import io
+import json
 import base64
-from datetime import datetime
+import binascii
+import uuid
+import zipfile
+import pytz
+from contextlib import contextmanager, nullcontext
+from flask import Blueprint, jsonify, current_app, send_file, request, url_for, Response, stream_with_context
+from werkzeug.utils import secure_filename
+from datetime import datetime, timedelta
 from ..config.database import db
 from ..models.detection import Detection
-from ..utils.yolo_detector import YOLODetector
+from ..models.detection_stats import read_detection_stats
+from ..models.detection_box import DetectionBox
+from ..models.detection_rollup import BUCKETS, detection_trend
+from ..utils.detector_service import create_detector_service
+from ..utils.batch_engine import BatchInferenceEngine
+from ..utils.job_queue import DetectionJobQueue, worker_id
+from ..utils.frame_pipeline import process_frame, decode_frame, encode_frame
+from ..utils.live_state import LiveStreamRegistry, create_frame_store
+from ..utils.ingest_controller import IngestController
+from ..utils.change_detector import ChangeDetector
+from ..utils.result_cache import DetectionResultCache, file_sha256, make_cache_key
+from ..utils.image_writer import BackgroundImageWriter
+from ..utils.image_store import get_image_store
+from ..utils.image_derivatives import create_derivative_cache
+from ..utils.image_ingest import ImageRejected, check_image, read_body, upload_buffer
+from .upload import allowed_file, IMAGE_MAX_PIXELS
 
 detection_bp = Blueprint('detection', __name__)
 
-# Initialize YOLO detector globally
+# YOLO detector, loaded and warmed up on first use rather than at import time
 model_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'best.pt')
-detector = YOLODetector(model_path)
+DETECTION_MAX_BATCH_SIZE = int(os.getenv('DETECTION_MAX_BATCH_SIZE', 8))
+detector_service = create_detector_service(model_path, warmup_batch=DETECTION_MAX_BATCH_SIZE)
 
-# Global variable to store latest detection results for live stream
-latest_detection_results = {
-    'timestamp': 0,
-    'detections': [],
-    'processed_image': None,
-    'object_count': 0,
-    'raw_image': None  # Store raw image for capture
-}
+def get_detector():
+    """The process's YOLODetector (blocks while it is being loaded)"""
+    return detector_service.get()
+
+# Frames from several ESP32-CAM units are grouped into one forward pass
+inference_engine = BatchInferenceEngine(
+    detector_service,
+    max_batch_size=DETECTION_MAX_BATCH_SIZE,
+    batch_window=float(os.getenv('DETECTION_BATCH_WINDOW_MS', 10)) / 1000
+)
+INFERENCE_TIMEOUT = float(os.getenv('DETECTION_INFERENCE_TIMEOUT', 30))
+
+def detect_frame(frame):
+    """Run one decoded BGR frame through the batch engine"""
+    return inference_engine.detect(frame, timeout=INFERENCE_TIMEOUT)
+
+# Originals and results are stored once per content hash (IMAGE_STORE_BACKEND)
+image_store = get_image_store()
+
+# Thumbnail / medium copies for browsing history, cached on disk
+image_derivatives = create_derivative_cache(image_store)
+IMAGE_MAX_AGE = 365 * 24 * 3600
+
+# Results of uploaded images, keyed by content hash + model weights/thresholds
+result_cache = DetectionResultCache(
+    max_entries=int(os.getenv('DETECTION_CACHE_SIZE', 256)),
+    disk_dir=os.getenv('DETECTION_CACHE_DIR') or None,
+    exists=image_store.exists
+)
+
+def detection_cache_key(image_ref):
+    """Result cache key for a stored image, or None when results must not be cached"""
+    identity = get_detector().model_identity()
+    if identity is None:
+        return None
+    # Store keys already carry the content hash; legacy paths are hashed from disk
+    content_hash = image_store.content_hash(image_ref)
+    if content_hash is None:
+        if not image_store.exists(image_ref):
+            return None
+        content_hash = file_sha256(image_ref)
+    return make_cache_key(content_hash, identity)
+
+# Originals and annotated results are written to the image store off the request thread
+image_writer = BackgroundImageWriter(
+    max_queue=int(os.getenv('IMAGE_WRITER_QUEUE', 64)),
+    workers=int(os.getenv('IMAGE_WRITER_THREADS', 2))
+)
+
+IMAGE_WRITE_WAIT = float(os.getenv('IMAGE_WRITE_WAIT', 10))
+
+def persist_image(detection_id, column, data=None, image=None, on_written=None):
+    """
+    Store an image in the background, set its storage key on the Detection
+    row once the object is in place and render its thumbnail/medium copies
+    Args:
+        column: 'original_path' or 'result_path'
+        data: Encoded image bytes, or image: BGR ndarray to encode as JPEG
+        on_written: Optional callable run as on_written(key) after the row was updated
+    """
+    app = current_app._get_current_object()
+    
+    def on_done(key, error):
+        if error is not None:
+            return
+        with app.app_context():
+            Detection.query.filter_by(id=detection_id).update({column: key})
+            db.session.commit()
+        if on_written is not None:
+            on_written(key)
+        try:
+            image_derivatives.generate(key, image=image, data=data)
+        except Exception as e:
+            print(f"Could not create derivatives of {key}: {e}")
+    
+    image_writer.submit(data=data, image=image, on_done=on_done, key=(detection_id, column), store=image_store)
+
+def wait_for_image(detection, column):
+    """
+    Local file of a detection's image, waiting for its background write if it is still pending
+    Returns:
+        str: The file path, or None if the image is not available
+    """
+    ref = getattr(detection, column)
+    if image_store.exists(ref):
+        return image_store.local_path(ref)
+    if image_writer.wait((detection.id, column), IMAGE_WRITE_WAIT):
+        db.session.refresh(detection)
+    ref = getattr(detection, column)
+    return image_store.local_path(ref) if image_store.exists(ref) else None
+
+def send_image(detection, column):
+    """
+    send_file a detection's image, ?size=thumb|medium for a downscaled copy.
+    URLs carrying the current version (?v=<content hash>) never change and are
+    cached for a year; others revalidate against the ETag.
+    Returns:
+        Response, or None if the image is not available
+    """
+    path = wait_for_image(detection, column)
+    if not path:
+        return None
+    
+    ref = getattr(detection, column)
+    version = image_derivatives.version(ref)
+    size = request.args.get('size', 'full')
+    if size != 'full':
+        path = image_derivatives.get(ref, size)
+    
+    response = send_file(path, etag=f"{version}-{size}", conditional=True)
+    if request.args.get('v') == version:
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = IMAGE_MAX_AGE
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
+    return response
+
+# Uploaded images are detected by a process pool (0 workers = run inline)
+job_queue = DetectionJobQueue(
+    model_path,
+    max_workers=int(os.getenv('DETECTION_JOB_WORKERS', 2)),
+    result_cache=result_cache,
+    lease=float(os.getenv('DETECTION_JOB_LEASE', 3600))
+)
+MAX_JOB_WAIT = float(os.getenv('DETECTION_JOB_MAX_WAIT', 30))
+
+# Limits for /detect/bulk (whole roast batches in one request)
+BULK_MAX_FILES = int(os.getenv('BULK_MAX_FILES', 1000))
+BULK_MAX_CONTENT_LENGTH = int(os.getenv('BULK_MAX_CONTENT_MB', 512)) * 1024 * 1024
+# Per-image size limit when the app does not set MAX_CONTENT_LENGTH (run.py)
+DEFAULT_IMAGE_MAX_BYTES = 16 * 1024 * 1024
+
+# Per-camera live-stream results, shared by the ESP32 POST handler and all viewers.
+# LIVE_STATE_BACKEND=redis shares the latest frames between worker processes.
+LIVE_STREAM_HISTORY = int(os.getenv('LIVE_STREAM_HISTORY', 10))
+live_state = LiveStreamRegistry(
+    history_size=LIVE_STREAM_HISTORY,
+    store=create_frame_store(
+        os.getenv('LIVE_STATE_BACKEND', 'memory'),
+        LIVE_STREAM_HISTORY,
+        os.getenv('LIVE_STATE_REDIS_URL')
+    )
+)
+STREAM_KEEPALIVE = float(os.getenv('LIVE_STREAM_KEEPALIVE', 15))
+
+# Backpressure: one frame in flight and one waiting per camera
+ingest_controller = IngestController(
+    max_wait=float(os.getenv('LIVE_STREAM_MAX_WAIT', 5)),
+    max_fps=float(os.getenv('LIVE_STREAM_MAX_FPS', 10)),
+    utilization=float(os.getenv('LIVE_STREAM_TARGET_LOAD', 0.5))
+)
+
+# Static scenes (beans resting on a tray) reuse the previous detections
+change_detector = ChangeDetector(
+    threshold=float(os.getenv('LIVE_STREAM_CHANGE_THRESHOLD', 3.0)),
+    max_reuse_age=float(os.getenv('LIVE_STREAM_MAX_REUSE_SECONDS', 10))
+)
+
+def _with_pacing_headers(response, camera_id):
+    """Tell the camera how fast it should send frames"""
+    hint = ingest_controller.hint(camera_id)
+    if hint['target_fps'] is not None:
+        response.headers['X-Target-FPS'] = str(hint['target_fps'])
+    if response.status_code == 429:
+        response.headers['Retry-After'] = str(hint['retry_after'])
+    return response
+
+def get_camera_id(default=None):
+    """Camera id from ?camera_id=, the JSON body, a 'camera_id' form field or the X-Camera-Id header"""
+    body = request.get_json(silent=True) if request.is_json else None
+    return (request.args.get('camera_id')
+            or (body or {}).get('camera_id')
+            or request.form.get('camera_id')
+            or request.headers.get('X-Camera-Id')
+            or default)
+
+def get_datetime_arg(name):
+    """
+    Parse an ISO 8601 query argument as naive UTC, like the stored timestamps;
+    raises ValueError when it is malformed
+    """
+    value = request.args.get(name)
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    return parsed.astimezone(pytz.utc).replace(tzinfo=None) if parsed.tzinfo else parsed
+
+# Camera frames: the only formats the ESP32 / browser capture send
+FRAME_FORMATS = ('jpeg', 'png')
+
+def max_image_bytes():
+    """Size limit of one image: the app's MAX_CONTENT_LENGTH, if it sets one"""
+    return current_app.config.get('MAX_CONTENT_LENGTH') or DEFAULT_IMAGE_MAX_BYTES
+
+@contextmanager
+def frame_image():
+    """
+    Encoded frame of the request as a memoryview, checked from its header
+    before it is decoded. Accepts a raw image/jpeg or image/png body (read
+    into one buffer, rejected after its first bytes if bogus) or an 'image'
+    multipart field (used in place from Werkzeug's spooled upload).
+    Raises:
+        ImageRejected: Missing, bogus or oversized image
+    """
+    if request.mimetype in ('image/jpeg', 'image/png'):
+        max_bytes = max_image_bytes()
+        if (request.content_length or 0) > max_bytes:
+            raise ImageRejected(f'Image is too large, maximum is {max_bytes} bytes', 413)
+        buffer, _ = read_body(request.stream, request.content_length, max_bytes, IMAGE_MAX_PIXELS, FRAME_FORMATS)
+        try:
+            yield buffer
+        finally:
+            buffer.release()
+        return
+    
+    if 'image' not in request.files:
+        raise ImageRejected('No image file provided')
+    file = request.files['image']
+    if file.filename == '':
+        raise ImageRejected('No image file selected')
+    
+    with upload_buffer(file) as buffer:
+        check_image(buffer, IMAGE_MAX_PIXELS, FRAME_FORMATS)
+        yield buffer
 
 @detection_bp.route('/live-stream', methods=['POST'])
 def detect_live_stream():
     """Handle live stream detection from Raspberry Pi"""
     try:
-        if 'image' not in request.files:
-            return jsonify({'success': False, 'error': 'No image file provided'}), 400
-
-        file = request.files['image']
-        if file.filename == '':
-            return jsonify({'success': False, 'error': 'No image file selected'}), 400
-
-        # Read image
-        image_bytes = file.read()
-        image = Image.open(io.BytesIO(image_bytes))
-        
-        # Convert PIL image to OpenCV format
-        cv_image = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
+        # Each ESP32 is tracked separately, identified by its id or IP address
+        camera_id = get_camera_id(request.remote_addr)
         
-        # Perform detection
-        start_time = time.time()
-        results = detector.detect_image(image)
-        processing_time = time.time() - start_time
-        
-        # Draw bounding boxes on image
-        annotated_image = cv_image.copy()
-        detection_count = 0
-        
-        for detection in results.get('detections', []):
-            x, y, w, h = int(detection['x']), int(detection['y']), int(detection['width']), int(detection['height'])
-            label = detection['label']
-            confidence = detection['confidence']
-            
-            # Draw bounding box
-            cv2.rectangle(annotated_image, (x, y), (x + w, y + h), (0, 255, 0), 2)
-            
-            # Draw label
-            label_text = f"{label}: {confidence:.2f}"
-            label_size = cv2.getTextSize(label_text, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 2)[0]
-            cv2.rectangle(annotated_image, (x, y - label_size[1] - 10), 
-                         (x + label_size[0], y), (0, 255, 0), -1)
-            cv2.putText(annotated_image, label_text, (x, y - 5), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 0), 2)
+        # Decoded straight from the request buffer, which is released afterwards
+        with frame_image() as image_bytes:
+            # Keep only the newest pending frame per camera; stale ones are dropped
+            ticket = ingest_controller.admit(camera_id)
+            if not ingest_controller.wait(camera_id, ticket):
+                response = jsonify({
+                    'success': False,
+                    'dropped': True,
+                    'error': 'Frame dropped, a newer frame from this camera is queued',
+                    'camera_id': camera_id
+                })
+                response.status_code = 429
+                return _with_pacing_headers(response, camera_id)
             
-            detection_count += 1
-        
-        # Update global detection results
-        global latest_detection_results
-        latest_detection_results = {
-            'timestamp': time.time(),
-            'detections': results.get('detections', []),
-            'processed_image': annotated_image,
-            'raw_image': cv_image,  # Store raw image for capture
-            'object_count': detection_count,
-            'processing_time': processing_time
-        }
-        
-        # Convert annotated image to base64 for response
-        _, buffer = cv2.imencode('.jpg', annotated_image)
-        img_base64 = base64.b64encode(buffer).decode('utf-8')
+            inference_time = None
+            try:
+                # Decode once to BGR, detect and annotate in place.
+                # JPEG encoding is left to the first viewer that asks for the frame.
+                include_image = request.args.get('include_image', '0') == '1'
+                frame = process_frame(
+                    image_bytes,
+                    lambda image: change_detector.detect(camera_id, image, detect_frame),
+                    encode=include_image
+                )
+                # Only real model time feeds the pacing hint, reused results took none
+                inference_time = None if frame['reused'] else frame['processing_time']
+                
+                # Publish to the shared live-stream buffer
+                published = live_state.publish(
+                    camera_id,
+                    timestamp=time.time(),
+                    detections=frame['detections'],
+                    processed_image=frame['processed_image'],
+                    annotated_jpeg=frame['annotated_jpeg'],
+                    raw_jpeg=frame['raw_jpeg'],  # Original camera JPEG, saved as-is on capture
+                    object_count=frame['object_count'],
+                    processing_time=frame['processing_time']
+                )
+            finally:
+                ingest_controller.release(camera_id, inference_time)
         
-        return jsonify({
+        response = {
             'success': True,
-            'detections': results.get('detections', []),
-            'object_count': detection_count,
-            'processing_time': processing_time,
-            'annotated_image': img_base64,
+            'detections': frame['detections'],
+            'object_count': frame['object_count'],
+            'processing_time': frame['processing_time'],
+            'timings': frame['timings'],
+            'inference_skipped': frame['reused'],
+            'camera_id': camera_id,
+            'version': published.version,
             'timestamp': time.time()
-        }), 200
+        }
+        
+        # Cameras do not need the annotated frame back; viewers use /live-stream/mjpeg
+        if include_image:
+            response['annotated_image'] = frame['annotated_base64']
+        
+        return _with_pacing_headers(jsonify(response), camera_id)
 
+    except ImageRejected as e:
+        return jsonify({'success': False, 'error': str(e)}), e.status_code
     except Exception as e:
         return jsonify({'success': False, 'error': f'Detection failed: {str(e)}'}), 500
 
@@ -102,59 +338,54 @@ def detect_live_stream():
 def capture_live_stream():
     """Capture and save current live stream frame with detections"""
     try:
-        global latest_detection_results
+        camera_id = get_camera_id()
+        version = request.args.get('version', type=int)
+        
+        # A specific recent frame from the camera's ring buffer, or its latest one
+        latest = live_state.frame(camera_id, version) if version else live_state.latest(camera_id)
         
-        if latest_detection_results['timestamp'] == 0:
+        if latest is None:
             return jsonify({
                 'success': False,
                 'error': 'No live stream data available'
             }), 400
         
         # Get the latest processed image with bounding boxes
-        processed_image = latest_detection_results['processed_image']
-        raw_image = latest_detection_results['raw_image']
-        detections = latest_detection_results['detections']
+        annotated_jpeg = latest.jpeg
+        raw_jpeg = latest.raw_jpeg
+        detections = latest.detections
         
-        if processed_image is None or raw_image is None:
+        if annotated_jpeg is None or raw_jpeg is None:
             return jsonify({
                 'success': False,
                 'error': 'No image data available for capture'
             }), 400
         
-        # Generate unique filename
+        # Display name (camera + frame version keep same-second captures apart)
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        original_filename = f"raspi_capture_{timestamp}.jpg"
-        result_filename = f"raspi_capture_{timestamp}_result.jpg"
+        frame_name = f"{timestamp}_{secure_filename(latest.camera_id)}_{latest.version}"
         
-        # Save paths
-        original_path = os.path.join(current_app.config['UPLOAD_FOLDER'], original_filename)
-        result_path = os.path.join(current_app.config['RESULTS_FOLDER'], result_filename)
+        # Storage keys follow from the bytes (and their format), so they are known before the writes finish
+        original_path = image_store.key_for(raw_jpeg)
+        result_path = image_store.key_for(annotated_jpeg)
+        original_filename = f"raspi_capture_{frame_name}.{original_path.rsplit('.', 1)[1]}"
         
-        # Ensure directories exist
-        os.makedirs(os.path.dirname(original_path), exist_ok=True)
-        os.makedirs(os.path.dirname(result_path), exist_ok=True)
-        
-        # Save original image
-        cv2.imwrite(original_path, raw_image)
-        
-        # Save processed image with bounding boxes
-        cv2.imwrite(result_path, processed_image)
-        
-        # Create detection record in database
+        # Create detection record in database; result_path is filled in once the image is stored
         detection_record = Detection(
             filename=original_filename,
             original_path=original_path,
-            result_path=result_path,
-            detections_count=len(detections),
-            confidence_scores=[det['confidence'] for det in detections],
-            detection_classes=[det['label'] for det in detections],
-            processing_time=latest_detection_results.get('processing_time', 0),
-            status='completed'
+            capture_method='live-stream',
+            esp32_ip=latest.camera_id
         )
         
         db.session.add(detection_record)
+        detection_record.apply_results(detections, None, latest.processing_time or 0)
         db.session.commit()
         
+        # Original exactly as the camera sent it, and the annotated frame already encoded for viewers
+        persist_image(detection_record.id, 'original_path', data=raw_jpeg)
+        persist_image(detection_record.id, 'result_path', data=annotated_jpeg)
+        
         return jsonify({
             'success': True,
             'message': 'Live stream frame captured and saved successfully',
@@ -163,7 +394,9 @@ def capture_live_stream():
             'detections': detections,
             'original_path': original_path,
             'result_path': result_path,
-            'timestamp': latest_detection_results['timestamp']
+            'camera_id': latest.camera_id,
+            'version': latest.version,
+            'timestamp': latest.timestamp
         }), 200
         
     except Exception as e:
@@ -190,76 +423,39 @@ def capture_raspi_direct():
         try:
             response = requests.get(capture_url, timeout=10)
             if response.status_code == 200:
-                # Process the captured image
-                image_bytes = response.content
-                image = Image.open(io.BytesIO(image_bytes))
-                
-                # Convert to OpenCV format
-                cv_image = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
-                
-                # Perform detection
-                start_time = time.time()
-                results = detector.detect_image(image)
-                processing_time = time.time() - start_time
-                
-                # Draw bounding boxes
-                annotated_image = cv_image.copy()
-                detection_count = 0
-                
-                for detection in results.get('detections', []):
-                    x, y, w, h = int(detection['x']), int(detection['y']), int(detection['width']), int(detection['height'])
-                    label = detection['label']
-                    confidence = detection['confidence']
-                    
-                    # Draw bounding box
-                    cv2.rectangle(annotated_image, (x, y), (x + w, y + h), (0, 255, 0), 2)
-                    
-                    # Draw label
-                    label_text = f"{label}: {confidence:.2f}"
-                    label_size = cv2.getTextSize(label_text, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 2)[0]
-                    cv2.rectangle(annotated_image, (x, y - label_size[1] - 10), 
-                                 (x + label_size[0], y), (0, 255, 0), -1)
-                    cv2.putText(annotated_image, label_text, (x, y - 5), 
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 0), 2)
-                    
-                    detection_count += 1
+                # Decode once, detect and annotate in place
+                frame = process_frame(response.content, detect_frame, encode=False)
+                detections = frame['detections']
+                processing_time = frame['processing_time']
+                detection_count = frame['object_count']
                 
                 # Save images
                 timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                original_filename = f"raspi_direct_{timestamp}.jpg"
-                result_filename = f"raspi_direct_{timestamp}_result.jpg"
-                
-                original_path = os.path.join(current_app.config['UPLOAD_FOLDER'], original_filename)
-                result_path = os.path.join(current_app.config['RESULTS_FOLDER'], result_filename)
+                original_path = image_store.key_for(frame['raw_jpeg'])
+                original_filename = f"raspi_direct_{timestamp}.{original_path.rsplit('.', 1)[1]}"
                 
-                os.makedirs(os.path.dirname(original_path), exist_ok=True)
-                os.makedirs(os.path.dirname(result_path), exist_ok=True)
-                
-                cv2.imwrite(original_path, cv_image)
-                cv2.imwrite(result_path, annotated_image)
-                
-                # Save to database
+                # Save to database; result_path is filled in once the image is stored
                 detection_record = Detection(
                     filename=original_filename,
-                    original_path=original_path,
-                    result_path=result_path,
-                    detections_count=detection_count,
-                    confidence_scores=[det['confidence'] for det in results.get('detections', [])],
-                    detection_classes=[det['label'] for det in results.get('detections', [])],
-                    processing_time=processing_time,
-                    status='completed'
+                    original_path=original_path
                 )
                 
                 db.session.add(detection_record)
+                detection_record.apply_results(detections, None, processing_time)
                 db.session.commit()
                 
+                # Encoding the annotated frame and both store writes happen off the request thread
+                persist_image(detection_record.id, 'original_path', data=frame['raw_jpeg'])
+                persist_image(detection_record.id, 'result_path', image=frame['processed_image'])
+                
                 return jsonify({
                     'success': True,
                     'message': 'Raspberry Pi frame captured and processed successfully',
                     'detection_id': detection_record.id,
                     'detections_count': detection_count,
-                    'detections': results.get('detections', []),
-                    'processing_time': processing_time
+                    'detections': detections,
+                    'processing_time': processing_time,
+                    'timings': frame['timings']
                 }), 200
                 
             else:
@@ -281,31 +477,41 @@ def capture_raspi_direct():
             'error': f'Direct capture failed: {str(e)}'
         }), 500
 
+def _not_modified(etag):
+    """True if the client already holds this frame (If-None-Match matches its ETag)"""
+    return request.if_none_match.contains(etag)
+
 @detection_bp.route('/live-stream/latest', methods=['GET'])
 def get_latest_detection():
-    """Get latest detection results for live stream"""
+    """Get latest detection results for live stream (?camera_id= selects a camera)"""
     try:
-        global latest_detection_results
+        latest = live_state.latest(get_camera_id())
         
-        if latest_detection_results['timestamp'] == 0:
+        if latest is None:
             return jsonify({
                 'success': False,
                 'message': 'No detection results available'
             }), 404
         
-        # Convert processed image to base64 if available
-        img_base64 = None
-        if latest_detection_results['processed_image'] is not None:
-            _, buffer = cv2.imencode('.jpg', latest_detection_results['processed_image'])
-            img_base64 = base64.b64encode(buffer).decode('utf-8')
+        include_image = request.args.get('include_image', '1') == '1'
+        etag = f"{latest.etag}-{int(include_image)}"
+        if _not_modified(etag):
+            response = Response(status=304)
+        else:
+            response = jsonify({
+                'success': True,
+                'camera_id': latest.camera_id,
+                'version': latest.version,
+                'timestamp': latest.timestamp,
+                'detections': latest.detections,
+                'object_count': latest.object_count,
+                # Encoded once per frame, shared by every poller
+                'annotated_image': latest.base64 if include_image else None
+            })
         
-        return jsonify({
-            'success': True,
-            'timestamp': latest_detection_results['timestamp'],
-            'detections': latest_detection_results['detections'],
-            'object_count': latest_detection_results['object_count'],
-            'annotated_image': img_base64
-        }), 200
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
         
     except Exception as e:
         return jsonify({'success': False, 'error': f'Failed to get latest detection: {str(e)}'}), 500
@@ -314,21 +520,116 @@ def get_latest_detection():
 def get_processed_image():
     """Get the latest processed image with bounding boxes"""
     try:
-        global latest_detection_results
+        latest = live_state.latest(get_camera_id())
         
-        if latest_detection_results['processed_image'] is None:
+        if latest is None or latest.jpeg is None:
             return jsonify({'error': 'No processed image available'}), 404
         
-        # Convert OpenCV image to bytes
-        _, buffer = cv2.imencode('.jpg', latest_detection_results['processed_image'])
-        image_bytes = io.BytesIO(buffer.tobytes())
-        image_bytes.seek(0)
+        if _not_modified(latest.etag):
+            response = Response(status=304)
+        else:
+            response = Response(latest.jpeg, mimetype='image/jpeg')
         
-        return send_file(image_bytes, mimetype='image/jpeg')
+        response.set_etag(latest.etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
         
     except Exception as e:
         return jsonify({'error': f'Failed to get processed image: {str(e)}'}), 500
 
+@detection_bp.route('/live-stream/ingest-stats', methods=['GET'])
+def get_ingest_stats():
+    """Accepted / dropped / processed frame counters per camera, inferences saved by the change gate and result cache hits"""
+    return jsonify({
+        'success': True,
+        'ingest': ingest_controller.stats(),
+        'change_gate': change_detector.stats(),
+        'result_cache': result_cache.stats(),
+        'image_writer': image_writer.stats()
+    }), 200
+
+@detection_bp.route('/live-stream/cameras', methods=['GET'])
+def get_live_cameras():
+    """List cameras that have posted frames, with their latest frame metadata"""
+    try:
+        cameras = []
+        for camera_id in live_state.cameras():
+            latest = live_state.latest(camera_id)
+            if latest is not None:
+                cameras.append(latest.metadata())
+        return jsonify({'success': True, 'cameras': cameras}), 200
+    except Exception as e:
+        return jsonify({'success': False, 'error': f'Failed to list cameras: {str(e)}'}), 500
+
+@detection_bp.route('/live-stream/history', methods=['GET'])
+def get_live_history():
+    """Metadata of a camera's recent frames (ring buffer), newest first"""
+    try:
+        camera_id = get_camera_id()
+        if camera_id is None:
+            latest = live_state.latest()
+            camera_id = latest.camera_id if latest else None
+        return jsonify({
+            'success': True,
+            'camera_id': camera_id,
+            'frames': live_state.history(camera_id) if camera_id else []
+        }), 200
+    except Exception as e:
+        return jsonify({'success': False, 'error': f'Failed to get history: {str(e)}'}), 500
+
+@detection_bp.route('/live-stream/mjpeg', methods=['GET'])
+def stream_processed_mjpeg():
+    """MJPEG (multipart/x-mixed-replace) stream of annotated live-stream frames"""
+    camera_id = get_camera_id()
+    
+    def generate():
+        version = 0
+        while True:
+            latest = live_state.wait_for_update(version, timeout=STREAM_KEEPALIVE, camera_id=camera_id)
+            if latest is None:
+                # No new frame: resend the current one so proxies keep the connection open
+                latest = live_state.latest(camera_id)
+                if latest is None:
+                    continue
+            version = latest.version
+            jpeg = latest.jpeg
+            yield (b'--frame\r\nContent-Type: image/jpeg\r\nContent-Length: '
+                   + str(len(jpeg)).encode() + b'\r\n\r\n' + jpeg + b'\r\n')
+    
+    response = Response(generate(), mimetype='multipart/x-mixed-replace; boundary=frame')
+    response.headers['Cache-Control'] = 'no-cache, no-store'
+    return response
+
+@detection_bp.route('/live-stream/events', methods=['GET'])
+def stream_detection_events():
+    """Server-sent events carrying detection metadata for each new live-stream frame"""
+    last_event_id = request.headers.get('Last-Event-ID', request.args.get('since', 0))
+    try:
+        start_version = int(last_event_id)
+    except ValueError:
+        start_version = 0
+    
+    camera_id = get_camera_id()
+    
+    def generate():
+        version = start_version
+        if version > live_state.current_version(camera_id):
+            # Client id from before a server restart
+            version = 0
+        while True:
+            latest = live_state.wait_for_update(version, timeout=STREAM_KEEPALIVE, camera_id=camera_id)
+            if latest is None:
+                yield ': keepalive\n\n'
+                continue
+            version = latest.version
+            payload = json.dumps(latest.metadata())
+            yield f'id: {version}\nevent: detection\ndata: {payload}\n\n'
+    
+    response = Response(generate(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
 @detection_bp.route('/detect/<int:detection_id>', methods=['POST'])
 def detect_objects(detection_id):
     try:
@@ -337,55 +638,392 @@ def detect_objects(detection_id):
         if detection.status == 'processing':
             return jsonify({'error': 'Detection already in progress'}), 409
         
-        # Update status to processing
-        detection.status = 'processing'
+        # No database connection is held while the image is hashed or the model runs;
+        # the row is re-read in a short transaction for each write
+        image_ref = detection.original_path
+        db.session.commit()
+        
+        # Same image content with the same model: reuse results and annotated image
+        cache_key = detection_cache_key(image_ref)
+        cached = result_cache.get(cache_key) if cache_key else None
+        if cached:
+            detection.apply_results(cached['results']['detections'], cached['result_path'], 0.0)
+            db.session.commit()
+            
+            return jsonify({
+                'success': True,
+                'message': 'Detection served from cache',
+                'cached': True,
+                'detection': detection.to_dict(),
+                'results': cached['results']
+            }), 200
+        
+        # Update status to processing, owned by this process until it finishes
+        detection.start_processing(worker_id())
         db.session.commit()
         
+        if job_queue.enabled:
+            job_queue.enqueue(current_app._get_current_object(), detection_id, image_ref, cache_key)
+            return jsonify({
+                'success': True,
+                'message': 'Detection queued',
+                'job_id': detection_id,
+                'status': 'processing',
+                'status_url': url_for('detection.get_detection_job', detection_id=detection_id)
+            }), 202
+        
         # Perform detection
+        image_path = image_store.local_path(image_ref)
         start_time = time.time()
-        results = detector.detect(detection.original_path)
+        result = get_detector().detect(image_path)
         processing_time = time.time() - start_time
         
-        # Generate result filename
-        result_filename = f"result_{detection_id}_{int(time.time())}.jpg"
-        result_path = os.path.join(current_app.config['RESULTS_FOLDER'], result_filename)
+        # Encoded here so the response can name the result key; the store write happens in the background
+        annotated = encode_frame(get_detector().render_results(image_path, result))
+        result_path = image_store.key_for(annotated)
         
-        # Save annotated image
-        detector.save_results(detection.original_path, result_path, results)
+        # Update detection record; result_path is set once the image is stored
+        results = result.to_dict()
+        detection.apply_results(results['detections'], None, processing_time)
+        db.session.commit()
         
-        # Update detection record
-        detection.result_path = result_path
-        detection.detections_count = len(results.get('detections', []))
-        detection.confidence_scores = results.get('confidence_scores', [])
-        detection.detection_classes = results.get('classes', [])
-        detection.processing_time = processing_time
-        detection.status = 'completed'
+        on_written = (lambda key: result_cache.put(cache_key, results, key)) if cache_key else None
+        persist_image(detection_id, 'result_path', data=annotated, on_written=on_written)
         
-        db.session.commit()
+        detection_data = detection.to_dict()
+        detection_data['result_path'] = result_path
         
         return jsonify({
             'success': True,
             'message': 'Detection completed successfully',
-            'detection': detection.to_dict(),
+            'detection': detection_data,
             'results': results
         }), 200
         
     except Exception as e:
         # Update status to failed
         if 'detection' in locals():
+            db.session.rollback()
             detection.status = 'failed'
             db.session.commit()
         
         return jsonify({'error': f'Detection failed: {str(e)}'}), 500
 
+@detection_bp.route('/detect/bulk', methods=['POST'])
+def bulk_upload_and_detect():
+    """Upload many images (multiple 'images' fields and/or a zip 'archive') and detect them all"""
+    # A roast batch is far larger than the single-image upload limit
+    request.max_content_length = BULK_MAX_CONTENT_LENGTH
+    saved = []  # (index, original name, storage key)
+    rejected = []  # (index, original name, error), reported per file instead of failing the batch
+    
+    try:
+        def store(original_name, read):
+            if len(saved) >= BULK_MAX_FILES:
+                raise ValueError(f'Too many files, maximum is {BULK_MAX_FILES}')
+            index = len(saved) + len(rejected)
+            try:
+                # Same header check as /upload, before anything is stored
+                with read() as buffer:
+                    check_image(buffer, IMAGE_MAX_PIXELS)
+                    image_key = image_store.put_bytes(buffer)
+            except ImageRejected as e:
+                rejected.append((index, original_name, str(e)))
+                return
+            saved.append((index, original_name, image_key))
+        
+        for file in request.files.getlist('images'):
+            if file.filename and allowed_file(file.filename):
+                store(file.filename, lambda file=file: upload_buffer(file))
+        
+        archive = request.files.get('archive')
+        if archive and archive.filename:
+            with zipfile.ZipFile(archive.stream) as zf:
+                for member in zf.infolist():
+                    name = os.path.basename(member.filename)
+                    if member.is_dir() or not name or not allowed_file(name):
+                        continue
+                    max_bytes = max_image_bytes()
+                    if member.file_size > max_bytes:
+                        rejected.append((len(saved) + len(rejected), name,
+                                         f'Image is too large, maximum is {max_bytes} bytes'))
+                        continue
+                    store(name, lambda member=member: nullcontext(zf.read(member)))
+        
+        if not saved and not rejected:
+            return jsonify({'error': 'No valid image files provided'}), 400
+        
+        # One bulk INSERT for every row of the batch; each chunk is marked 'processing' when it starts.
+        # Stored names take the extension of the sniffed format (the storage key), not the upload's name
+        records = [
+            Detection(filename=f"{uuid.uuid4()}.{image_key.rsplit('.', 1)[1]}", original_path=image_key,
+                      status='uploaded')
+            for _, _, image_key in saved
+        ]
+        db.session.add_all(records)
+        db.session.commit()
+        items = [(index, name, record.id, record.original_path)
+                 for (index, name, _), record in zip(saved, records)]
+        db.session.close()
+        
+    except (ValueError, zipfile.BadZipFile) as e:
+        # Stored images are not removed: identical content may belong to other detections
+        db.session.rollback()
+        return jsonify({'error': f'Bulk upload rejected: {str(e)}'}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': f'Bulk upload failed: {str(e)}'}), 500
+    
+    def generate():
+        completed = failed = 0
+        
+        claimed = []  # ids marked 'processing' whose results are not committed yet
+        
+        for index, name, error in rejected:
+            yield json.dumps({'index': index, 'filename': name, 'status': 'rejected', 'error': error}) + '\n'
+        
+        try:
+            for start in range(0, len(items), inference_engine.max_batch_size):
+                chunk = items[start:start + inference_engine.max_batch_size]
+                
+                claimed = [detection_id for _, _, detection_id, _ in chunk]
+                owner = worker_id()
+                for detection in Detection.query.filter(Detection.id.in_(claimed)):
+                    detection.start_processing(owner)
+                db.session.commit()
+                
+                # Images already detected with this model skip inference and drawing
+                keys = [detection_cache_key(ref) for _, _, _, ref in chunk]
+                cached = [result_cache.get(key) if key else None for key in keys]
+                to_detect = [item for item, hit in zip(chunk, cached) if hit is None]
+                
+                detected = {}
+                error = None
+                start_time = time.time()
+                if to_detect:
+                    try:
+                        paths = [image_store.local_path(ref) for _, _, _, ref in to_detect]
+                        for item, result in zip(to_detect, get_detector().detect_many(paths)):
+                            detected[item[2]] = result
+                    except Exception as e:
+                        error = str(e)
+                processing_time = (time.time() - start_time) / len(to_detect) if to_detect else 0.0
+                
+                lines = []
+                pending_writes = []
+                for (index, name, detection_id, ref), key, hit in zip(chunk, keys, cached):
+                    detection = db.session.get(Detection, detection_id)
+                    line = {'index': index, 'filename': name, 'detection_id': detection_id, 'cached': hit is not None}
+                    
+                    try:
+                        if hit is not None:
+                            detection.apply_results(hit['results']['detections'], hit['result_path'], 0.0)
+                        else:
+                            result = detected.get(detection_id)
+                            if result is None:
+                                raise RuntimeError(error or 'No detection result')
+                            
+                            annotated = get_detector().render_results(image_store.local_path(ref), result)
+                            results = result.to_dict()
+                            detection.apply_results(results['detections'], None, processing_time)
+                            pending_writes.append((detection_id, annotated, key, results))
+                        completed += 1
+                        
+                        line.update({
+                            'status': 'completed',
+                            'detections_count': detection.detections_count,
+                            'classes': detection.detection_classes,
+                            'confidence_scores': detection.confidence_scores,
+                            'processing_time': detection.processing_time
+                        })
+                    except Exception as e:
+                        detection.status = 'failed'
+                        failed += 1
+                        line.update({'status': 'failed', 'error': str(e)})
+                    
+                    lines.append(line)
+                
+                db.session.commit()
+                claimed = []
+                db.session.close()
+                
+                # Rows exist now, so the writer can fill in result_path as each image is stored
+                for detection_id, annotated, key, results in pending_writes:
+                    on_written = (lambda stored, k=key, r=results: result_cache.put(k, r, stored)) if key else None
+                    persist_image(detection_id, 'result_path', image=annotated, on_written=on_written)
+                
+                for line in lines:
+                    yield json.dumps(line) + '\n'
+            
+            yield json.dumps({'done': True, 'total': len(items) + len(rejected), 'completed': completed,
+                              'failed': failed, 'rejected': len(rejected)}) + '\n'
+        finally:
+            if claimed:
+                # The chunk failed or the client went away before its results were stored:
+                # leave the rows to /detect/<id> instead of 'processing' forever
+                db.session.rollback()
+                for detection in Detection.query.filter(Detection.id.in_(claimed)):
+                    if detection.status == 'processing':
+                        detection.status = 'uploaded'
+                db.session.commit()
+                db.session.close()
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@detection_bp.route('/detect/<int:detection_id>/status', methods=['GET'])
+def get_detection_job(detection_id):
+    """Poll a detection job; pass ?wait=<seconds> to long-poll until it finishes"""
+    try:
+        detection = Detection.query.get_or_404(detection_id)
+        wait = min(request.args.get('wait', 0, type=float), MAX_JOB_WAIT)
+        
+        if detection.status == 'processing' and wait > 0:
+            # Do not hold a pooled connection while waiting
+            db.session.close()
+            deadline = time.time() + wait
+            
+            if not job_queue.wait(detection_id, wait):
+                # Job belongs to another worker process, poll the row instead
+                while time.time() < deadline:
+                    time.sleep(0.5)
+                    status = db.session.query(Detection.status).filter_by(id=detection_id).scalar()
+                    db.session.close()
+                    if status != 'processing':
+                        break
+            
+            detection = db.session.get(Detection, detection_id)
+        
+        return jsonify({
+            'success': True,
+            'job_id': detection_id,
+            'status': detection.status,
+            'done': detection.status in ('completed', 'failed'),
+            'detection': detection.to_dict()
+        }), 200
+    except Exception as e:
+        return jsonify({'error': f'Failed to fetch detection job: {str(e)}'}), 500
+
+@detection_bp.before_app_request
+def recover_detection_jobs():
+    """Re-queue detections interrupted by a restart, on the first request of this process"""
+    job_queue.recover(current_app._get_current_object())
+
+@detection_bp.before_app_request
+def load_detector():
+    """Start loading and warming up the model in the background on the first request"""
+    detector_service.start()
+
+@detection_bp.route('/ready', methods=['GET'])
+def readiness_check():
+    """
+    Readiness probe: 200 once the model is loaded and warmed up, 503 until then
+    and whenever the weights failed to load (the detector would only return placeholder boxes)
+    """
+    state = detector_service.state()
+    return jsonify({
+        'ready': state['ready'],
+        'detector': state,
+        'job_workers': job_queue.max_workers
+    }), 200 if state['ready'] else 503
+
+def encode_cursor(detection):
+    """Opaque keyset cursor pointing just after a detection in (created_at, id) order"""
+    raw = f"{detection.created_at.isoformat()}|{detection.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor; raises ValueError for a malformed cursor"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        created_at, detection_id = raw.rsplit('|', 1)
+        return datetime.fromisoformat(created_at), int(detection_id)
+    except (TypeError, ValueError, binascii.Error):
+        # Do not echo parser internals back to the client
+        raise ValueError('Invalid cursor')
+
+def filtered_detections():
+    """
+    Detection query narrowed by the listing filters in the query string:
+    status, capture_method, esp32_ip, class (repeatable), start / end (ISO datetime, UTC)
+    """
+    query = Detection.query
+    
+    for field in ('status', 'capture_method', 'esp32_ip'):
+        values = request.args.getlist(field)
+        if values:
+            query = query.filter(getattr(Detection, field).in_(values))
+    
+    classes = request.args.getlist('class')
+    if classes:
+        query = query.filter(
+            db.session.query(DetectionBox.id)
+            .filter(DetectionBox.detection_id == Detection.id, DetectionBox.class_name.in_(classes))
+            .exists()
+        )
+    
+    start = get_datetime_arg('start')
+    end = get_datetime_arg('end')
+    if start is not None:
+        query = query.filter(Detection.created_at >= start)
+    if end is not None:
+        query = query.filter(Detection.created_at < end)
+    
+    return query
+
 @detection_bp.route('/detections', methods=['GET'])
 def get_detections():
+    """
+    List detections, newest first.
+    Keyset mode (?cursor=, empty for the first page) follows pagination.next_cursor
+    and costs the same on every page; page mode (?page=) is kept for older clients.
+    include_total=0 skips the COUNT(*) (default in keyset mode).
+    """
     try:
+        per_page = min(max(request.args.get('per_page', 10, type=int), 1), 1000)
+        
+        try:
+            query = filtered_detections()
+        except ValueError as e:
+            return jsonify({'error': f'Invalid filter: {str(e)}'}), 400
+        
+        if 'cursor' in request.args:
+            include_total = request.args.get('include_total', 'false').lower() in ('1', 'true', 'yes')
+            total = query.order_by(None).count() if include_total else None
+            
+            cursor = request.args.get('cursor')
+            if cursor:
+                try:
+                    created_at, detection_id = decode_cursor(cursor)
+                except ValueError as e:
+                    return jsonify({'error': str(e)}), 400
+                query = query.filter(
+                    db.tuple_(Detection.created_at, Detection.id) < db.tuple_(created_at, detection_id)
+                )
+            
+            # One extra row tells whether another page exists without counting
+            rows = query.order_by(Detection.created_at.desc(), Detection.id.desc()).limit(per_page + 1).all()
+            has_more = len(rows) > per_page
+            rows = rows[:per_page]
+            
+            pagination = {
+                'per_page': per_page,
+                'next_cursor': encode_cursor(rows[-1]) if has_more else None,
+                'has_more': has_more
+            }
+            if total is not None:
+                pagination['total'] = total
+            
+            return jsonify({
+                'success': True,
+                'detections': [d.to_dict() for d in rows],
+                'pagination': pagination
+            }), 200
+        
         page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 10, type=int)
+        include_total = request.args.get('include_total', 'true').lower() in ('1', 'true', 'yes')
         
-        detections = Detection.query.order_by(Detection.created_at.desc()).paginate(
-            page=page, per_page=per_page, error_out=False
+        detections = query.order_by(Detection.created_at.desc(), Detection.id.desc()).paginate(
+            page=page, per_page=per_page, error_out=False, count=include_total
         )
         
         return jsonify({
@@ -416,7 +1054,12 @@ def get_detection(detection_id):
 def get_original_image(detection_id):
     try:
         detection = Detection.query.get_or_404(detection_id)
-        return send_file(detection.original_path)
+        response = send_image(detection, 'original_path')
+        if response is None:
+            return jsonify({'error': 'Image not available'}), 404
+        return response
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': f'Image not found: {str(e)}'}), 404
 
@@ -424,26 +1067,83 @@ def get_original_image(detection_id):
 def get_result_image(detection_id):
     try:
         detection = Detection.query.get_or_404(detection_id)
-        if not detection.result_path or not os.path.exists(detection.result_path):
+        response = send_image(detection, 'result_path')
+        if response is None:
             return jsonify({'error': 'Result image not available'}), 404
-        return send_file(detection.result_path)
+        return response
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': f'Result image not found: {str(e)}'}), 404
 
-@detection_bp.route('/stats', methods=['GET'])
-def get_detection_stats():
+@detection_bp.route('/detection/<int:detection_id>/boxes', methods=['GET'])
+def get_detection_boxes(detection_id):
     try:
-        total_detections = Detection.query.count()
-        completed_detections = Detection.query.filter_by(status='completed').count()
+        detection = Detection.query.get_or_404(detection_id)
+        return jsonify({
+            'success': True,
+            'detection_id': detection.id,
+            'boxes': [box.to_dict() for box in detection.boxes.order_by(DetectionBox.id)]
+        }), 200
+    except Exception as e:
+        return jsonify({'error': f'Failed to fetch boxes: {str(e)}'}), 500
+
+@detection_bp.route('/boxes', methods=['GET'])
+def search_boxes():
+    """
+    Filter detected boxes across all captures
+    Query: class (repeatable), min_confidence, max_confidence, min_area, max_area,
+           start / end (ISO datetime, UTC), limit (max 1000)
+    """
+    try:
+        query = DetectionBox.query
+        
+        classes = request.args.getlist('class')
+        if classes:
+            query = query.filter(DetectionBox.class_name.in_(classes))
+        
+        min_confidence = request.args.get('min_confidence', type=float)
+        max_confidence = request.args.get('max_confidence', type=float)
+        min_area = request.args.get('min_area', type=float)
+        max_area = request.args.get('max_area', type=float)
+        if min_confidence is not None:
+            query = query.filter(DetectionBox.confidence >= min_confidence)
+        if max_confidence is not None:
+            query = query.filter(DetectionBox.confidence <= max_confidence)
+        if min_area is not None:
+            query = query.filter(DetectionBox.area >= min_area)
+        if max_area is not None:
+            query = query.filter(DetectionBox.area <= max_area)
+        
+        try:
+            start = get_datetime_arg('start')
+            end = get_datetime_arg('end')
+        except ValueError:
+            return jsonify({'error': 'start and end must be ISO 8601 datetimes'}), 400
+        if start is not None:
+            query = query.filter(DetectionBox.created_at >= start)
+        if end is not None:
+            query = query.filter(DetectionBox.created_at < end)
         
-        # Get class distribution
-        completed_records = Detection.query.filter_by(status='completed').all()
-        class_counts = {}
+        limit = min(max(request.args.get('limit', 100, type=int), 1), 1000)
+        boxes = query.order_by(DetectionBox.created_at.desc(), DetectionBox.id.desc()).limit(limit).all()
         
-        for record in completed_records:
-            if record.detection_classes:
-                for cls in record.detection_classes:
-                    class_counts[cls] = class_counts.get(cls, 0) + 1
+        return jsonify({
+            'success': True,
+            'boxes': [box.to_dict() for box in boxes],
+            'count': len(boxes)
+        }), 200
+    except Exception as e:
+        return jsonify({'error': f'Failed to search boxes: {str(e)}'}), 500
+
+@detection_bp.route('/stats', methods=['GET'])
+def get_detection_stats():
+    try:
+        # Counters are maintained at write time, see models/detection_stats.py
+        stats = read_detection_stats()
+        total_detections = sum(stats['status'].values())
+        completed_detections = stats['status'].get('completed', 0)
+        class_counts = stats['class']
         
         return jsonify({
             'success': True,
@@ -457,38 +1157,83 @@ def get_detection_stats():
     except Exception as e:
         return jsonify({'error': f'Failed to fetch stats: {str(e)}'}), 500
     
+# Default window and longest allowed window of /stats/trend per bucket size
+TREND_DEFAULT_SPAN = {'minute': timedelta(hours=1), 'hour': timedelta(days=1), 'day': timedelta(days=30)}
+TREND_MAX_POINTS = int(os.getenv('TREND_MAX_POINTS', 5000))
+BUCKET_SIZE = {'minute': timedelta(minutes=1), 'hour': timedelta(hours=1), 'day': timedelta(days=1)}
+
+@detection_bp.route('/stats/trend', methods=['GET'])
+def get_detection_trend():
+    """
+    Roast-level counts per time bucket from the rollup table
+    Query: bucket (minute | hour | day, default hour), start / end (ISO datetime, UTC),
+           camera, class (repeatable), group_by=camera
+    """
+    try:
+        bucket = request.args.get('bucket', 'hour')
+        if bucket not in BUCKETS:
+            return jsonify({'error': f'bucket must be one of {", ".join(BUCKETS)}'}), 400
+        
+        try:
+            end = get_datetime_arg('end') or datetime.utcnow()
+            start = get_datetime_arg('start') or end - TREND_DEFAULT_SPAN[bucket]
+        except ValueError as e:
+            return jsonify({'error': f'Invalid date: {str(e)}'}), 400
+        # Rollups are stored as naive UTC
+        start, end = (t.astimezone(pytz.utc).replace(tzinfo=None) if t.tzinfo else t for t in (start, end))
+        
+        if end <= start:
+            return jsonify({'error': 'end must be after start'}), 400
+        if (end - start) / BUCKET_SIZE[bucket] > TREND_MAX_POINTS:
+            return jsonify({'error': f'Range too long for {bucket} buckets, use a larger bucket'}), 400
+        
+        series = detection_trend(
+            bucket, start, end,
+            camera=request.args.get('camera'),
+            classes=request.args.getlist('class'),
+            by_camera=request.args.get('group_by') == 'camera'
+        )
+        
+        return jsonify({
+            'success': True,
+            'bucket': bucket,
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'series': series
+        }), 200
+    except Exception as e:
+        return jsonify({'error': f'Failed to fetch trend: {str(e)}'}), 500
+
 @detection_bp.route('/detect/frame', methods=['POST'])
 def detect_from_frame():
     try:
-        if 'image' not in request.files:
-            return jsonify({'success': False, 'error': 'No image file provided'}), 400
-
-        file = request.files['image']
-        image_bytes = file.read()
-        image = Image.open(io.BytesIO(image_bytes))
-
-        # Run detection using YOLO
-        results = detector.detect_image(image)
-
-        # Format bounding box response
-        response_boxes = []
-        for box in results.get('detections', []):
-            response_boxes.append({
-                'x': int(box['x']),
-                'y': int(box['y']),
-                'width': int(box['width']),
-                'height': int(box['height']),
-                'label': box['label'],
-                'score': float(box['confidence']),
-            })
+        # Run detection using YOLO, decoding straight from the request buffer
+        with frame_image() as image_bytes:
+            result = detect_frame(decode_frame(image_bytes))
 
+        detections = result.to_dict()['detections']
         return jsonify({
             'success': True,
-            'boxes': response_boxes
-        }, 200)
+            'detections': detections,
+            # Deprecated: the previous x/y/width/height format, kept for existing clients
+            'boxes': [
+                {
+                    'x': x1,
+                    'y': y1,
+                    'width': x2 - x1,
+                    'height': y2 - y1,
+                    'label': detection['label'],
+                    'score': detection['confidence'],
+                }
+                for detection in detections
+                for x1, y1, x2, y2 in [detection['bbox']]
+            ]
+        }), 200
 
+    except ImageRejected as e:
+        return jsonify({'success': False, 'error': str(e)}), e.status_code
     except Exception as e:
-        return jsonify({'success': False, 'error': f'Detection failed: {str(e)}'}, 500)
+        return jsonify({'success': False, 'error': f'Detection failed: {str(e)}'}), 500
 
 @detection_bp.route('/health', methods=['GET'])
 def health_check():
@@ -496,5 +1241,11 @@ def health_check():
     return jsonify({
         'status': 'healthy',
         'message': 'Detection service is running',
-        'timestamp': time.time()
+        'timestamp': time.time(),
+        'inference_engine': inference_engine.stats(),
+        'detector': detector_service.state(),
+        'job_workers': job_queue.max_workers,
+        'ingest': ingest_controller.stats(),
+        'result_cache': result_cache.stats(),
+        'image_writer': image_writer.stats()
     }), 200
\ No newline at end of file
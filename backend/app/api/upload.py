@@ -1,14 +1,19 @@
 import os
 import uuid
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify
 from werkzeug.utils import secure_filename
 from ..config.database import db
 from ..models.detection import Detection
+from ..utils.image_store import get_image_store
+from ..utils.image_ingest import ImageRejected, check_image, upload_buffer
 
 upload_bp = Blueprint('upload', __name__)
 
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'bmp', 'webp'}
 
+# Images with more pixels are rejected from their header, before decoding
+IMAGE_MAX_PIXELS = int(os.getenv('IMAGE_MAX_PIXELS', 40_000_000))
+
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
@@ -30,14 +35,15 @@ def upload_image():
         file_extension = filename.rsplit('.', 1)[1].lower()
         unique_filename = f"{uuid.uuid4()}.{file_extension}"
         
-        # Save file
-        file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], unique_filename)
-        file.save(file_path)
+        # Check the header, then store straight from Werkzeug's buffer (once per content hash)
+        with upload_buffer(file) as buffer:
+            check_image(buffer, IMAGE_MAX_PIXELS)
+            image_key = get_image_store().put_bytes(buffer)
         
         # Save to database
         detection = Detection(
             filename=unique_filename,
-            original_path=file_path,
+            original_path=image_key,
             status='uploaded'
         )
         db.session.add(detection)
@@ -49,6 +55,8 @@ def upload_image():
             'detection': detection.to_dict()
         }), 200
         
+    except ImageRejected as e:
+        return jsonify({'error': f'Invalid image: {str(e)}'}), e.status_code
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': f'Upload failed: {str(e)}'}), 500
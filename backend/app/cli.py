@@ -0,0 +1,87 @@
+import os
+
+import click
+
+from .models.detection_stats import rebuild_detection_stats
+from .models.detection_box import backfill_detection_boxes
+from .models.detection_rollup import rebuild_detection_rollups
+from .utils.model_export import BACKENDS, export_model, parity_report
+
+
+def register_commands(app):
+    """Register maintenance commands on the Flask CLI"""
+
+    @app.cli.command('rebuild-stats')
+    def rebuild_stats():
+        """Recompute the /stats summary table from the detections table"""
+        counts = rebuild_detection_stats()
+        click.echo(f"Rebuilt detection stats: {len(counts)} counter(s)")
+
+    @app.cli.command('backfill-boxes')
+    @click.option('--batch-size', default=1000, show_default=True, help='Detections per transaction')
+    def backfill_boxes(batch_size):
+        """Create detection_boxes rows for detections stored before boxes were recorded"""
+        count = backfill_detection_boxes(batch_size=batch_size)
+        click.echo(f"Backfilled boxes for {count} detection(s)")
+
+    @app.cli.command('rebuild-rollups')
+    def rebuild_rollups():
+        """Recompute the /stats/trend rollup table from the detections table"""
+        count = rebuild_detection_rollups()
+        click.echo(f"Rebuilt detection rollups: {count} row(s)")
+
+
+    @app.cli.command('export-model')
+    @click.option('--backend', type=click.Choice(BACKENDS[1:]), default='onnx',
+                  show_default=True, help='Export format')
+    @click.option('--imgsz', default=640, show_default=True, help='Export input size')
+    @click.option('--int8-data', default=lambda: os.getenv('DETECTION_INT8_DATA'), help='Calibration dataset YAML (openvino-int8)')
+    @click.option('--force', is_flag=True, help='Re-export even if the cached export is current')
+    @click.option('--images', type=click.Path(exists=True, file_okay=False), help='Compare detections against PyTorch on these images')
+    def export_model_command(backend, imgsz, int8_data, force, images):
+        """Export best.pt for an optimized CPU backend and optionally check parity"""
+        from .api.detection import model_path
+        from .utils.yolo_detector import YOLODetector
+
+        artifact = export_model(model_path, backend, imgsz=imgsz, int8_data=int8_data, force=force)
+        click.echo(f"Exported model: {artifact}")
+        if not images:
+            return
+
+        paths = sorted(
+            os.path.join(images, name) for name in os.listdir(images)
+            if name.lower().endswith(('.jpg', '.jpeg', '.png'))
+        )
+        pytorch = YOLODetector(model_path)
+        exported = YOLODetector(model_path, backend=backend, int8_data=int8_data)
+        reference = [pytorch.detect(path) for path in paths]
+        candidate = [exported.detect(path) for path in paths]
+        report = parity_report(reference, candidate)
+        click.echo(
+            f"Parity on {len(paths)} image(s): recall {report['recall']:.3f}, precision {report['precision']:.3f}, "
+            f"mean IoU {report['mean_iou'] or 0:.3f}, max confidence delta {report['max_confidence_delta'] or 0:.3f}"
+        )
+
+    @app.cli.command('model-server')
+    @click.option('--address', default=lambda: os.getenv('DETECTION_SERVER_ADDRESS'),
+                  help='Unix socket path or host:port (DETECTION_SERVER_ADDRESS)')
+    def model_server_command(address):
+        """Load the model once and serve the web and job workers that set DETECTION_SERVER_ADDRESS"""
+        from .api.detection import model_path, DETECTION_MAX_BATCH_SIZE, INFERENCE_TIMEOUT
+        from .utils.detector_service import create_detector_service
+        from .utils.model_server import ModelServer
+
+        if not address:
+            raise click.UsageError('Pass --address or set DETECTION_SERVER_ADDRESS')
+        # Loads the model in this process, whatever DETECTION_SERVER_ADDRESS says
+        service = create_detector_service(model_path, warmup_batch=DETECTION_MAX_BATCH_SIZE, server_address='')
+        server = ModelServer(
+            service, address, service.server_authkey,
+            max_batch_size=DETECTION_MAX_BATCH_SIZE,
+            batch_window=float(os.getenv('DETECTION_BATCH_WINDOW_MS', 10)) / 1000,
+            timeout=INFERENCE_TIMEOUT
+        )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            click.echo('Model server stopped')
@@ -5,6 +5,31 @@ import os
 db = SQLAlchemy()
 migrate = Migrate()
 
+def _env_bool(name, default):
+    return os.getenv(name, str(default)).strip().lower() in ('1', 'true', 'yes', 'on')
+
+def engine_options(database_url):
+    """
+    Connection pool settings from the environment
+    Each web worker process gets its own pool, so the database must allow
+    workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections.
+    """
+    options = {
+        # Drop connections the server or a proxy closed while idle
+        'pool_pre_ping': _env_bool('DB_POOL_PRE_PING', True),
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800))
+    }
+    
+    # In-memory SQLite keeps a single connection per thread instead of a sized pool
+    if not (database_url.startswith('sqlite') and ':memory:' in database_url or database_url == 'sqlite://'):
+        options.update({
+            'pool_size': int(os.getenv('DB_POOL_SIZE', 10)),
+            'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 20)),
+            'pool_timeout': float(os.getenv('DB_POOL_TIMEOUT', 30))
+        })
+    
+    return options
+
 def configure_database(app):
     """Configure database with Flask app"""
     # Load DATABASE_URL from environment or use default
@@ -12,6 +37,7 @@ def configure_database(app):
     
     app.config['SQLALCHEMY_DATABASE_URI'] = database_url
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(database_url)
     app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
     
     # Initialize extensions
@@ -3,6 +3,9 @@ from flask_sqlalchemy import SQLAlchemy
 db = SQLAlchemy()
 
 from .detection import Detection
+from .detection_stats import DetectionStat
+from .detection_box import DetectionBox
+from .detection_rollup import DetectionRollup
 
 def init_app(app):
     db.init_app(app)
\ No newline at end of file
@@ -2,27 +2,58 @@ from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
 import pytz
 from ..config.database import db
+from .detection_box import replace_detection_boxes
 
 # Tentukan timezone Jakarta
 jakarta_tz = pytz.timezone('Asia/Jakarta')
 
 class Detection(db.Model):
     __tablename__ = 'detections'
+    __table_args__ = (
+        # Keyset pagination of /detections (newest first)
+        db.Index('ix_detections_created_at_id', 'created_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     filename = db.Column(db.String(255), nullable=False)
     original_path = db.Column(db.String(500), nullable=False)
     result_path = db.Column(db.String(500), nullable=True)
     detections_count = db.Column(db.Integer, default=0)
-    confidence_scores = db.Column(db.JSON, nullable=True)
-    detection_classes = db.Column(db.JSON, nullable=True)
+    # active_history keeps previous values available to the stats/rollup listeners
+    confidence_scores = db.mapped_column(db.JSON, nullable=True, active_history=True)
+    detection_classes = db.mapped_column(db.JSON, nullable=True, active_history=True)
     processing_time = db.Column(db.Float, nullable=True)
-    status = db.Column(db.String(50), default='uploaded')  # uploaded, processing, completed, failed
+    status = db.mapped_column(db.String(50), default='uploaded', active_history=True)  # uploaded, processing, completed, failed
+    # Process (host:pid) detecting a 'processing' row and since when, see DetectionJobQueue.recover
+    job_owner = db.Column(db.String(255), nullable=True)
+    job_started_at = db.Column(db.DateTime, nullable=True)
     capture_method = db.Column(db.String(50), default='upload')  # New field
     esp32_ip = db.Column(db.String(50), nullable=True)  # New field
     created_at = db.Column(db.DateTime, default=lambda: datetime.utcnow().replace(tzinfo=pytz.utc))  # Set to UTC explicitly
     updated_at = db.Column(db.DateTime, default=lambda: datetime.utcnow().replace(tzinfo=pytz.utc), onupdate=datetime.utcnow)
 
+    boxes = db.relationship('DetectionBox', backref='detection', lazy='dynamic',
+                            cascade='all, delete-orphan')
+
+    def start_processing(self, owner):
+        """Mark the row as being detected by owner (a job_queue.worker_id())"""
+        self.status = 'processing'
+        self.job_owner = owner
+        self.job_started_at = datetime.utcnow()
+
+    def apply_results(self, detections, result_path, processing_time):
+        """
+        Copy serialized DetectionResult detections onto the row and its boxes and
+        mark it completed (used by uploads, job workers and captures alike)
+        """
+        self.result_path = result_path
+        self.detections_count = len(detections)
+        self.confidence_scores = [det['confidence'] for det in detections]
+        self.detection_classes = [det['label'] for det in detections]
+        self.processing_time = processing_time
+        self.status = 'completed'
+        replace_detection_boxes(self, detections)
+
     def to_dict(self):
         # Mengonversi waktu ke Jakarta Timezone
         created_at_jakarta = self.created_at.astimezone(jakarta_tz) if self.created_at else None
@@ -0,0 +1,116 @@
+from datetime import datetime
+import pytz
+from sqlalchemy import delete, insert
+from ..config.database import db
+
+
+class DetectionBox(db.Model):
+    """One detected bounding box of a Detection, for per-box filtering and analytics"""
+    __tablename__ = 'detection_boxes'
+    __table_args__ = (
+        db.Index('ix_detection_boxes_class_created', 'class_name', 'created_at'),
+        db.Index('ix_detection_boxes_detection_id', 'detection_id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    detection_id = db.Column(db.Integer, db.ForeignKey('detections.id', ondelete='CASCADE'), nullable=False)
+    class_name = db.Column(db.String(100), nullable=False)
+    confidence = db.Column(db.Float, nullable=True)
+    # Pixel coordinates; NULL for boxes backfilled from captures made before boxes were stored
+    x1 = db.Column(db.Float, nullable=True)
+    y1 = db.Column(db.Float, nullable=True)
+    x2 = db.Column(db.Float, nullable=True)
+    y2 = db.Column(db.Float, nullable=True)
+    area = db.Column(db.Float, nullable=True)
+    # Copied from the parent detection so (class, time) queries need no join
+    created_at = db.Column(db.DateTime, default=lambda: datetime.utcnow().replace(tzinfo=pytz.utc))
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'detection_id': self.detection_id,
+            'label': self.class_name,
+            'confidence': self.confidence,
+            'bbox': [self.x1, self.y1, self.x2, self.y2] if self.x1 is not None else None,
+            'area': self.area,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+
+def box_rows(detection_id, detections, created_at=None):
+    """
+    Rows for DetectionBox from detection results
+    Args:
+        detections: Serialized DetectionResult detections ({'label', 'confidence', 'bbox': [x1, y1, x2, y2]})
+    """
+    rows = []
+    for det in detections or []:
+        x1, y1, x2, y2 = (float(v) for v in det['bbox'])
+        rows.append({
+            'detection_id': detection_id,
+            'class_name': str(det['label']),
+            'confidence': float(det['confidence']),
+            'x1': x1, 'y1': y1, 'x2': x2, 'y2': y2,
+            'area': max(0.0, x2 - x1) * max(0.0, y2 - y1),
+            'created_at': created_at
+        })
+    return rows
+
+
+def replace_detection_boxes(detection, detections):
+    """
+    Bulk-write the boxes of a detection, replacing any stored by an earlier run.
+    Runs inside the caller's transaction; the caller commits.
+    """
+    if detection.id is None:
+        db.session.flush()
+
+    db.session.execute(delete(DetectionBox).where(DetectionBox.detection_id == detection.id))
+    rows = box_rows(detection.id, detections, detection.created_at)
+    if rows:
+        db.session.execute(insert(DetectionBox), rows)
+    return len(rows)
+
+
+def backfill_detection_boxes(batch_size=1000):
+    """
+    Create boxes for completed detections stored before the detection_boxes table
+    existed, from their detection_classes / confidence_scores JSON (no coordinates).
+    Works through the table in id order, one committed batch at a time.
+    Returns:
+        int: Number of detections backfilled
+    """
+    from .detection import Detection
+
+    has_boxes = db.session.query(DetectionBox.id).filter(DetectionBox.detection_id == Detection.id).exists()
+    last_id = 0
+    backfilled = 0
+
+    while True:
+        batch = (
+            db.session.query(Detection.id, Detection.detection_classes, Detection.confidence_scores, Detection.created_at)
+            .filter(Detection.id > last_id, Detection.status == 'completed', ~has_boxes)
+            .order_by(Detection.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not batch:
+            return backfilled
+
+        rows = []
+        for detection_id, classes, scores, created_at in batch:
+            classes = classes if isinstance(classes, list) else []
+            scores = scores if isinstance(scores, list) else []
+            for i, cls in enumerate(classes):
+                rows.append({
+                    'detection_id': detection_id,
+                    'class_name': str(cls),
+                    'confidence': float(scores[i]) if i < len(scores) else None,
+                    'created_at': created_at
+                })
+        if rows:
+            db.session.execute(insert(DetectionBox), rows)
+        db.session.commit()
+
+        backfilled += len(batch)
+        last_id = batch[-1][0]
@@ -0,0 +1,176 @@
+from collections import defaultdict
+
+import pytz
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from ..config.database import db
+from .detection import Detection
+from .detection_stats import previous_value, upsert_increment
+
+BUCKETS = ('minute', 'hour', 'day')
+
+
+class DetectionRollup(db.Model):
+    """
+    Per-bucket class counts of completed detections for the trend charts.
+    One row per (bucket size, bucket start, camera, class), maintained by the
+    flush listener below as captures are written.
+    """
+    __tablename__ = 'detection_rollups'
+
+    bucket = db.Column(db.String(10), primary_key=True)  # minute, hour, day
+    bucket_start = db.Column(db.DateTime, primary_key=True)  # UTC, naive
+    camera = db.Column(db.String(50), primary_key=True)  # esp32_ip, '' for uploads
+    class_name = db.Column(db.String(100), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    confidence_sum = db.Column(db.Float, nullable=False, default=0.0)
+
+
+def bucket_start(timestamp, bucket):
+    """Truncate a timestamp to the start of its bucket, as naive UTC"""
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(pytz.utc).replace(tzinfo=None)
+    if bucket == 'minute':
+        return timestamp.replace(second=0, microsecond=0)
+    if bucket == 'hour':
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    if bucket == 'day':
+        return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f'Unknown bucket: {bucket}')
+
+
+def _contribution(status, classes, scores, created_at, camera, sign=1):
+    """Rollup increments of one detection row: {(bucket, start, camera, class): [count, confidence_sum]}"""
+    increments = defaultdict(lambda: [0, 0.0])
+    if status != 'completed' or not isinstance(classes, list) or created_at is None:
+        return increments
+
+    scores = scores if isinstance(scores, list) else []
+    for i, cls in enumerate(classes):
+        confidence = float(scores[i]) if i < len(scores) and scores[i] is not None else 0.0
+        for bucket in BUCKETS:
+            key = (bucket, bucket_start(created_at, bucket), camera or '', str(cls))
+            increments[key][0] += sign
+            increments[key][1] += sign * confidence
+    return increments
+
+
+def _merge(total, increments):
+    for key, (count, confidence_sum) in increments.items():
+        total[key][0] += count
+        total[key][1] += confidence_sum
+
+
+def _row_contribution(obj, sign, previous=False):
+    value = (lambda key: previous_value(obj, key)) if previous else (lambda key: getattr(obj, key))
+    return _contribution(value('status'), value('detection_classes'), value('confidence_scores'),
+                         value('created_at'), value('esp32_ip'), sign)
+
+
+@event.listens_for(Session, 'after_flush')
+def _update_detection_rollups(session, flush_context):
+    """Apply the rollup changes of the flushed Detection rows in the same transaction"""
+    total = defaultdict(lambda: [0, 0.0])
+
+    for obj in session.new:
+        if isinstance(obj, Detection):
+            _merge(total, _row_contribution(obj, 1))
+
+    for obj in session.dirty:
+        if not isinstance(obj, Detection):
+            continue
+        attrs = inspect(obj).attrs
+        if not any(attrs[key].history.has_changes()
+                   for key in ('status', 'detection_classes', 'confidence_scores', 'created_at', 'esp32_ip')):
+            continue
+        _merge(total, _row_contribution(obj, -1, previous=True))
+        _merge(total, _row_contribution(obj, 1))
+
+    for obj in session.deleted:
+        if isinstance(obj, Detection):
+            _merge(total, _row_contribution(obj, -1, previous=True))
+
+    changes = {key: value for key, value in total.items() if value[0] or abs(value[1]) > 1e-9}
+    if not changes:
+        return
+
+    connection = session.connection()
+    table = DetectionRollup.__table__
+    for (bucket, start, camera, cls), (count, confidence_sum) in sorted(changes.items()):
+        upsert_increment(
+            connection, table,
+            {'bucket': bucket, 'bucket_start': start, 'camera': camera, 'class_name': cls},
+            {'count': count, 'confidence_sum': confidence_sum}
+        )
+
+
+def rebuild_detection_rollups(batch_size=1000):
+    """Recompute every rollup row from the detections table (first deploy or repair)"""
+    total = defaultdict(lambda: [0, 0.0])
+    query = (
+        db.session.query(Detection.status, Detection.detection_classes, Detection.confidence_scores,
+                         Detection.created_at, Detection.esp32_ip)
+        .filter(Detection.status == 'completed')
+    )
+    for row in query.yield_per(batch_size):
+        _merge(total, _contribution(*row))
+
+    db.session.query(DetectionRollup).delete()
+    db.session.add_all(
+        DetectionRollup(bucket=bucket, bucket_start=start, camera=camera, class_name=cls,
+                        count=count, confidence_sum=confidence_sum)
+        for (bucket, start, camera, cls), (count, confidence_sum) in total.items()
+        if count
+    )
+    db.session.commit()
+    return len(total)
+
+
+def detection_trend(bucket, start, end, camera=None, classes=None, by_camera=False):
+    """
+    Time-bucketed class counts and mean confidence from the rollup table
+    Args:
+        bucket: 'minute', 'hour' or 'day'
+        start, end: Naive UTC range, end exclusive
+        camera: Restrict to one camera ('' for uploads)
+        classes: Restrict to these classes
+        by_camera: Keep cameras apart instead of summing them
+    Returns:
+        list: [{'bucket_start', ['camera',] 'counts': {class: n}, 'mean_confidence': {class: x}}]
+    """
+    columns = [DetectionRollup.bucket_start, DetectionRollup.class_name]
+    if by_camera:
+        columns.insert(1, DetectionRollup.camera)
+
+    query = (
+        db.session.query(*columns, db.func.sum(DetectionRollup.count), db.func.sum(DetectionRollup.confidence_sum))
+        .filter(DetectionRollup.bucket == bucket,
+                DetectionRollup.bucket_start >= bucket_start(start, bucket),
+                DetectionRollup.bucket_start < end)
+    )
+    if camera is not None:
+        query = query.filter(DetectionRollup.camera == camera)
+    if classes:
+        query = query.filter(DetectionRollup.class_name.in_(classes))
+    query = query.group_by(*columns).order_by(*columns)
+
+    series = {}
+    for row in query:
+        if by_camera:
+            start_at, camera_id, cls, count, confidence_sum = row
+        else:
+            (start_at, cls, count, confidence_sum), camera_id = row, None
+        if not count:
+            continue
+
+        key = (start_at, camera_id)
+        point = series.get(key)
+        if point is None:
+            point = series[key] = {'bucket_start': start_at.isoformat(), 'counts': {}, 'mean_confidence': {}}
+            if by_camera:
+                point['camera'] = camera_id or None
+        point['counts'][cls] = int(count)
+        point['mean_confidence'][cls] = round(confidence_sum / count, 4)
+
+    return list(series.values())
@@ -0,0 +1,198 @@
+from collections import Counter
+
+from sqlalchemy import event, func, inspect, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..config.database import db
+from .detection import Detection
+
+
+class DetectionStat(db.Model):
+    """
+    Running counters behind /stats, kept in step with the detections table by
+    the flush listener below so the dashboard reads a handful of rows instead
+    of scanning every capture.
+        scope 'status': number of detections per status
+        scope 'class':  number of detected boxes per class over completed detections
+        scope 'meta':   INITIALIZED_MARKER, written by the rebuild the counters start from
+    """
+    __tablename__ = 'detection_stats'
+
+    scope = db.Column(db.String(20), primary_key=True)
+    name = db.Column(db.String(100), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+
+# Present once the counters were seeded from the detections table. Rows written by
+# the listener before that (e.g. on a database created before this table) are only
+# partial deltas, so the table is rebuilt while the marker is missing.
+INITIALIZED_MARKER = ('meta', 'initialized')
+
+
+def _contribution(status, classes):
+    """Counters a single detection row adds to the summary"""
+    counts = Counter()
+    if status:
+        counts[('status', status)] += 1
+    if status == 'completed' and isinstance(classes, list):
+        for cls in classes:
+            counts[('class', str(cls))] += 1
+    return counts
+
+
+def previous_value(obj, key):
+    """Value an attribute had before the pending flush"""
+    history = inspect(obj).attrs[key].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.has_changes():
+        return None
+    # Unchanged: the stored value is still the previous one (loaded if expired)
+    return getattr(obj, key)
+
+
+def upsert_increment(connection, table, keys, increments):
+    """
+    Add increments to the counter row identified by keys, creating it if missing
+    Args:
+        keys: {primary key column: value}
+        increments: {counter column: amount to add}
+    """
+    dialect = connection.dialect.name
+
+    if dialect in ('postgresql', 'sqlite'):
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(table).values(**keys, **increments)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c[name] for name in keys],
+            set_={name: table.c[name] + value for name, value in increments.items()}
+        )
+        connection.execute(stmt)
+        return
+
+    updated = connection.execute(
+        table.update()
+        .where(*(table.c[name] == value for name, value in keys.items()))
+        .values({name: table.c[name] + value for name, value in increments.items()})
+    )
+    if updated.rowcount == 0:
+        connection.execute(table.insert().values(**keys, **increments))
+
+
+@event.listens_for(Session, 'after_flush')
+def _update_detection_stats(session, flush_context):
+    """Apply the counter changes of the flushed Detection rows in the same transaction"""
+    delta = Counter()
+
+    for obj in session.new:
+        if isinstance(obj, Detection):
+            delta.update(_contribution(obj.status, obj.detection_classes))
+
+    for obj in session.dirty:
+        if not isinstance(obj, Detection):
+            continue
+        state = inspect(obj)
+        if not (state.attrs.status.history.has_changes() or
+                state.attrs.detection_classes.history.has_changes()):
+            continue
+        delta.subtract(_contribution(previous_value(obj, 'status'),
+                                     previous_value(obj, 'detection_classes')))
+        delta.update(_contribution(obj.status, obj.detection_classes))
+
+    for obj in session.deleted:
+        if isinstance(obj, Detection):
+            delta.subtract(_contribution(previous_value(obj, 'status'),
+                                         previous_value(obj, 'detection_classes')))
+
+    changes = {key: value for key, value in delta.items() if value}
+    if not changes:
+        return
+
+    connection = session.connection()
+    for (scope, name), value in sorted(changes.items()):
+        upsert_increment(connection, DetectionStat.__table__, {'scope': scope, 'name': name}, {'count': value})
+
+
+def aggregate_detection_stats():
+    """
+    Compute the counters from the detections table in SQL
+    Returns:
+        Counter: {(scope, name): count}
+    """
+    counts = Counter()
+
+    rows = db.session.query(Detection.status, func.count(Detection.id)).group_by(Detection.status)
+    for status, count in rows:
+        if status:
+            counts[('status', status)] = count
+
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        class_query = text("""
+            SELECT cls, COUNT(*) FROM detections
+            CROSS JOIN LATERAL json_array_elements_text(detections.detection_classes::json) AS cls
+            WHERE detections.status = 'completed'
+              AND json_typeof(detections.detection_classes::json) = 'array'
+            GROUP BY cls
+        """)
+    elif dialect == 'sqlite':
+        class_query = text("""
+            SELECT j.value, COUNT(*) FROM detections, json_each(detections.detection_classes) AS j
+            WHERE detections.status = 'completed'
+              AND json_type(detections.detection_classes) = 'array'
+            GROUP BY j.value
+        """)
+    else:
+        class_query = None
+
+    if class_query is not None:
+        for cls, count in db.session.execute(class_query):
+            counts[('class', str(cls))] = count
+    else:
+        # No JSON unnesting available: stream the class column only
+        query = db.session.query(Detection.detection_classes).filter(Detection.status == 'completed')
+        for (classes,) in query.yield_per(1000):
+            for cls in classes or []:
+                counts[('class', str(cls))] += 1
+
+    return counts
+
+
+def rebuild_detection_stats():
+    """Recompute the summary table from scratch (first run on existing data, or repair)"""
+    counts = aggregate_detection_stats()
+    db.session.query(DetectionStat).delete()
+    db.session.add_all(
+        DetectionStat(scope=scope, name=name, count=count)
+        for (scope, name), count in counts.items()
+    )
+    scope, name = INITIALIZED_MARKER
+    db.session.add(DetectionStat(scope=scope, name=name, count=1))
+    db.session.commit()
+    return counts
+
+
+def read_detection_stats():
+    """
+    Current counters from the summary table, rebuilding it first if it was never seeded
+    Returns:
+        dict: {'status': {status: count}, 'class': {class: count}}
+    """
+    rows = DetectionStat.query.all()
+    if not any((row.scope, row.name) == INITIALIZED_MARKER for row in rows):
+        try:
+            rebuild_detection_stats()
+        except IntegrityError:
+            # Another process seeded it at the same time
+            db.session.rollback()
+        rows = DetectionStat.query.all()
+
+    stats = {'status': {}, 'class': {}}
+    for row in rows:
+        if row.scope in stats and row.count > 0:
+            stats[row.scope][row.name] = row.count
+    return stats
@@ -1,3 +1,13 @@
 # File: /backend/backend/app/utils/__init__.py
 
-from .yolo_detector import *  # Import all functions from yolo_detector module to make them available in the utils package.
\ No newline at end of file
+import importlib
+
+
+def __getattr__(name):
+    # YOLODetector and friends stay importable from the package, but ultralytics/torch are only
+    # loaded when they are actually used (not by the upload service or the Flask CLI)
+    yolo_detector = importlib.import_module('.yolo_detector', __name__)
+    try:
+        return getattr(yolo_detector, name)
+    except AttributeError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
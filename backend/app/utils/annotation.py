@@ -0,0 +1,105 @@
+import cv2
+import numpy as np
+
+# Box and label colors per class (BGR)
+CLASS_COLORS = {
+    'green_bean': (0, 255, 0),      # Green
+    'light_roast': (0, 165, 255),   # Orange
+    'medium_roast': (0, 0, 255),    # Red
+    'dark_roast': (128, 0, 128)     # Purple
+}
+
+
+class AnnotationRenderer:
+    """
+    Draws detection boxes and "class: 0.87" labels onto BGR images
+
+    Label sizes are measured once per class and cached: the Hershey font's
+    digits all have the same width, so "class: 0.00" measures every
+    confidence of that class.
+    """
+
+    def __init__(self, colors=CLASS_COLORS, default_color=(255, 255, 255), text_color=(255, 255, 255),
+                 font_scale=0.7, text_thickness=2, box_thickness=3, padding=5, show_total=True):
+        """
+        Args:
+            colors: {class name: BGR color}, classes not listed use default_color
+            default_color: Box and label background color of unlisted classes
+            text_color: Label text color
+            font_scale: cv2.FONT_HERSHEY_SIMPLEX scale of the labels
+            text_thickness: Label stroke width
+            box_thickness: Box line width
+            padding: Space around the label text, in pixels
+            show_total: Also write "Total Detections: N" in the top-left corner
+        """
+        self.colors = dict(colors or {})
+        self.default_color = default_color
+        self.text_color = text_color
+        self.font_scale = font_scale
+        self.text_thickness = text_thickness
+        self.box_thickness = box_thickness
+        self.padding = padding
+        self.show_total = show_total
+        self._label_sizes = {}
+
+    def label_size(self, name):
+        """(width, height) of a "name: 0.00" label, measured once per class"""
+        size = self._label_sizes.get(name)
+        if size is None:
+            size = cv2.getTextSize(f"{name}: 0.00", cv2.FONT_HERSHEY_SIMPLEX,
+                                   self.font_scale, self.text_thickness)[0]
+            self._label_sizes[name] = size
+        return size
+
+    def draw(self, image, boxes, confidences, names):
+        """
+        Draw boxes onto image in place
+        Args:
+            image: BGR ndarray
+            boxes: (N, 4) x1, y1, x2, y2 array or list
+            confidences: N confidences
+            names: N class names
+        Returns:
+            int: Number of boxes drawn
+        """
+        boxes = np.asarray(boxes).reshape(-1, 4).astype(np.int32).tolist()
+        confidences = np.asarray(confidences).tolist()
+        colors, default_color, sizes = self.colors, self.default_color, self._label_sizes
+        font_scale, text_color, text_thickness = self.font_scale, self.text_color, self.text_thickness
+        box_thickness, pad = self.box_thickness, self.padding
+        font = cv2.FONT_HERSHEY_SIMPLEX
+
+        for (x1, y1, x2, y2), confidence, name in zip(boxes, confidences, names):
+            color = colors.get(name, default_color)
+            size = sizes.get(name) or self.label_size(name)
+
+            cv2.rectangle(image, (x1, y1), (x2, y2), color, box_thickness)
+            cv2.rectangle(image, (x1, y1 - size[1] - 10 - pad), (x1 + size[0] + 2 * pad, y1), color, -1)
+            cv2.putText(image, f"{name}: {confidence:.2f}", (x1 + pad, y1 - 5),
+                        font, font_scale, text_color, text_thickness)
+
+        if self.show_total:
+            cv2.putText(image, f"Total Detections: {len(boxes)}", (10, 30),
+                        cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+        return len(boxes)
+
+    def draw_result(self, image, result):
+        """Draw a DetectionResult onto image in place"""
+        return self.draw(image, result.boxes, result.confidences, result.labels)
+
+
+# The one style used for uploads, captures and live frames alike
+renderer = AnnotationRenderer()
+
+
+def render_image(input_path, result):
+    """
+    Draw a DetectionResult onto the image at input_path
+    Returns:
+        numpy.ndarray: Annotated BGR image
+    """
+    image = cv2.imread(input_path)
+    if image is None:
+        raise ValueError("Could not load input image")
+    renderer.draw_result(image, result)
+    return image
@@ -0,0 +1,141 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError
+
+
+class BatchInferenceEngine:
+    def __init__(self, detector, max_batch_size=8, batch_window=0.01):
+        """
+        Micro-batching wrapper around YOLODetector.detect_batch
+        Args:
+            detector: YOLODetector used for inference, or a DetectorService that loads it on first use
+            max_batch_size: Maximum number of frames per forward pass
+            batch_window: Seconds to wait for more frames after the first one arrives
+        """
+        self.detector = detector
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.batch_window = max(0.0, float(batch_window))
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._running = False
+
+        # Counters for /health and the benchmark script
+        self._batches = 0
+        self._frames = 0
+        self._inference_time = 0.0
+
+    def start(self):
+        """Start the batching thread if it is not running yet"""
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+            self._thread = threading.Thread(
+                target=self._run, name='yolo-batch-engine', daemon=True
+            )
+            self._thread.start()
+
+    def stop(self, timeout=5):
+        """Stop the batching thread after the queued frames are processed"""
+        with self._lock:
+            if not self._running:
+                return
+            self._running = False
+            self._queue.put(None)
+            thread = self._thread
+        thread.join(timeout)
+
+    def submit(self, image):
+        """
+        Queue a frame for batched inference
+        Args:
+            image: PIL image or numpy array
+        Returns:
+            Future: Resolves to the detect_image() style result for this frame
+        """
+        if not self._running:
+            self.start()
+
+        future = Future()
+        self._queue.put((image, future))
+        return future
+
+    def detect(self, image, timeout=None):
+        """Blocking helper: submit a frame and wait for its detections"""
+        future = self.submit(image)
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            # Not inferred if it is still queued (see _run)
+            future.cancel()
+            raise
+
+    def stats(self):
+        with self._lock:
+            batches = self._batches
+            frames = self._frames
+            inference_time = self._inference_time
+
+        return {
+            'max_batch_size': self.max_batch_size,
+            'batch_window_ms': self.batch_window * 1000,
+            'batches': batches,
+            'frames': frames,
+            'avg_batch_size': (frames / batches) if batches else 0,
+            'avg_batch_time': (inference_time / batches) if batches else 0,
+            'queue_depth': self._queue.qsize()
+        }
+
+    def _collect_batch(self):
+        """Block for one frame, then gather more until the window closes or the batch is full"""
+        item = self._queue.get()
+        if item is None:
+            return None
+
+        batch = [item]
+        deadline = time.monotonic() + self.batch_window
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                # Shutdown sentinel: finish this batch, then let the loop exit
+                self._queue.put(None)
+                break
+            batch.append(item)
+
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            if batch is None:
+                break
+
+            # Skip frames whose callers already gave up
+            batch = [(image, future) for image, future in batch if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            start_time = time.time()
+            try:
+                results = self.detector.detect_batch([image for image, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            elapsed = time.time() - start_time
+
+            with self._lock:
+                self._batches += 1
+                self._frames += len(batch)
+                self._inference_time += elapsed
+
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
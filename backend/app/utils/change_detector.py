@@ -0,0 +1,88 @@
+import threading
+import time
+
+import cv2
+import numpy as np
+
+
+class ChangeDetector:
+    """
+    Cheap scene-change gate in front of YOLO. Each frame is reduced to a small
+    grayscale thumbnail and compared with the last frame that was actually
+    inferred for the same camera; if the mean absolute difference stays under
+    the threshold the previous detections are reused.
+    """
+
+    def __init__(self, threshold=3.0, size=32, max_reuse_age=10.0):
+        """
+        Args:
+            threshold: Mean absolute gray-level difference (0-255) that counts as a change, 0 disables the gate
+            size: Side of the square thumbnail used for the comparison
+            max_reuse_age: Seconds after which inference runs again even on a static scene
+        """
+        self.threshold = float(threshold)
+        self.size = int(size)
+        self.max_reuse_age = float(max_reuse_age)
+
+        self._lock = threading.Lock()
+        self._last = {}  # camera_id -> (signature, results, inferred_at)
+        self._checked = 0
+        self._skipped = 0
+
+    @property
+    def enabled(self):
+        return self.threshold > 0
+
+    def signature(self, frame):
+        """Downscaled grayscale thumbnail of a BGR frame"""
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        return cv2.resize(gray, (self.size, self.size), interpolation=cv2.INTER_AREA).astype(np.int16)
+
+    def detect(self, camera_id, frame, detect):
+        """
+        Run detect(frame) only if the scene changed since the last inferred frame
+        Args:
+            camera_id: Camera the frame came from
+            frame: BGR ndarray
+            detect: Callable running the real inference
+        Returns:
+            DetectionResult: detect() results, marked reused when inference was skipped
+        """
+        if not self.enabled:
+            return detect(frame)
+
+        signature = self.signature(frame)
+        now = time.time()
+
+        with self._lock:
+            self._checked += 1
+            last = self._last.get(camera_id)
+
+        if last is not None:
+            last_signature, last_results, inferred_at = last
+            change = float(np.abs(signature - last_signature).mean())
+            if change < self.threshold and now - inferred_at < self.max_reuse_age:
+                with self._lock:
+                    self._skipped += 1
+                return last_results.as_reused()
+
+        results = detect(frame)
+        with self._lock:
+            self._last[camera_id] = (signature, results, now)
+        return results
+
+    def reset(self, camera_id=None):
+        with self._lock:
+            if camera_id is None:
+                self._last.clear()
+            else:
+                self._last.pop(camera_id, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'threshold': self.threshold,
+                'frames_checked': self._checked,
+                'inferences_saved': self._skipped,
+                'saved_ratio': (self._skipped / self._checked) if self._checked else 0
+            }
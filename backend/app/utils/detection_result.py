@@ -0,0 +1,66 @@
+import numpy as np
+
+# Bumped whenever the serialized format changes, so cached results are not reused across formats
+RESULT_SCHEMA = 2
+
+
+class DetectionResult:
+    """
+    Detections of one image, kept as arrays until they leave the process
+
+    Every endpoint serializes it with to_dict(), which is computed once:
+        {
+            'detections': [{'label', 'class_id', 'confidence', 'bbox': [x1, y1, x2, y2]}],
+            'confidence_scores': [...],
+            'classes': [label, ...],
+            'total_detections': N
+        }
+    """
+
+    def __init__(self, boxes, confidences, class_ids, labels, reused=False):
+        """
+        Args:
+            boxes: (N, 4) x1, y1, x2, y2 in image pixels
+            confidences: (N,) scores
+            class_ids: (N,) model class ids
+            labels: N class names
+            reused: Results of an earlier frame, returned because the scene did not change
+        """
+        self.boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        self.confidences = np.asarray(confidences, dtype=np.float32).reshape(-1)
+        self.class_ids = np.asarray(class_ids, dtype=np.int64).reshape(-1)
+        self.labels = list(labels)
+        self.reused = reused
+        self._dict = None
+
+    @classmethod
+    def empty(cls):
+        return cls(np.empty((0, 4)), np.empty(0), np.empty(0), [])
+
+    def __len__(self):
+        return len(self.labels)
+
+    def as_reused(self):
+        """The same detections, marked as reused for a later frame (shares the arrays)"""
+        result = DetectionResult.__new__(DetectionResult)
+        result.__dict__.update(self.__dict__)
+        result.reused = True
+        return result
+
+    def to_dict(self):
+        """JSON-ready results, built on first call and shared afterwards"""
+        if self._dict is None:
+            confidences = self.confidences.tolist()
+            detections = [
+                {'label': label, 'class_id': class_id, 'confidence': confidence, 'bbox': bbox}
+                for label, class_id, confidence, bbox in zip(
+                    self.labels, self.class_ids.tolist(), confidences, self.boxes.astype(np.int64).tolist()
+                )
+            ]
+            self._dict = {
+                'detections': detections,
+                'confidence_scores': confidences,
+                'classes': self.labels,
+                'total_detections': len(detections)
+            }
+        return self._dict
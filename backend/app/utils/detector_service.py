@@ -0,0 +1,180 @@
+import os
+import threading
+import time
+
+import numpy as np
+
+from .inference_profiles import LIVE, UPLOAD
+
+
+class DetectorService:
+    """
+    Owns the process's YOLODetector. Nothing is imported or loaded until the
+    detector is first needed; it is then warmed up with dummy frames at the
+    camera resolution, so the first real request does not pay for a cold graph.
+
+    With a server address the detector is a ModelClient of the model server
+    instead, which holds the only (already warm) copy of the model.
+    """
+
+    def __init__(self, model_path, warmup_size=(800, 600), warmup_batch=1, warmup_runs=2,
+                 backend='pytorch', int8_data=None, conf=0.5, iou=0.45,
+                 server_address=None, server_authkey=None):
+        """
+        Args:
+            model_path: Path to the trained model (best.pt)
+            warmup_size: (width, height) of the dummy frames, the production input size
+            warmup_batch: Also warm a batch of this many frames (the batch engine's maximum)
+            warmup_runs: Passes per warm-up shape, 0 skips the warm-up
+            backend: YOLODetector inference backend (pytorch, onnx, openvino, ...)
+            int8_data: Calibration dataset YAML for the openvino-int8 backend
+            conf: Confidence threshold of every endpoint
+            iou: NMS IoU threshold of every endpoint
+            server_address: Model server socket path or 'host:port', None loads the model here
+            server_authkey: Shared secret of the model server
+        """
+        self.model_path = model_path
+        self.backend = backend
+        self.int8_data = int8_data
+        self.conf = conf
+        self.iou = iou
+        self.server_address = server_address
+        self.server_authkey = server_authkey
+        self.warmup_size = warmup_size
+        self.warmup_batch = max(1, int(warmup_batch))
+        self.warmup_runs = max(0, int(warmup_runs))
+
+        self._detector = None
+        self._lock = threading.Lock()
+        self._thread_lock = threading.Lock()  # not held while loading, so start() never blocks
+        self._thread = None
+        self._warmed = False
+        self._error = None
+        self._load_time = None
+        self._warmup_time = None
+
+    def get(self):
+        """
+        The loaded and warmed-up detector, built on first call (blocks while
+        another thread is building it)
+        """
+        detector = self._detector
+        if detector is not None and self._warmed:
+            return detector
+
+        with self._lock:
+            if self._detector is None:
+                start = time.time()
+                try:
+                    if self.server_address:
+                        # Waits for the server, which loads and warms up the model itself
+                        from .model_server import ModelClient
+                        self._detector = ModelClient(self.server_address, self.server_authkey)
+                        self._warmed = True
+                    else:
+                        # Imports ultralytics/torch, exports if needed and loads the weights
+                        from .yolo_detector import YOLODetector
+                        self._detector = YOLODetector(
+                            self.model_path, conf=self.conf, iou=self.iou,
+                            backend=self.backend, int8_data=self.int8_data
+                        )
+                except Exception as e:
+                    self._error = str(e)
+                    raise
+                self._load_time = time.time() - start
+
+            if not self._warmed:
+                self._warm_up(self._detector)
+                self._warmed = True
+            return self._detector
+
+    def _warm_up(self, detector):
+        if not (detector.is_model_loaded and detector.model) or not self.warmup_runs:
+            return
+
+        start = time.time()
+        width, height = self.warmup_size
+        frame = np.full((height, width, 3), 114, dtype=np.uint8)
+        try:
+            for _ in range(self.warmup_runs):
+                detector.detect_batch([frame])
+                if self.warmup_batch > 1:
+                    detector.detect_batch([frame] * self.warmup_batch)
+                # Uploads run at their own (larger) input size
+                detector.detect_batch([frame], profile=UPLOAD)
+        except Exception as e:
+            # A failed warm-up only costs latency, the detector itself is usable
+            print(f"Detector warm-up failed: {e}")
+        self._warmup_time = time.time() - start
+        print(f"✓ Detector warmed up in {self._warmup_time:.2f}s")
+
+    def start(self):
+        """Load and warm up in a background thread, if that has not happened yet"""
+        if self._warmed:
+            return
+        with self._thread_lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._load_in_background, name='detector-loader', daemon=True)
+            self._thread.start()
+
+    def _load_in_background(self):
+        try:
+            self.get()
+        except Exception as e:
+            print(f"Could not load detector: {e}")
+
+    def detect_batch(self, images, profile=LIVE):
+        """YOLODetector.detect_batch on the shared detector (used by the batch engine)"""
+        return self.get().detect_batch(images, profile)
+
+    @property
+    def ready(self):
+        """Loaded, warmed up and backed by real weights (not the placeholder detector)"""
+        detector = self._detector
+        return detector is not None and self._warmed and bool(detector.is_model_loaded)
+
+    def state(self):
+        detector = self._detector
+        return {
+            'ready': self.ready,
+            'loaded': detector is not None,
+            'model_loaded': bool(detector is not None and detector.is_model_loaded),
+            'backend': self.backend,
+            'server': self.server_address,
+            'conf': self.conf,
+            'iou': self.iou,
+            'weights': detector.loaded_weights if detector is not None else None,
+            'warmed_up': self._warmed,
+            'loading': self._thread is not None and self._thread.is_alive(),
+            'error': self._error,
+            'load_seconds': self._load_time,
+            'warmup_seconds': self._warmup_time,
+            'warmup_size': list(self.warmup_size),
+            'profiles': {
+                name: profile.as_dict() for name, profile in detector.profiles.items()
+            } if detector is not None else None
+        }
+
+
+def create_detector_service(model_path, warmup_batch=1, server_address=None):
+    """
+    Build the service from DETECTION_WARMUP_SIZE (WxH) / DETECTION_WARMUP_RUNS
+    DETECTION_BACKEND / DETECTION_INT8_DATA and DETECTION_CONF / DETECTION_IOU.
+    With DETECTION_SERVER_ADDRESS set the model is used through the model server
+    (authenticated with DETECTION_SERVER_AUTHKEY); pass server_address='' to
+    load it in this process, as the server itself does.
+    """
+    width, height = (int(v) for v in os.getenv('DETECTION_WARMUP_SIZE', '800x600').lower().split('x'))
+    return DetectorService(
+        model_path,
+        warmup_size=(width, height),
+        warmup_batch=warmup_batch,
+        warmup_runs=int(os.getenv('DETECTION_WARMUP_RUNS', 2)),
+        backend=os.getenv('DETECTION_BACKEND', 'pytorch'),
+        int8_data=os.getenv('DETECTION_INT8_DATA') or None,
+        conf=float(os.getenv('DETECTION_CONF', 0.5)),
+        iou=float(os.getenv('DETECTION_IOU', 0.45)),
+        server_address=os.getenv('DETECTION_SERVER_ADDRESS') if server_address is None else server_address,
+        server_authkey=(os.getenv('DETECTION_SERVER_AUTHKEY') or '').encode() or None
+    )
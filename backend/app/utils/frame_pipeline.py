@@ -0,0 +1,90 @@
+import base64
+import time
+from contextlib import contextmanager
+
+import cv2
+import numpy as np
+
+from .annotation import renderer
+
+
+class StageTimer:
+    """Collects per-stage wall times (in milliseconds) for one frame"""
+
+    def __init__(self):
+        self.timings = {}
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[f'{name}_ms'] = (time.perf_counter() - start) * 1000
+
+
+def decode_frame(image_bytes):
+    """
+    Decode a JPEG/PNG buffer straight to a BGR ndarray
+    Args:
+        image_bytes: Encoded image (bytes, bytearray or memoryview)
+    Returns:
+        np.ndarray: HxWx3 BGR image, the layout the YOLO model and OpenCV both expect
+    """
+    image = cv2.imdecode(np.frombuffer(image_bytes, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError('Could not decode image')
+    return image
+
+
+def encode_frame(image, quality=95):
+    """Encode a BGR ndarray as JPEG bytes"""
+    ok, buffer = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not ok:
+        raise ValueError('Could not encode image')
+    return buffer.tobytes()
+
+
+def process_frame(image_bytes, detect, encode=True):
+    """
+    Decode once, detect, annotate and encode one camera frame
+    Args:
+        image_bytes: JPEG bytes as received from the camera
+        detect: Callable taking a BGR ndarray and returning a DetectionResult
+                (marked reused when earlier detections were returned instead)
+        encode: Also produce the annotated JPEG (and its base64 form)
+    Returns:
+        dict: result, its serialized detections, annotated frame, raw JPEG, timings and encoded output
+    """
+    timer = StageTimer()
+
+    with timer.stage('decode'):
+        frame = decode_frame(image_bytes)
+
+    with timer.stage('infer'):
+        result = detect(frame)
+
+    # The model has its own letterboxed copy, so the decoded buffer is drawn on directly.
+    # The untouched original is still available as the camera's JPEG bytes.
+    with timer.stage('annotate'):
+        object_count = renderer.draw_result(frame, result)
+
+    annotated_jpeg = None
+    annotated_base64 = None
+    if encode:
+        with timer.stage('encode'):
+            annotated_jpeg = encode_frame(frame)
+            annotated_base64 = base64.b64encode(annotated_jpeg).decode('utf-8')
+
+    return {
+        'result': result,
+        'detections': result.to_dict()['detections'],
+        'reused': result.reused,
+        'object_count': object_count,
+        'processed_image': frame,
+        'raw_jpeg': bytes(image_bytes),
+        'annotated_jpeg': annotated_jpeg,
+        'annotated_base64': annotated_base64,
+        'processing_time': timer.timings['infer_ms'] / 1000,
+        'timings': timer.timings
+    }
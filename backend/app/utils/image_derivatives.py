@@ -0,0 +1,128 @@
+import hashlib
+import os
+import tempfile
+
+import cv2
+import numpy as np
+
+# Longest side in pixels of each derivative size
+DEFAULT_SIZES = {'thumb': 320, 'medium': 1024}
+
+
+def resize_to_fit(image, max_side):
+    """Downscale a BGR image so its longest side is at most max_side (never upscales)"""
+    height, width = image.shape[:2]
+    scale = max_side / max(height, width)
+    if scale >= 1:
+        return image
+    size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    return cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+
+
+class DerivativeCache:
+    """
+    Downscaled JPEG copies of stored images (thumbnails for the history grid,
+    medium for the detail view), kept in an on-disk cache. Derivatives are
+    named after the source content hash, so an entry never goes stale and can
+    be regenerated at any time.
+    """
+
+    def __init__(self, store, cache_dir, sizes=None, quality=80):
+        """
+        Args:
+            store: ImageStore the source images are read from
+            cache_dir: Directory for the generated files
+            sizes: {name: longest side in pixels}
+            quality: JPEG quality of the derivatives
+        """
+        self.store = store
+        self.cache_dir = cache_dir
+        self.sizes = dict(sizes or DEFAULT_SIZES)
+        self.quality = quality
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def version(self, ref):
+        """
+        Identity of a stored image's content, used for derivative names and ETags
+        Returns:
+            str: Content hash for store keys; path + mtime + size hash for legacy files
+        """
+        content_hash = self.store.content_hash(ref)
+        if content_hash is not None:
+            return content_hash
+        stat = os.stat(ref)
+        return hashlib.sha1(f"{ref}|{stat.st_mtime_ns}|{stat.st_size}".encode()).hexdigest()
+
+    def path_for(self, version, size):
+        return os.path.join(self.cache_dir, size, version[:2], version[2:4], f"{version}.jpg")
+
+    def get(self, ref, size):
+        """
+        Local file of a derivative, generated on first request
+        Returns:
+            str: Path of the JPEG
+        """
+        if size not in self.sizes:
+            raise ValueError(f"Unknown image size '{size}', expected one of {', '.join(self.sizes)}")
+
+        path = self.path_for(self.version(ref), size)
+        if not os.path.exists(path):
+            image = cv2.imread(self.store.local_path(ref))
+            if image is None:
+                raise ValueError('Could not read image')
+            self._write(path, resize_to_fit(image, self.sizes[size]))
+        return path
+
+    def generate(self, ref, image=None, data=None):
+        """
+        Create every derivative of a freshly stored image
+        Args:
+            image: Decoded BGR image if the caller has it, else data: encoded bytes
+        """
+        version = self.version(ref)
+        missing = {size: self.path_for(version, size) for size in self.sizes}
+        missing = {size: path for size, path in missing.items() if not os.path.exists(path)}
+        if not missing:
+            return
+
+        if image is None:
+            if data is not None:
+                image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+            else:
+                image = cv2.imread(self.store.local_path(ref))
+            if image is None:
+                raise ValueError('Could not decode image')
+
+        for size, path in missing.items():
+            self._write(path, resize_to_fit(image, self.sizes[size]))
+
+    def _write(self, path, image):
+        ok, buffer = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        if not ok:
+            raise ValueError('Could not encode image')
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Concurrent requests may render the same derivative; each renames a complete file
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(buffer.tobytes())
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+def create_derivative_cache(store):
+    """Build the cache from IMAGE_DERIVATIVE_DIR / IMAGE_THUMB_SIZE / IMAGE_MEDIUM_SIZE"""
+    cache_dir = os.getenv('IMAGE_DERIVATIVE_DIR') or os.path.join(
+        os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+        'instance', 'static', 'derivatives'
+    )
+    sizes = {
+        'thumb': int(os.getenv('IMAGE_THUMB_SIZE', DEFAULT_SIZES['thumb'])),
+        'medium': int(os.getenv('IMAGE_MEDIUM_SIZE', DEFAULT_SIZES['medium']))
+    }
+    return DerivativeCache(store, cache_dir, sizes=sizes,
+                           quality=int(os.getenv('IMAGE_DERIVATIVE_QUALITY', 80)))
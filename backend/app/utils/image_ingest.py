@@ -0,0 +1,201 @@
+import io
+import mmap
+import os
+import struct
+from contextlib import contextmanager
+
+# Bytes read from a raw request body before its header is checked
+SNIFF_BYTES = 64 * 1024
+
+# JPEG start-of-frame markers (baseline, progressive, lossless, arithmetic); they carry the size
+_JPEG_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+# Markers without a length field
+_JPEG_STANDALONE = {0x01, 0xD0, 0xD1, 0xD2, 0xD3, 0xD4, 0xD5, 0xD6, 0xD7, 0xD8}
+
+
+class ImageRejected(ValueError):
+    """An upload that is not an accepted image, or is too large to decode"""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _sniff_jpeg(header):
+    pos = 2
+    while True:
+        # Skip fill bytes up to the next marker
+        while pos < len(header) and header[pos] == 0xFF:
+            pos += 1
+        if pos >= len(header):
+            return None
+        if header[pos - 1] != 0xFF:
+            raise ImageRejected('Corrupt JPEG header')
+        marker = header[pos]
+        pos += 1
+        if marker in _JPEG_STANDALONE:
+            continue
+        if marker in (0xD9, 0xDA):
+            raise ImageRejected('JPEG has no frame header')
+        if pos + 2 > len(header):
+            return None
+        length = struct.unpack_from('>H', header, pos)[0]
+        if length < 2:
+            raise ImageRejected('Corrupt JPEG header')
+        if marker in _JPEG_SOF:
+            if pos + 7 > len(header):
+                return None
+            height, width = struct.unpack_from('>HH', header, pos + 3)
+            return 'jpeg', width, height
+        pos += length
+
+
+def _sniff_webp(header):
+    if len(header) < 30:
+        return None
+    chunk = bytes(header[12:16])
+    if chunk == b'VP8X':
+        width = 1 + int.from_bytes(header[24:27], 'little')
+        height = 1 + int.from_bytes(header[27:30], 'little')
+    elif chunk == b'VP8L':
+        bits = int.from_bytes(header[21:25], 'little')
+        width, height = 1 + (bits & 0x3FFF), 1 + ((bits >> 14) & 0x3FFF)
+    elif chunk == b'VP8 ':
+        width, height = struct.unpack_from('<HH', header, 26)
+        width, height = width & 0x3FFF, height & 0x3FFF
+    else:
+        raise ImageRejected('Unsupported WebP image')
+    return 'webp', width, height
+
+
+def sniff_image(header, formats=None):
+    """
+    Format and dimensions of an encoded image, read from its first bytes only
+    Args:
+        header: Leading bytes of the file (bytes, bytearray or memoryview)
+        formats: Accepted formats, default all of jpeg, png, gif, bmp, webp
+    Returns:
+        tuple: (format, width, height), or None if more bytes are needed
+    Raises:
+        ImageRejected: Not an image of an accepted format
+    """
+    if len(header) < 12:
+        return None
+
+    if header[0] == 0xFF and header[1] == 0xD8:
+        info = _sniff_jpeg(header)
+    elif bytes(header[:8]) == b'\x89PNG\r\n\x1a\n':
+        if len(header) < 24:
+            return None
+        if bytes(header[12:16]) != b'IHDR':
+            raise ImageRejected('Corrupt PNG header')
+        info = ('png',) + struct.unpack_from('>II', header, 16)
+    elif bytes(header[:6]) in (b'GIF87a', b'GIF89a'):
+        info = ('gif',) + struct.unpack_from('<HH', header, 6)
+    elif bytes(header[:2]) == b'BM':
+        if len(header) < 26:
+            return None
+        width, height = struct.unpack_from('<ii', header, 18)
+        info = ('bmp', width, abs(height))
+    elif bytes(header[:4]) == b'RIFF' and bytes(header[8:12]) == b'WEBP':
+        info = _sniff_webp(header)
+    else:
+        raise ImageRejected('Not a supported image')
+
+    if info is None:
+        return None
+    if formats is not None and info[0] not in formats:
+        raise ImageRejected(f'Unsupported image format: {info[0]}')
+    return info
+
+
+def check_image(header, max_pixels, formats=None):
+    """
+    Validate an image from its header
+    Returns:
+        tuple: (format, width, height)
+    Raises:
+        ImageRejected: Bogus header, or more than max_pixels pixels (413)
+    """
+    info = sniff_image(header, formats)
+    if info is None:
+        raise ImageRejected('Truncated image header')
+    return _check_dimensions(info, max_pixels)
+
+
+def _check_dimensions(info, max_pixels):
+    _, width, height = info
+    if width <= 0 or height <= 0:
+        raise ImageRejected('Image has no pixels')
+    if width * height > max_pixels:
+        raise ImageRejected(f'Image is too large ({width}x{height}), maximum is {max_pixels} pixels', 413)
+    return info
+
+
+@contextmanager
+def upload_buffer(file):
+    """
+    Contents of an uploaded file as a memoryview, without copying it.
+    Werkzeug spools uploads to a BytesIO or a temporary file; the first is
+    exposed directly, the second is memory-mapped.
+    """
+    stream = file.stream
+    # SpooledTemporaryFile keeps the BytesIO or file it currently writes to in _file
+    raw = getattr(stream, '_file', stream)
+
+    mapped = None
+    if isinstance(raw, io.BytesIO):
+        view = raw.getbuffer()
+    else:
+        try:
+            fileno = raw.fileno()
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            fileno = None
+        if fileno is not None and os.fstat(fileno).st_size > 0:
+            mapped = mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+            view = memoryview(mapped)
+        else:
+            stream.seek(0)
+            view = memoryview(stream.read())
+
+    try:
+        yield view
+    finally:
+        view.release()
+        if mapped is not None:
+            mapped.close()
+
+
+def read_body(stream, content_length, max_bytes, max_pixels, formats=None):
+    """
+    Read a raw image request body (Content-Type image/jpeg or image/png),
+    checking the header before the rest of the body is read
+    Returns:
+        tuple: (memoryview of the body, (format, width, height))
+    Raises:
+        ImageRejected: Missing/oversized body or a bad header
+    """
+    if not content_length:
+        raise ImageRejected('Request body is empty', 411 if content_length is None else 400)
+    if content_length > max_bytes:
+        raise ImageRejected(f'Image is too large, maximum is {max_bytes} bytes', 413)
+
+    # One preallocated buffer, filled in place straight from the socket
+    buffer = bytearray(content_length)
+    view = memoryview(buffer)
+    received = 0
+    info = None
+    while received < content_length:
+        count = stream.readinto(view[received:])
+        if not count:
+            raise ImageRejected('Request body ended early')
+        received += count
+        if info is None and received >= min(SNIFF_BYTES, content_length):
+            # None while the header continues (e.g. behind a large EXIF block)
+            info = sniff_image(view[:received], formats)
+            if info is not None:
+                _check_dimensions(info, max_pixels)
+
+    if info is None:
+        raise ImageRejected('Truncated image header')
+    return view, info
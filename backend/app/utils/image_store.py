@@ -0,0 +1,263 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+
+from .image_ingest import ImageRejected, sniff_image
+
+# backend/instance, the same folder Flask uses as instance_path for the app package
+_INSTANCE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'instance')
+
+
+# Key extension of each sniffed format, so the same bytes get one key whatever they were named
+FORMAT_EXTENSIONS = {'jpeg': 'jpg', 'png': 'png', 'gif': 'gif', 'bmp': 'bmp', 'webp': 'webp'}
+
+
+def image_extension(header, default='jpg'):
+    """Key extension of encoded image bytes (or their first chunk), default if not recognised"""
+    try:
+        info = sniff_image(header)
+    except ImageRejected:
+        info = None
+    return FORMAT_EXTENSIONS[info[0]] if info else default
+
+
+class LocalBackend:
+    """Objects stored as files below a root directory"""
+
+    def __init__(self, root):
+        self.root = root
+        # Same filesystem as the objects, so finished files can be renamed into place
+        self.tmp_dir = os.path.join(root, 'tmp')
+        os.makedirs(self.tmp_dir, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.root, *key.split('/'))
+
+    def exists(self, key):
+        return os.path.exists(self._path(key))
+
+    def put_file(self, key, source_path):
+        """Move a finished temporary file into place"""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(source_path, path)
+
+    def local_path(self, key):
+        return self._path(key)
+
+
+class LocalS3Client:
+    """
+    Directory-backed stand-in for the subset of the boto3 S3 client used by
+    S3Backend, so the object-store code path runs without an S3 server.
+    """
+
+    class NoSuchKey(Exception):
+        pass
+
+    def __init__(self, root):
+        self.root = root
+
+    def _path(self, bucket, key):
+        return os.path.join(self.root, bucket, *key.split('/'))
+
+    def head_object(self, Bucket, Key):
+        path = self._path(Bucket, Key)
+        if not os.path.exists(path):
+            raise self.NoSuchKey(Key)
+        return {'ContentLength': os.path.getsize(path)}
+
+    def upload_file(self, Filename, Bucket, Key):
+        path = self._path(Bucket, Key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        shutil.copyfile(Filename, path)
+
+    def download_file(self, Bucket, Key, Filename):
+        path = self._path(Bucket, Key)
+        if not os.path.exists(path):
+            raise self.NoSuchKey(Key)
+        shutil.copyfile(path, Filename)
+
+
+class S3Backend:
+    """
+    Objects in an S3-compatible bucket. Readers get a local copy kept in
+    cache_dir; objects are immutable (content-addressed), so the copy never goes stale.
+    """
+
+    def __init__(self, client, bucket, cache_dir, prefix=''):
+        self.client = client
+        self.bucket = bucket
+        self.cache_dir = cache_dir
+        self.prefix = prefix
+        self.tmp_dir = os.path.join(cache_dir, 'tmp')
+        os.makedirs(self.tmp_dir, exist_ok=True)
+
+    def _object_key(self, key):
+        return f"{self.prefix}{key}"
+
+    def exists(self, key):
+        if os.path.exists(self._cache_path(key)):
+            return True
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+            return True
+        except Exception:
+            return False
+
+    def put_file(self, key, source_path):
+        self.client.upload_file(source_path, self.bucket, self._object_key(key))
+        # Keep the uploaded file as the local copy
+        path = self._cache_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(source_path, path)
+
+    def _cache_path(self, key):
+        return os.path.join(self.cache_dir, *key.split('/'))
+
+    def local_path(self, key):
+        path = self._cache_path(key)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            self.client.download_file(self.bucket, self._object_key(key), tmp_path)
+            os.replace(tmp_path, path)
+        return path
+
+
+class ImageStore:
+    """
+    Content-addressed image storage. Every image is stored once under the
+    SHA-256 of its bytes, in two levels of shard directories:
+        ab/cd/abcd1234....jpg
+    Detection rows keep this key. Paths written before the store existed are
+    absolute and are still resolved as plain files.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    @staticmethod
+    def key_for_digest(digest, ext):
+        return f"{digest[:2]}/{digest[2:4]}/{digest}.{ext.lower().lstrip('.')}"
+
+    def key_for(self, data, default_ext='jpg'):
+        """Key the given bytes will be stored under, with the extension of their sniffed format"""
+        return self.key_for_digest(hashlib.sha256(data).hexdigest(), image_extension(data, default_ext))
+
+    @staticmethod
+    def is_key(ref):
+        return bool(ref) and not os.path.isabs(ref)
+
+    @staticmethod
+    def content_hash(ref):
+        """SHA-256 of a stored image, read from its key (None for legacy paths)"""
+        if not ImageStore.is_key(ref):
+            return None
+        return os.path.basename(ref).split('.', 1)[0]
+
+    def put_bytes(self, data, default_ext='jpg'):
+        """
+        Store encoded image bytes
+        Args:
+            default_ext: Key extension if the bytes are not a recognised image format
+        Returns:
+            str: Storage key; identical content is stored once
+        """
+        key = self.key_for(data, default_ext)
+        if self.backend.exists(key):
+            return key
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.backend.tmp_dir)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        self._commit(key, tmp_path)
+        return key
+
+    def put_stream(self, stream, default_ext='jpg', chunk_size=1024 * 1024):
+        """Store a file-like object, hashing it while it is spooled to disk"""
+        digest = hashlib.sha256()
+        header = None
+        fd, tmp_path = tempfile.mkstemp(dir=self.backend.tmp_dir)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in iter(lambda: stream.read(chunk_size), b''):
+                    if header is None:
+                        header = chunk
+                    digest.update(chunk)
+                    f.write(chunk)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+
+        key = self.key_for_digest(digest.hexdigest(), image_extension(header or b'', default_ext))
+        if self.backend.exists(key):
+            os.remove(tmp_path)
+            return key
+        self._commit(key, tmp_path)
+        return key
+
+    def _commit(self, key, tmp_path):
+        try:
+            self.backend.put_file(key, tmp_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def exists(self, ref):
+        if not ref:
+            return False
+        if not self.is_key(ref):
+            return os.path.exists(ref)
+        return self.backend.exists(ref)
+
+    def local_path(self, ref):
+        """
+        Filesystem path of a stored image (fetched into the local cache for object stores)
+        Returns:
+            str: Path, or None for an empty reference
+        """
+        if not ref:
+            return None
+        if not self.is_key(ref):
+            return ref
+        return self.backend.local_path(ref)
+
+
+def create_image_store(backend=None, root=None):
+    """
+    Build the store from IMAGE_STORE_BACKEND / IMAGE_STORE_DIR
+    Args:
+        backend: 'local' (default), 's3' (needs boto3 and IMAGE_STORE_BUCKET) or
+                 's3-local' (directory-backed S3 stand-in)
+    """
+    backend = backend or os.getenv('IMAGE_STORE_BACKEND', 'local')
+    root = root or os.getenv('IMAGE_STORE_DIR') or os.path.join(_INSTANCE_DIR, 'static', 'images')
+
+    if backend == 's3':
+        import boto3
+        client = boto3.client('s3', endpoint_url=os.getenv('IMAGE_STORE_ENDPOINT') or None)
+        return ImageStore(S3Backend(client, os.getenv('IMAGE_STORE_BUCKET', 'kopi-images'),
+                                    cache_dir=os.path.join(root, 'cache'),
+                                    prefix=os.getenv('IMAGE_STORE_PREFIX', '')))
+    if backend == 's3-local':
+        return ImageStore(S3Backend(LocalS3Client(os.path.join(root, 'objects')),
+                                    os.getenv('IMAGE_STORE_BUCKET', 'kopi-images'),
+                                    cache_dir=os.path.join(root, 'cache')))
+    return ImageStore(LocalBackend(root))
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_image_store():
+    """Process-wide ImageStore, created on first use"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = create_image_store()
+    return _store
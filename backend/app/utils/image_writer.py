@@ -0,0 +1,194 @@
+import atexit
+import os
+import queue
+import threading
+import time
+
+import cv2
+
+_STOP = object()
+
+
+class _WriteJob:
+    def __init__(self, path, data, image, quality, on_done, key, store):
+        self.path = path
+        self.store = store
+        self.data = data
+        self.image = image
+        self.quality = quality
+        self.on_done = on_done
+        self.key = key
+
+
+class BackgroundImageWriter:
+    """
+    Encodes and persists images off the request thread. The queue is bounded:
+    when it is full the caller waits briefly and then writes inline, so a
+    write is never dropped. Pending writes are flushed on interpreter exit.
+    """
+
+    def __init__(self, max_queue=64, workers=2, put_timeout=0.5):
+        """
+        Args:
+            max_queue: Writes that may wait in the queue
+            workers: Writer threads, 0 writes synchronously in the caller
+            put_timeout: Seconds to wait for a queue slot before writing inline
+        """
+        self.workers = max(0, int(workers))
+        self.put_timeout = put_timeout
+
+        self._queue = queue.Queue(maxsize=max(1, int(max_queue)))
+        self._threads = []
+        self._lock = threading.Lock()
+        self._pending = {}  # key -> Event set once the write and its callback finished
+        self._closed = False
+        self._written = 0
+        self._failed = 0
+        self._inline = 0
+        self._total_time = 0.0
+
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f'image-writer-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+        if self.workers:
+            atexit.register(self.close)
+
+    def submit(self, path=None, data=None, image=None, quality=95, on_done=None, key=None, store=None):
+        """
+        Queue an image write
+        Args:
+            path: Destination file, when not writing to a store
+            data: Already encoded bytes, written as-is
+            image: BGR ndarray, JPEG-encoded by the writer (used when data is None)
+            quality: JPEG quality for image
+            on_done: Called as on_done(location, error) from the writer thread once the
+                     file is in place (error is None) or the write failed; location is
+                     the path, or the storage key when writing to a store
+            key: Optional handle for wait(), e.g. (detection id, column)
+            store: ImageStore to put the JPEG into instead of a fixed path
+        """
+        job = _WriteJob(path, data, image, quality, on_done, key, store)
+        if key is not None:
+            with self._lock:
+                self._pending[key] = threading.Event()
+
+        if self.workers and not self._closed:
+            try:
+                self._queue.put(job, timeout=self.put_timeout)
+                return
+            except queue.Full:
+                pass
+
+        # Synchronous mode, shutting down, or the disk cannot keep up: write here
+        with self._lock:
+            self._inline += 1
+        self._execute(job)
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            try:
+                if job is _STOP:
+                    return
+                self._execute(job)
+            finally:
+                self._queue.task_done()
+
+    def _execute(self, job):
+        start = time.time()
+        error = None
+        location = job.path
+        try:
+            location = self._write(job)
+        except Exception as e:
+            error = e
+            print(f"Could not write image {job.path or 'to store'}: {e}")
+
+        with self._lock:
+            self._total_time += time.time() - start
+            if error is None:
+                self._written += 1
+            else:
+                self._failed += 1
+
+        if job.on_done is not None:
+            try:
+                job.on_done(location, error)
+            except Exception as e:
+                print(f"Image write callback failed for {location}: {e}")
+
+        if job.key is not None:
+            with self._lock:
+                event = self._pending.pop(job.key, None)
+            if event is not None:
+                event.set()
+
+    def _write(self, job):
+        data = job.data
+        if data is None:
+            ok, buffer = cv2.imencode('.jpg', job.image, [cv2.IMWRITE_JPEG_QUALITY, job.quality])
+            if not ok:
+                raise ValueError('Could not encode image')
+            data = buffer.tobytes()
+
+        if job.store is not None:
+            return job.store.put_bytes(data)
+
+        os.makedirs(os.path.dirname(job.path), exist_ok=True)
+        # Readers never see a half-written file
+        tmp_path = f"{job.path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, job.path)
+        return job.path
+
+    def wait(self, key, timeout=None):
+        """
+        Block until the write submitted under key (if any) has finished
+        Returns:
+            bool: False if it is still pending after the timeout
+        """
+        with self._lock:
+            event = self._pending.get(key)
+        return event is None or event.wait(timeout)
+
+    def drain(self):
+        """Block until every queued write has finished"""
+        self._queue.join()
+
+    def close(self):
+        """Flush pending writes and stop the writer threads"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+
+        # Anything queued while the threads were stopping is written here
+        while True:
+            try:
+                job = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is not _STOP:
+                self._execute(job)
+            self._queue.task_done()
+
+    def stats(self):
+        with self._lock:
+            done = self._written + self._failed
+            return {
+                'workers': self.workers,
+                'queued': self._queue.qsize(),
+                'pending': len(self._pending),
+                'written': self._written,
+                'failed': self._failed,
+                'written_inline': self._inline,
+                'avg_write_ms': (self._total_time / done * 1000) if done else 0
+            }
@@ -0,0 +1,77 @@
+import os
+
+# Which profile each kind of caller runs with
+LIVE = 'live'
+UPLOAD = 'upload'
+
+
+class InferenceProfile:
+    """
+    How images are run through the model: the input size, and for large
+    images whether they are sliced into overlapping tiles
+    """
+
+    def __init__(self, name, imgsz=640, tile_size=0, tile_overlap=0.2, tile_min_pixels=0,
+                 tile_batch=8, tile_full_pass=True):
+        """
+        Args:
+            name: Profile name (LIVE, UPLOAD)
+            imgsz: Model input size (longest side, multiple of 32)
+            tile_size: Tile edge in source pixels, 0 disables tiling
+            tile_overlap: Fraction of a tile shared with its neighbour
+            tile_min_pixels: Only images with more pixels than this are tiled
+            tile_batch: Tiles per forward pass
+            tile_full_pass: Also run the whole image, for objects larger than a tile
+        """
+        self.name = name
+        self.imgsz = int(imgsz)
+        self.tile_size = int(tile_size)
+        self.tile_overlap = float(tile_overlap)
+        self.tile_min_pixels = int(tile_min_pixels)
+        self.tile_batch = max(1, int(tile_batch))
+        self.tile_full_pass = bool(tile_full_pass)
+
+    def should_tile(self, width, height):
+        return (
+            self.tile_size > 0
+            and width * height > self.tile_min_pixels
+            and max(width, height) > self.tile_size
+        )
+
+    def identity(self):
+        """Settings that change the detections, for result cache keys"""
+        identity = f"imgsz={self.imgsz}"
+        if self.tile_size:
+            identity += (f"|tile={self.tile_size}:{self.tile_overlap}:{self.tile_min_pixels}"
+                         f":{int(self.tile_full_pass)}")
+        return identity
+
+    def as_dict(self):
+        return {
+            'imgsz': self.imgsz,
+            'tile_size': self.tile_size,
+            'tile_overlap': self.tile_overlap,
+            'tile_min_pixels': self.tile_min_pixels,
+            'tile_batch': self.tile_batch,
+            'tile_full_pass': self.tile_full_pass
+        }
+
+
+def load_inference_profiles():
+    """
+    Build the live and upload profiles from the environment:
+    DETECTION_LIVE_IMGSZ for camera frames (small and fast),
+    DETECTION_UPLOAD_IMGSZ and DETECTION_TILE_* for uploaded photos (accurate)
+    """
+    return {
+        LIVE: InferenceProfile(LIVE, imgsz=os.getenv('DETECTION_LIVE_IMGSZ', 480)),
+        UPLOAD: InferenceProfile(
+            UPLOAD,
+            imgsz=os.getenv('DETECTION_UPLOAD_IMGSZ', 1024),
+            tile_size=os.getenv('DETECTION_TILE_SIZE', 1024),
+            tile_overlap=os.getenv('DETECTION_TILE_OVERLAP', 0.2),
+            tile_min_pixels=os.getenv('DETECTION_TILE_MIN_PIXELS', 4_000_000),
+            tile_batch=os.getenv('DETECTION_TILE_BATCH', 8),
+            tile_full_pass=os.getenv('DETECTION_TILE_FULL_PASS', 'true').lower() == 'true'
+        )
+    }
@@ -0,0 +1,183 @@
+import math
+import threading
+import time
+
+
+class IngestTicket:
+    """One incoming frame waiting for its turn to run inference"""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self.admitted = False
+
+    def _resolve(self, admitted):
+        self.admitted = admitted
+        self._event.set()
+
+    def wait(self, timeout=None):
+        """
+        Block until the frame may run or has been superseded by a newer one
+        Returns:
+            bool: True if the frame should be processed, False if it was dropped
+        """
+        if not self._event.wait(timeout):
+            return False
+        return self.admitted
+
+
+class _CameraSlot:
+    def __init__(self):
+        self.busy = False
+        self.pending = None
+        self.avg_inference = None
+        self.last_seen = 0.0
+        self.accepted = 0
+        self.dropped = 0
+        self.processed = 0
+
+
+class IngestController:
+    """
+    Backpressure for live-stream ingestion. Per camera at most one frame is
+    being processed and one (the newest) is waiting; older waiting frames are
+    dropped, which keeps end-to-end latency bounded when inference falls behind.
+    """
+
+    def __init__(self, max_wait=5.0, max_fps=10.0, smoothing=0.2, utilization=0.5, active_window=10.0):
+        """
+        Args:
+            max_wait: Seconds a waiting frame may wait before it is dropped as stale
+            max_fps: Upper bound for the target FPS hint sent back to cameras
+            smoothing: Weight of the newest sample in the moving average inference time
+            utilization: Share of the inference capacity all cameras together are paced to
+            active_window: Seconds since its last frame during which a camera shares the capacity
+        """
+        self.max_wait = max_wait
+        self.max_fps = max_fps
+        self.smoothing = smoothing
+        self.utilization = utilization
+        self.active_window = active_window
+
+        self._lock = threading.Lock()
+        self._slots = {}
+        self._avg_inference = None  # over inferred frames of every camera
+
+    def _slot(self, camera_id):
+        slot = self._slots.get(camera_id)
+        if slot is None:
+            slot = self._slots[camera_id] = _CameraSlot()
+        return slot
+
+    def admit(self, camera_id):
+        """
+        Register a new frame from camera_id
+        Returns:
+            IngestTicket: wait() on it before running inference
+        """
+        ticket = IngestTicket()
+        with self._lock:
+            slot = self._slot(camera_id)
+            slot.accepted += 1
+            slot.last_seen = time.monotonic()
+
+            if not slot.busy:
+                slot.busy = True
+                ticket._resolve(True)
+            else:
+                # Only the newest waiting frame matters; the previous one is stale now
+                if slot.pending is not None:
+                    slot.pending._resolve(False)
+                    slot.dropped += 1
+                slot.pending = ticket
+
+        return ticket
+
+    def wait(self, camera_id, ticket):
+        """Wait for the ticket, giving up (and counting a drop) after max_wait"""
+        if ticket.wait(self.max_wait):
+            return True
+
+        with self._lock:
+            slot = self._slot(camera_id)
+            if slot.pending is ticket:
+                slot.pending = None
+                slot.dropped += 1
+            elif ticket.admitted:
+                # Admitted right as the wait timed out: run it after all
+                return True
+        return False
+
+    def release(self, camera_id, elapsed=None):
+        """
+        Mark the running frame of camera_id as finished and start the waiting one
+        Args:
+            elapsed: Inference time of the finished frame, feeds the pacing hint;
+                     None for frames that did not run the model (reused results, errors)
+        """
+        with self._lock:
+            slot = self._slot(camera_id)
+            slot.processed += 1
+
+            if elapsed is not None:
+                slot.avg_inference = self._smooth(slot.avg_inference, elapsed)
+                self._avg_inference = self._smooth(self._avg_inference, elapsed)
+
+            if slot.pending is not None:
+                ticket, slot.pending = slot.pending, None
+                ticket._resolve(True)
+            else:
+                slot.busy = False
+
+    def _smooth(self, average, sample):
+        return sample if average is None else average + self.smoothing * (sample - average)
+
+    def active_cameras(self):
+        """Cameras that sent a frame within active_window"""
+        cutoff = time.monotonic() - self.active_window
+        with self._lock:
+            return sum(1 for slot in self._slots.values() if slot.last_seen >= cutoff)
+
+    def hint(self, camera_id):
+        """
+        Pacing hint for a camera: the inference capacity (from the average
+        inference time of all cameras) times utilization, shared equally by the
+        active cameras
+        Returns:
+            dict: target_fps (None until a frame has been inferred, cameras keep
+                  their default rate) and retry_after (seconds)
+        """
+        active = max(1, self.active_cameras())
+        with self._lock:
+            avg = self._avg_inference
+
+        if not avg:
+            return {'target_fps': None, 'retry_after': 1}
+
+        target_fps = min(self.max_fps, self.utilization / (avg * active))
+        return {
+            'target_fps': max(0.01, round(target_fps, 2)),
+            'retry_after': max(1, math.ceil(1.0 / target_fps))
+        }
+
+    def stats(self):
+        with self._lock:
+            cameras = {
+                camera_id: {
+                    'accepted': slot.accepted,
+                    'dropped': slot.dropped,
+                    'processed': slot.processed,
+                    'in_flight': slot.busy,
+                    'waiting': slot.pending is not None,
+                    'avg_inference': slot.avg_inference
+                }
+                for camera_id, slot in self._slots.items()
+            }
+
+        return {
+            'active_cameras': self.active_cameras(),
+            'avg_inference': self._avg_inference,
+            'accepted': sum(c['accepted'] for c in cameras.values()),
+            'dropped': sum(c['dropped'] for c in cameras.values()),
+            'processed': sum(c['processed'] for c in cameras.values()),
+            'cameras': cameras
+        }
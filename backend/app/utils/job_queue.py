@@ -0,0 +1,240 @@
+import multiprocessing
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from concurrent.futures.process import BrokenProcessPool
+
+# Detector owned by each worker process, loaded once by the pool initializer
+_worker_detector = None
+
+# When each pid that has used worker_id() started claiming detections (per pid, so forks differ)
+_claims_since = {}
+
+
+def _init_worker(model_path):
+    """Pool initializer: preload and warm up the YOLO model in this worker process"""
+    global _worker_detector
+    from .detector_service import create_detector_service
+    _worker_detector = create_detector_service(model_path).get()
+
+
+def worker_id():
+    """host:pid of this process, recorded as the owner of the detections it runs"""
+    _claims_since.setdefault(os.getpid(), datetime.utcnow())
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _ping():
+    return os.getpid()
+
+
+def _run_detection_job(image_ref):
+    """Run detection and store the annotated result inside a worker process"""
+    from .frame_pipeline import encode_frame
+    from .image_store import get_image_store
+
+    store = get_image_store()
+    image_path = store.local_path(image_ref)
+    start_time = time.time()
+    result = _worker_detector.detect(image_path)
+    processing_time = time.time() - start_time
+
+    annotated = _worker_detector.render_results(image_path, result)
+    result_key = store.put_bytes(encode_frame(annotated))
+
+    return {
+        'results': result.to_dict(),
+        'result_path': result_key,
+        'processing_time': processing_time
+    }
+
+
+class DetectionJobQueue:
+    def __init__(self, model_path, max_workers=2, result_cache=None, lease=3600):
+        """
+        Background detection jobs for uploaded images
+        Args:
+            model_path: Path to the trained model loaded by every worker process
+            max_workers: Size of the process pool, 0 runs detection inline
+            result_cache: Optional DetectionResultCache filled with finished jobs
+            lease: Seconds after which another host may re-queue a job it cannot see finish
+        """
+        self.model_path = model_path
+        self.max_workers = max(0, int(max_workers))
+        self.result_cache = result_cache
+        self.lease = timedelta(seconds=lease)
+
+        self._executor = None
+        self._lock = threading.Lock()
+        self._events = {}
+        self._recovered = False
+
+    @property
+    def enabled(self):
+        return self.max_workers > 0
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # spawn keeps torch threads from being forked in a locked state
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker,
+                    initargs=(self.model_path,)
+                )
+                # Start every worker now so the model is loaded before real jobs arrive
+                for _ in range(self.max_workers):
+                    self._executor.submit(_ping)
+            return self._executor
+
+    def _reset_executor(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def enqueue(self, app, detection_id, image_ref, cache_key=None):
+        """
+        Queue a detection that is already marked as 'processing'
+        Args:
+            app: Flask app, used to update the Detection row when the job finishes
+            detection_id: Detection primary key, also used as the job id
+            image_ref: Image store key (or legacy path) of the uploaded image
+            cache_key: Result cache key of the image, stored once the job completes
+        """
+        with self._lock:
+            if detection_id in self._events:
+                return detection_id
+            self._events[detection_id] = threading.Event()
+
+        try:
+            future = self._get_executor().submit(_run_detection_job, image_ref)
+        except BrokenProcessPool:
+            self._reset_executor()
+            future = self._get_executor().submit(_run_detection_job, image_ref)
+
+        future.add_done_callback(lambda f: self._on_done(app, detection_id, f, cache_key))
+        return detection_id
+
+    def _on_done(self, app, detection_id, future, cache_key=None):
+        from ..config.database import db
+        from ..models.detection import Detection
+
+        try:
+            with app.app_context():
+                detection = db.session.get(Detection, detection_id)
+                if detection is None:
+                    return
+
+                try:
+                    outcome = future.result()
+                except Exception as e:
+                    print(f"Detection job {detection_id} failed: {e}")
+                    if isinstance(e, BrokenProcessPool):
+                        self._reset_executor()
+                    detection.status = 'failed'
+                    db.session.commit()
+                    return
+
+                results = outcome['results']
+                detection.apply_results(results['detections'], outcome['result_path'], outcome['processing_time'])
+                db.session.commit()
+
+                if cache_key and self.result_cache is not None:
+                    self.result_cache.put(cache_key, results, outcome['result_path'])
+        except Exception as e:
+            print(f"Could not store result of detection job {detection_id}: {e}")
+        finally:
+            with self._lock:
+                event = self._events.pop(detection_id, None)
+            if event is not None:
+                event.set()
+
+    def wait(self, detection_id, timeout):
+        """
+        Block until a job queued by this process finishes
+        Returns:
+            bool: False if the job is not tracked here (caller should poll the database)
+        """
+        with self._lock:
+            event = self._events.get(detection_id)
+        if event is None:
+            return False
+        event.wait(timeout)
+        return True
+
+    def is_queued(self, detection_id):
+        with self._lock:
+            return detection_id in self._events
+
+    def _abandoned(self, owner, started_at, now):
+        """Whether a 'processing' row's owner is gone (same host) or its lease has expired"""
+        if started_at is None or now - started_at > self.lease:
+            return True
+        host, _, pid = (owner or '').rpartition(':')
+        if host != socket.gethostname() or not pid.isdigit():
+            # Another host: only the lease tells
+            return False
+        if int(pid) == os.getpid():
+            # Claimed by this process, or by an earlier one that had the same pid
+            since = _claims_since.get(os.getpid())
+            return since is None or started_at < since
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            return True
+        except PermissionError:
+            pass
+        return False
+
+    def recover(self, app):
+        """
+        Re-queue detections left in 'processing' by a process that has stopped
+        (once per process). Rows owned by live workers are left alone; each row
+        is claimed with a conditional UPDATE, so only one process re-queues it.
+        """
+        with self._lock:
+            if self._recovered or not self.enabled:
+                return 0
+            self._recovered = True
+
+        from ..config.database import db
+        from ..models.detection import Detection
+
+        try:
+            owner = worker_id()
+            now = datetime.utcnow()
+            jobs = []
+            stale = Detection.query.filter_by(status='processing').with_entities(
+                Detection.id, Detection.original_path, Detection.job_owner, Detection.job_started_at
+            ).all()
+            for detection_id, image_ref, job_owner, job_started_at in stale:
+                if not self._abandoned(job_owner, job_started_at, now):
+                    continue
+                claimed = Detection.query.filter_by(
+                    id=detection_id, status='processing', job_owner=job_owner, job_started_at=job_started_at
+                ).update({'job_owner': owner, 'job_started_at': now}, synchronize_session=False)
+                if claimed:
+                    jobs.append((detection_id, image_ref))
+            # Give the connection back before the request that triggered recovery runs
+            db.session.commit()
+
+            for detection_id, image_ref in jobs:
+                self.enqueue(app, detection_id, image_ref)
+            if jobs:
+                print(f"Re-queued {len(jobs)} unfinished detection job(s)")
+            return len(jobs)
+        except Exception as e:
+            db.session.rollback()
+            print(f"Could not recover detection jobs: {e}")
+            return 0
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
@@ -0,0 +1,387 @@
+import base64
+import json
+import threading
+import time
+import uuid
+from collections import deque
+
+from .frame_pipeline import encode_frame
+
+# Distinguishes ETags issued by this deployment from those of a previous run
+_INSTANCE_TOKEN = uuid.uuid4().hex[:8]
+
+
+class LiveFrame:
+    """
+    One processed live-stream frame. The annotated JPEG and its base64 form
+    are produced lazily, at most once, the first time any viewer asks for them.
+    """
+
+    def __init__(self, version, camera_id, timestamp, detections, processed_image, raw_jpeg,
+                 object_count, processing_time, annotated_jpeg=None, token=None):
+        self.version = version
+        self.camera_id = camera_id
+        self.timestamp = timestamp
+        self.detections = detections
+        self.processed_image = processed_image
+        self.raw_jpeg = raw_jpeg
+        self.object_count = object_count
+        self.processing_time = processing_time
+        self.etag = f'{token or _INSTANCE_TOKEN}-{camera_id}-{version}'
+
+        self._lock = threading.Lock()
+        self._jpeg = annotated_jpeg
+        self._base64 = None
+
+    @property
+    def jpeg(self):
+        """Annotated frame as JPEG bytes, encoded on first use"""
+        if self._jpeg is None:
+            with self._lock:
+                if self._jpeg is None and self.processed_image is not None:
+                    self._jpeg = encode_frame(self.processed_image)
+        return self._jpeg
+
+    @property
+    def base64(self):
+        """Base64 of the annotated JPEG, for the JSON polling endpoint"""
+        if self._base64 is None:
+            jpeg = self.jpeg
+            if jpeg is not None:
+                with self._lock:
+                    if self._base64 is None:
+                        self._base64 = base64.b64encode(jpeg).decode('utf-8')
+        return self._base64
+
+    def metadata(self):
+        return {
+            'camera_id': self.camera_id,
+            'version': self.version,
+            'timestamp': self.timestamp,
+            'detections': self.detections,
+            'object_count': self.object_count,
+            'processing_time': self.processing_time
+        }
+
+
+class CameraState:
+    """Bounded ring buffer of the most recent frames of one camera"""
+
+    def __init__(self, camera_id, history_size):
+        self.camera_id = camera_id
+        self._frames = deque(maxlen=max(1, int(history_size)))
+        self._lock = threading.Lock()
+
+    def append(self, frame):
+        with self._lock:
+            self._frames.append(frame)
+
+    def latest(self):
+        with self._lock:
+            return self._frames[-1] if self._frames else None
+
+    def frame(self, version):
+        with self._lock:
+            for frame in reversed(self._frames):
+                if frame.version == version:
+                    return frame
+        return None
+
+    def history(self):
+        with self._lock:
+            return list(self._frames)
+
+
+class LocalKVStore:
+    """
+    In-process stand-in for the subset of the Redis API used by SharedFrameStore.
+    Lets the shared code path run without a Redis server (single process only).
+    """
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            return self._data.get(key)
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value if isinstance(value, bytes) else str(value).encode()
+        return True
+
+    def incr(self, key):
+        with self._lock:
+            value = int(self._data.get(key, b'0')) + 1
+            self._data[key] = str(value).encode()
+            return value
+
+    def sadd(self, key, member):
+        with self._lock:
+            self._data.setdefault(key, set()).add(member.encode() if isinstance(member, str) else member)
+
+    def smembers(self, key):
+        with self._lock:
+            return set(self._data.get(key, set()))
+
+    def lpush(self, key, value):
+        with self._lock:
+            self._data.setdefault(key, []).insert(0, value.encode() if isinstance(value, str) else value)
+
+    def ltrim(self, key, start, end):
+        with self._lock:
+            self._data[key] = self._data.get(key, [])[start:end + 1]
+
+    def lrange(self, key, start, end):
+        with self._lock:
+            # Redis ranges are inclusive, -1 is the last element
+            return list(self._data.get(key, [])[start:None if end == -1 else end + 1])
+
+    def delete(self, *keys):
+        with self._lock:
+            return sum(self._data.pop(key, None) is not None for key in keys)
+
+
+class SharedFrameStore:
+    """
+    Keeps the recent frames of every camera in a Redis-compatible key/value store,
+    so all web worker processes serve the same /live-stream/latest and capture.
+
+    The JPEGs of a frame are stored under keys that include its version and are
+    written before the metadata that names that version, so a reader always
+    pairs an image with its own detections. Versions that fall out of the
+    history are deleted.
+    """
+
+    def __init__(self, client, history_size, prefix='live'):
+        self.client = client
+        self.history_size = max(1, int(history_size))
+        self.prefix = prefix
+
+    def _key(self, *parts):
+        return ':'.join((self.prefix,) + parts)
+
+    def next_version(self):
+        return int(self.client.incr(self._key('seq')))
+
+    def _image_key(self, camera_id, version, part):
+        return self._key(camera_id, str(version), part)
+
+    def put(self, frame):
+        camera_id = frame.camera_id
+        meta = json.dumps(frame.metadata())
+        history = self._key(camera_id, 'history')
+        # Immutable per-version binary parts first, then the metadata that points at them
+        self.client.set(self._image_key(camera_id, frame.version, 'jpeg'), frame.jpeg or b'')
+        self.client.set(self._image_key(camera_id, frame.version, 'raw'), frame.raw_jpeg or b'')
+        self.client.set(self._key(camera_id, 'meta'), meta)
+        self.client.set(self._key('last_camera'), camera_id)
+        self.client.sadd(self._key('cameras'), camera_id)
+        self.client.lpush(history, meta)
+
+        evicted = self.client.lrange(history, self.history_size, -1)
+        self.client.ltrim(history, 0, self.history_size - 1)
+        if evicted:
+            versions = [json.loads(value)['version'] for value in evicted]
+            self.client.delete(*(self._image_key(camera_id, version, part)
+                                 for version in versions for part in ('jpeg', 'raw')))
+
+    def latest_meta(self, camera_id):
+        value = self.client.get(self._key(camera_id, 'meta'))
+        return json.loads(value) if value else None
+
+    def frame_meta(self, camera_id, version):
+        """Metadata of a recent frame of the camera, published by any process"""
+        for meta in self.history(camera_id):
+            if meta['version'] == version:
+                return meta
+        return None
+
+    def load(self, meta):
+        """
+        Rebuild a frame from its metadata
+        Returns:
+            LiveFrame: None if the frame has already been evicted from the history
+        """
+        camera_id, version = meta['camera_id'], meta['version']
+        annotated_jpeg = self.client.get(self._image_key(camera_id, version, 'jpeg'))
+        raw_jpeg = self.client.get(self._image_key(camera_id, version, 'raw'))
+        if annotated_jpeg is None or raw_jpeg is None:
+            return None
+        return LiveFrame(
+            version, camera_id, meta['timestamp'], meta['detections'],
+            processed_image=None,
+            raw_jpeg=raw_jpeg or None,
+            object_count=meta['object_count'],
+            processing_time=meta['processing_time'],
+            annotated_jpeg=annotated_jpeg or None,
+            token='shared'
+        )
+
+    def last_camera(self):
+        value = self.client.get(self._key('last_camera'))
+        return value.decode() if isinstance(value, bytes) else value
+
+    def cameras(self):
+        return sorted(m.decode() if isinstance(m, bytes) else m for m in self.client.smembers(self._key('cameras')))
+
+    def history(self, camera_id):
+        return [json.loads(v) for v in self.client.lrange(self._key(camera_id, 'history'), 0, self.history_size - 1)]
+
+
+def create_frame_store(backend, history_size, redis_url=None):
+    """
+    Build the shared store for LIVE_STATE_BACKEND
+    Args:
+        backend: 'memory' (per-process, default), 'local' (in-process KV stand-in) or 'redis'
+    """
+    if backend == 'redis':
+        import redis
+        return SharedFrameStore(redis.Redis.from_url(redis_url or 'redis://localhost:6379/0'), history_size)
+    if backend == 'local':
+        return SharedFrameStore(LocalKVStore(), history_size)
+    return None
+
+
+class LiveStreamRegistry:
+    """
+    Per-camera live-stream state keyed by ESP32 id/IP. Every camera keeps a
+    bounded ring buffer of recent frames; reads and writes are thread-safe.
+    With a SharedFrameStore the latest frames are also visible to other processes.
+    """
+
+    def __init__(self, history_size=10, store=None, poll_interval=0.05):
+        self.history_size = history_size
+        self.store = store
+        self.poll_interval = poll_interval
+
+        self._cameras = {}
+        self._lock = threading.RLock()
+        self._cond = threading.Condition(self._lock)
+        self._version = 0
+        self._last_camera = None
+        self._loaded = {}  # camera_id -> LiveFrame rebuilt from the shared store
+
+    def camera(self, camera_id):
+        with self._lock:
+            state = self._cameras.get(camera_id)
+            if state is None:
+                state = self._cameras[camera_id] = CameraState(camera_id, self.history_size)
+            return state
+
+    def publish(self, camera_id, **fields):
+        """
+        Append a processed frame to the camera's ring buffer and wake up waiting viewers
+        Returns:
+            LiveFrame: The published frame with its version assigned
+        """
+        camera_id = str(camera_id)
+        state = self.camera(camera_id)
+
+        version = self.store.next_version() if self.store else None
+        with self._cond:
+            if version is None:
+                self._version += 1
+                version = self._version
+            else:
+                self._version = max(self._version, version)
+            # Versions come from the shared store, so ETags are valid across processes
+            frame = LiveFrame(version, camera_id, token='shared' if self.store else None, **fields)
+            state.append(frame)
+            self._last_camera = camera_id
+            self._cond.notify_all()
+
+        if self.store:
+            self.store.put(frame)
+        return frame
+
+    def _latest_shared(self, camera_id):
+        camera_id = camera_id or self.store.last_camera()
+        if camera_id is None:
+            return None
+
+        local = self.camera(camera_id).latest()
+        meta = self.store.latest_meta(camera_id)
+        if meta is None:
+            return local
+        if local is not None and local.version == meta['version']:
+            return local
+
+        cached = self._loaded.get(camera_id)
+        if cached is None or cached.version != meta['version']:
+            loaded = self.store.load(meta)
+            if loaded is None:
+                # Superseded and evicted while it was being read: the newest known frame will do
+                return local if local is not None else cached
+            cached = self._loaded[camera_id] = loaded
+        return cached
+
+    def latest(self, camera_id=None):
+        """
+        Latest frame of a camera, or of whichever camera posted last when camera_id is None
+        """
+        if self.store:
+            return self._latest_shared(camera_id)
+
+        with self._lock:
+            camera_id = camera_id or self._last_camera
+            state = self._cameras.get(camera_id) if camera_id else None
+        return state.latest() if state else None
+
+    def frame(self, camera_id, version):
+        """A specific recent frame of the camera, from this process's ring buffer or the shared store"""
+        with self._lock:
+            state = self._cameras.get(camera_id)
+        frame = state.frame(version) if state else None
+        if frame is None and self.store:
+            meta = self.store.frame_meta(camera_id, version)
+            frame = self.store.load(meta) if meta else None
+        return frame
+
+    def history(self, camera_id):
+        """Metadata of the camera's recent frames, newest first"""
+        if self.store:
+            return self.store.history(camera_id)
+        with self._lock:
+            state = self._cameras.get(camera_id)
+        return [frame.metadata() for frame in reversed(state.history())] if state else []
+
+    def cameras(self):
+        if self.store:
+            return self.store.cameras()
+        with self._lock:
+            return sorted(self._cameras)
+
+    def current_version(self, camera_id=None):
+        latest = self.latest(camera_id)
+        return latest.version if latest else 0
+
+    def wait_for_update(self, version, timeout=None, camera_id=None):
+        """
+        Block until a frame newer than version is published (for one camera or any)
+        Returns:
+            LiveFrame: The newer frame, or None if the timeout expired first
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        if not self.store:
+            with self._cond:
+                while True:
+                    latest = self.latest(camera_id)
+                    if latest is not None and latest.version > version:
+                        return latest
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return None
+                    self._cond.wait(remaining)
+
+        # Frames may come from another process: poll the shared store
+        while True:
+            latest = self.latest(camera_id)
+            if latest is not None and latest.version > version:
+                return latest
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return None
+            time.sleep(self.poll_interval if remaining is None else min(self.poll_interval, remaining))
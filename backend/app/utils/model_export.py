@@ -0,0 +1,173 @@
+import os
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+# Inference backends YOLODetector can load; everything but 'pytorch' is exported from the .pt
+BACKENDS = ('pytorch', 'onnx', 'onnx-int8', 'openvino', 'openvino-int8')
+
+
+def exported_path(weights, backend):
+    """
+    Where the exported model of a .pt lives, next to the weights
+    (the names ultralytics' exporter produces)
+    """
+    stem, _ = os.path.splitext(weights)
+    if backend == 'pytorch':
+        return weights
+    if backend == 'onnx':
+        return f"{stem}.onnx"
+    if backend == 'onnx-int8':
+        return f"{stem}_int8.onnx"
+    if backend == 'openvino':
+        return f"{stem}_openvino_model"
+    if backend == 'openvino-int8':
+        return f"{stem}_int8_openvino_model"
+    raise ValueError(f"Unknown inference backend '{backend}', expected one of {', '.join(BACKENDS)}")
+
+
+def is_current(weights, artifact):
+    """An export is reused until the .pt it was made from changes"""
+    return os.path.exists(artifact) and os.path.getmtime(artifact) >= os.path.getmtime(weights)
+
+
+@contextmanager
+def _export_lock(artifact, timeout=900):
+    """
+    Keep web and job-worker processes that start together from exporting the
+    same model at once (a lock file, so it also works on Windows)
+    """
+    lock_path = f"{artifact.rstrip(os.sep)}.lock"
+    deadline = time.time() + timeout
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            # Left behind by a process that died mid-export
+            if time.time() - os.path.getmtime(lock_path) > timeout:
+                os.remove(lock_path)
+                continue
+            if time.time() > deadline:
+                raise TimeoutError(f"Timed out waiting for {lock_path}")
+            time.sleep(0.5)
+    try:
+        yield
+    finally:
+        os.close(fd)
+        os.remove(lock_path)
+
+
+def export_model(weights, backend, imgsz=640, int8_data=None, force=False):
+    """
+    Export a .pt for an optimized CPU backend, reusing an up-to-date export
+    Args:
+        weights: Path to the trained PyTorch weights (best.pt)
+        backend: One of BACKENDS
+        imgsz: Export input size; exports are dynamic, other sizes still work
+        int8_data: Dataset YAML used to calibrate 'openvino-int8'
+        force: Re-export even if the cached artifact is current
+    Returns:
+        str: Path of the model to load (a file, or a directory for OpenVINO)
+    """
+    artifact = exported_path(weights, backend)
+    if backend == 'pytorch' or (not force and is_current(weights, artifact)):
+        return artifact
+
+    with _export_lock(artifact):
+        # Another process may have finished the export while we waited
+        if not force and is_current(weights, artifact):
+            return artifact
+
+        print(f"Exporting {weights} for the {backend} backend...")
+        start = time.time()
+
+        if backend == 'onnx-int8':
+            # Dynamic (weight-only) quantization needs no calibration data
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+            source = export_model(weights, 'onnx', imgsz=imgsz)
+            quantize_dynamic(source, artifact, weight_type=QuantType.QUInt8)
+        else:
+            from ultralytics import YOLO
+            options = {'imgsz': imgsz, 'dynamic': True}
+            if backend == 'onnx':
+                options.update(format='onnx', simplify=True)
+            else:
+                options.update(format='openvino')
+                if backend == 'openvino-int8':
+                    if not int8_data:
+                        raise ValueError('openvino-int8 needs a calibration dataset YAML (DETECTION_INT8_DATA)')
+                    options.update(int8=True, data=int8_data)
+            written = str(YOLO(weights).export(**options)).rstrip(os.sep)
+            if os.path.abspath(written) != os.path.abspath(artifact):
+                os.replace(written, artifact)
+
+        print(f"✓ Exported {artifact} in {time.time() - start:.1f}s")
+        return artifact
+
+
+def box_iou(a, b):
+    """IoU of two x1, y1, x2, y2 boxes"""
+    ix = max(0.0, min(a[2], b[2]) - max(a[0], b[0]))
+    iy = max(0.0, min(a[3], b[3]) - max(a[1], b[1]))
+    inter = ix * iy
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def compare_detections(reference, candidate, iou_threshold=0.5):
+    """
+    Match the DetectionResults of two backends on one image: greedy by
+    confidence, same class id and IoU >= iou_threshold
+    Returns:
+        dict: reference/candidate/matched counts, IoUs and confidence deltas of the matches
+    """
+    used = set()
+    ious, conf_deltas = [], []
+
+    for r in np.argsort(-reference.confidences, kind='stable'):
+        best, best_iou = None, iou_threshold
+        for c in range(len(candidate)):
+            if c in used or candidate.class_ids[c] != reference.class_ids[r]:
+                continue
+            iou = box_iou(reference.boxes[r], candidate.boxes[c])
+            if iou >= best_iou:
+                best, best_iou = c, iou
+        if best is not None:
+            used.add(best)
+            ious.append(float(best_iou))
+            conf_deltas.append(abs(float(candidate.confidences[best]) - float(reference.confidences[r])))
+
+    return {
+        'reference': len(reference),
+        'candidate': len(candidate),
+        'matched': len(ious),
+        'ious': ious,
+        'confidence_deltas': conf_deltas
+    }
+
+
+def parity_report(reference_results, candidate_results, iou_threshold=0.5):
+    """
+    Summarize compare_detections() over an image set
+    Returns:
+        dict: recall (reference boxes found), precision (candidate boxes matched),
+              mean IoU and max confidence delta of the matched boxes
+    """
+    totals = {'reference': 0, 'candidate': 0, 'matched': 0}
+    ious, deltas = [], []
+    for reference, candidate in zip(reference_results, candidate_results):
+        comparison = compare_detections(reference, candidate, iou_threshold)
+        for key in totals:
+            totals[key] += comparison[key]
+        ious.extend(comparison['ious'])
+        deltas.extend(comparison['confidence_deltas'])
+
+    return {
+        **totals,
+        'recall': totals['matched'] / totals['reference'] if totals['reference'] else 1.0,
+        'precision': totals['matched'] / totals['candidate'] if totals['candidate'] else 1.0,
+        'mean_iou': float(np.mean(ious)) if ious else None,
+        'max_confidence_delta': float(max(deltas)) if deltas else None
+    }
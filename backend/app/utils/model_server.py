@@ -0,0 +1,348 @@
+import atexit
+import os
+import socket
+import stat
+import threading
+import time
+from concurrent.futures import TimeoutError
+from multiprocessing import shared_memory
+from multiprocessing.connection import Client, Listener
+
+import numpy as np
+
+from .annotation import render_image
+from .batch_engine import BatchInferenceEngine
+from .detection_result import DetectionResult
+from .inference_profiles import LIVE, UPLOAD, InferenceProfile
+
+# Shared-memory segments start at this size and double when a frame does not fit
+MIN_SEGMENT_BYTES = 8 * 1024 * 1024
+
+
+def parse_address(address):
+    """'host:port' for TCP on localhost, anything else is a Unix socket path"""
+    host, sep, port = address.rpartition(':')
+    if sep and port.isdigit():
+        return (host or '127.0.0.1', int(port))
+    return address
+
+
+def _pack(result):
+    """The arrays of a DetectionResult, sent back instead of its serialized dicts"""
+    return result.boxes, result.confidences, result.class_ids, result.labels
+
+
+def _close(segment):
+    try:
+        segment.close()
+    except BufferError:
+        # A frame view is still alive somewhere; the mapping goes with the process
+        print(f"Model server: segment {segment.name} still in use, not closed")
+
+
+def _attach(name):
+    """
+    Open a client's segment without tracking it: the client owns and unlinks
+    it, the server's resource tracker must not remove it on exit
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 always registers the segment with the tracker
+        from multiprocessing import resource_tracker
+        segment = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(segment._name, 'shared_memory')
+        return segment
+
+
+class ModelServer:
+    """
+    Holds the one copy of the model for every web and job worker on the machine.
+
+    Workers connect over a local socket (multiprocessing.connection). Camera
+    frames are not sent over it: the worker writes them into a shared-memory
+    segment it owns and only sends their offsets and shapes; the server reads
+    them in place and answers with the result arrays. Frames from all
+    connections go through one BatchInferenceEngine, so they are batched
+    together. Uploads are referenced by path (the image store is local).
+
+    Each connection has its own thread; their upload requests and the engine's
+    batches take turns on the model through YOLODetector's predict lock.
+    """
+
+    def __init__(self, service, address, authkey, max_batch_size=8, batch_window=0.01, timeout=30):
+        """
+        Args:
+            service: DetectorService that loads the model in this process
+            address: Unix socket path or 'host:port'
+            authkey: Shared secret clients must present (bytes, optional for Unix sockets)
+            max_batch_size: Maximum frames per forward pass across all workers
+            batch_window: Seconds to wait for more frames after the first one arrives
+            timeout: Seconds a frame may wait for inference
+        """
+        self.service = service
+        self.address = parse_address(address)
+        if isinstance(self.address, tuple) and not authkey:
+            # Requests are pickled: anyone who can connect must hold the key
+            raise ValueError('DETECTION_SERVER_AUTHKEY is required for a TCP model server')
+        self.authkey = authkey
+        self.timeout = timeout
+        self.engine = BatchInferenceEngine(service, max_batch_size=max_batch_size, batch_window=batch_window)
+        self._connections = 0
+        self._lock = threading.Lock()
+
+    def serve_forever(self):
+        """Load and warm up the model, then accept workers until interrupted"""
+        self.service.get()
+
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            # Socket left behind by a previous server
+            if stat.S_ISSOCK(os.stat(self.address).st_mode):
+                os.remove(self.address)
+
+        with Listener(self.address, authkey=self.authkey) as listener:
+            print(f"✓ Model server listening on {listener.address}")
+            while True:
+                try:
+                    connection = listener.accept()
+                except (OSError, EOFError) as e:
+                    # A client that failed the handshake
+                    print(f"Model server: rejected connection: {e}")
+                    continue
+                threading.Thread(target=self._handle, args=(connection,), name='model-server-conn',
+                                 daemon=True).start()
+
+    def _handle(self, connection):
+        segment = None
+        with self._lock:
+            self._connections += 1
+        try:
+            while True:
+                try:
+                    message = connection.recv()
+                except (EOFError, OSError):
+                    break
+
+                op, args = message[0], message[1:]
+                try:
+                    if op == 'frames':
+                        name, layouts, profile = args
+                        if segment is None or segment.name != name:
+                            # The client replaced its segment with a larger one
+                            if segment is not None:
+                                _close(segment)
+                            segment = _attach(name)
+                        reply = self._frames(segment, layouts, profile)
+                    else:
+                        reply = self._call(op, *args)
+                    connection.send(('ok', reply))
+                except Exception as e:
+                    connection.send(('error', str(e) or type(e).__name__))
+        finally:
+            if segment is not None:
+                _close(segment)
+            connection.close()
+            with self._lock:
+                self._connections -= 1
+
+    def _frames(self, segment, layouts, profile):
+        # Copied out of the client's segment: after an error reply the client reuses it
+        # for its next request while frames that timed out may still be in the engine
+        frames = [
+            np.ndarray(shape, dtype=np.uint8, buffer=segment.buf, offset=offset).copy()
+            for offset, shape in layouts
+        ]
+        if profile != LIVE:
+            return [_pack(result) for result in self.service.detect_batch(frames, profile)]
+
+        futures = [self.engine.submit(frame) for frame in frames]
+        deadline = time.time() + self.timeout
+        try:
+            results = [future.result(timeout=max(0, deadline - time.time())) for future in futures]
+        except TimeoutError:
+            # Not inferred yet: drop them from the engine's queue
+            for future in futures:
+                future.cancel()
+            raise TimeoutError(f"{len(frames)} frame(s) not inferred within {self.timeout}s")
+        return [_pack(result) for result in results]
+
+    def _call(self, op, *args):
+        # Runs on the connection's thread, serialized with the engine by the detector
+        detector = self.service.get()
+        if op == 'detect':
+            return _pack(detector.detect(*args))
+        if op == 'detect_many':
+            return [_pack(result) for result in detector.detect_many(*args)]
+        if op == 'identity':
+            return detector.model_identity(*args)
+        if op == 'info':
+            return {
+                'is_model_loaded': detector.is_model_loaded,
+                'loaded_weights': detector.loaded_weights,
+                'conf': detector.conf,
+                'iou': detector.iou,
+                'profiles': {name: profile.as_dict() for name, profile in detector.profiles.items()},
+                'pid': os.getpid()
+            }
+        if op == 'stats':
+            with self._lock:
+                connections = self._connections
+            return {'connections': connections, 'inference_engine': self.engine.stats()}
+        raise ValueError(f"Unknown model server request '{op}'")
+
+
+class _Channel:
+    """One connection to the server and the shared-memory segment its frames are written to"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.segment = None
+
+    def reserve(self, size):
+        """A segment of at least size bytes, replaced by a larger one when it is too small"""
+        if self.segment is None or self.segment.size < size:
+            self.release()
+            self.segment = shared_memory.SharedMemory(
+                create=True, size=max(MIN_SEGMENT_BYTES, 1 << (size - 1).bit_length())
+            )
+        return self.segment
+
+    def release(self):
+        if self.segment is not None:
+            self.segment.close()
+            self.segment.unlink()
+            self.segment = None
+
+    def close(self):
+        self.release()
+        self.connection.close()
+
+
+class ModelClient:
+    """
+    Stand-in for YOLODetector in web and job workers when a model server is
+    configured: same detect methods and DetectionResults, no model in this process.
+
+    Requests from concurrent threads use separate channels (connection and
+    segment), taken from a pool that grows to the peak number of requests in flight.
+    """
+
+    def __init__(self, address, authkey, connect_timeout=60):
+        """
+        Args:
+            address: Unix socket path or 'host:port' of the model server
+            authkey: Shared secret of the server
+            connect_timeout: Seconds to keep retrying while the server is starting
+        """
+        self.address = parse_address(address)
+        self.authkey = authkey
+        self.connect_timeout = connect_timeout
+        self._idle = []
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+        # Blocks until the server has loaded the model, like loading it here would
+        info = self._request('info')
+        self.model = None
+        self.is_model_loaded = info['is_model_loaded']
+        self.loaded_weights = info['loaded_weights']
+        self.conf = info['conf']
+        self.iou = info['iou']
+        self.server_pid = info['pid']
+        self.profiles = {
+            name: InferenceProfile(name, **settings) for name, settings in info['profiles'].items()
+        }
+
+    def _connect(self):
+        deadline = time.time() + self.connect_timeout
+        while True:
+            try:
+                return _Channel(Client(self.address, authkey=self.authkey))
+            except (FileNotFoundError, ConnectionRefusedError, socket.timeout):
+                if time.time() > deadline:
+                    raise ConnectionError(f"Model server at {self.address} is not reachable")
+                time.sleep(0.5)
+
+    def _request(self, *message, frames=None):
+        """
+        Send one request and wait for its reply
+        Args:
+            message: Request tuple, see ModelServer
+            frames: Contiguous uint8 arrays to hand over through shared memory,
+                    prepended to message as ('frames', segment name, layouts)
+        """
+        with self._lock:
+            channel = self._idle.pop() if self._idle else None
+        pooled = channel is not None
+        if channel is None:
+            channel = self._connect()
+
+        while True:
+            try:
+                status, reply = self._send(channel, message, frames)
+                break
+            except (EOFError, ConnectionError) as e:
+                channel.close()
+                if not pooled:
+                    raise
+                # An idle connection to a server that has restarted since: retry on a new one
+                print(f"Model server connection lost ({e!r}), reconnecting")
+                channel, pooled = self._connect(), False
+            except BaseException:
+                # The connection may be half-way through a message
+                channel.close()
+                raise
+
+        if status == 'error':
+            # Do not reuse a channel whose request failed on the server
+            channel.close()
+            raise RuntimeError(reply)
+        with self._lock:
+            self._idle.append(channel)
+        return reply
+
+    def _send(self, channel, message, frames):
+        if frames is not None:
+            layouts, offset = [], 0
+            for frame in frames:
+                layouts.append((offset, frame.shape))
+                offset += frame.nbytes
+            segment = channel.reserve(offset)
+            for (start, _), frame in zip(layouts, frames):
+                np.ndarray(frame.shape, dtype=np.uint8, buffer=segment.buf, offset=start)[...] = frame
+            message = ('frames', segment.name, layouts) + message
+
+        channel.connection.send(message)
+        return channel.connection.recv()
+
+    def close(self):
+        """Close the idle connections and unlink their shared-memory segments"""
+        with self._lock:
+            channels, self._idle = self._idle, []
+        for channel in channels:
+            channel.close()
+
+    def detect_batch(self, images, profile=LIVE):
+        """Copy the frames into shared memory once and detect them on the server"""
+        frames = [np.ascontiguousarray(image, dtype=np.uint8) for image in images]
+        packed = self._request(profile, frames=frames)
+        return [DetectionResult(*arrays) for arrays in packed]
+
+    def detect_image(self, image, profile=LIVE):
+        return self.detect_batch([image], profile)[0]
+
+    def detect(self, image_path, profile=UPLOAD):
+        return DetectionResult(*self._request('detect', os.path.abspath(image_path), profile))
+
+    def detect_many(self, image_paths, profile=UPLOAD):
+        paths = [os.path.abspath(path) for path in image_paths]
+        return [DetectionResult(*arrays) for arrays in self._request('detect_many', paths, profile)]
+
+    def model_identity(self, profile=UPLOAD):
+        return self._request('identity', profile)
+
+    def render_results(self, input_path, results):
+        return render_image(input_path, results)
+
+    def stats(self):
+        return self._request('stats')
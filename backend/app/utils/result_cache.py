@@ -0,0 +1,122 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    """Content hash of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def make_cache_key(content_hash, model_identity):
+    """Combine image content hash with model weights and thresholds"""
+    return hashlib.sha256(f"{content_hash}|{model_identity}".encode()).hexdigest()
+
+
+class DetectionResultCache:
+    """
+    detect() results keyed by image content + model identity. An in-memory LRU
+    tier is backed by an optional on-disk tier of small JSON files.
+    """
+
+    def __init__(self, max_entries=256, disk_dir=None, exists=os.path.exists):
+        """
+        Args:
+            exists: Checks that a cached result_path still refers to a stored image
+        """
+        self.max_entries = max(0, int(max_entries))
+        self.disk_dir = disk_dir
+        self.exists = exists
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, key[:2], f"{key}.json")
+
+    def get(self, key):
+        """
+        Look up a cached result
+        Returns:
+            dict: {'results': ..., 'result_path': ...}, or None on a miss or if the
+                  cached annotated image no longer exists
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+        if entry is None and self.disk_dir:
+            try:
+                with open(self._disk_path(key)) as f:
+                    entry = json.load(f)
+                self._remember(key, entry)
+            except (OSError, ValueError):
+                entry = None
+
+        if entry is not None and not (entry.get('result_path') and self.exists(entry['result_path'])):
+            self.invalidate(key)
+            entry = None
+
+        with self._lock:
+            if entry is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        return entry
+
+    def put(self, key, results, result_path):
+        entry = {'results': results, 'result_path': result_path}
+        self._remember(key, entry)
+
+        if self.disk_dir:
+            path = self._disk_path(key)
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, 'w') as f:
+                    json.dump(entry, f)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                print(f"Could not write detection cache entry: {e}")
+
+    def _remember(self, key, entry):
+        if self.max_entries == 0:
+            return
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+        if self.disk_dir:
+            try:
+                os.remove(self._disk_path(key))
+            except OSError:
+                pass
+
+    def stats(self):
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'disk_tier': bool(self.disk_dir),
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': (self._hits / lookups) if lookups else 0
+            }
@@ -0,0 +1,60 @@
+import numpy as np
+
+
+def tile_grid(width, height, tile_size, overlap=0.2):
+    """
+    Overlapping tiles covering an image; the last row/column is shifted back
+    so every tile is full size (unless the image is smaller than a tile)
+    Returns:
+        list: (x1, y1, x2, y2) of every tile
+    """
+    stride = max(1, int(tile_size * (1 - overlap)))
+
+    def starts(length):
+        if length <= tile_size:
+            return [0]
+        positions = list(range(0, length - tile_size, stride))
+        positions.append(length - tile_size)
+        return positions
+
+    return [
+        (x, y, min(x + tile_size, width), min(y + tile_size, height))
+        for y in starts(height)
+        for x in starts(width)
+    ]
+
+
+def merge_detections(boxes, scores, classes, threshold=0.5):
+    """
+    Class-aware greedy NMS over boxes gathered from several tiles
+
+    Overlap is measured as intersection over the smaller box, so the piece of
+    an object cut off at a tile edge is absorbed by the complete box from the
+    neighbouring tile, which plain IoU would keep as a duplicate.
+    Args:
+        boxes: (N, 4) array of x1, y1, x2, y2 in image coordinates
+        scores: (N,) confidences
+        classes: (N,) class ids
+        threshold: Boxes overlapping a better box of the same class by more are dropped
+    Returns:
+        numpy.ndarray: Indices of the kept boxes, best first
+    """
+    boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+    scores = np.asarray(scores, dtype=np.float32)
+    classes = np.asarray(classes)
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+
+    order = np.argsort(-scores, kind='stable')
+    keep = []
+    while order.size:
+        best = order[0]
+        keep.append(best)
+        rest = order[1:]
+
+        ix = np.clip(np.minimum(boxes[best, 2], boxes[rest, 2]) - np.maximum(boxes[best, 0], boxes[rest, 0]), 0, None)
+        iy = np.clip(np.minimum(boxes[best, 3], boxes[rest, 3]) - np.maximum(boxes[best, 1], boxes[rest, 1]), 0, None)
+        smaller = np.minimum(areas[best], areas[rest])
+        overlap = ix * iy / np.maximum(smaller, 1e-6)
+
+        order = rest[(overlap <= threshold) | (classes[rest] != classes[best])]
+    return np.asarray(keep, dtype=np.int64)
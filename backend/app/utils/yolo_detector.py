@@ -1,19 +1,74 @@
 from pathlib import Path
 import cv2
 import numpy as np
-from ultralytics import YOLO
 import os
+import threading
+from .image_ingest import SNIFF_BYTES, ImageRejected, sniff_image
+from .inference_profiles import LIVE, UPLOAD, load_inference_profiles
+from .tiling import merge_detections, tile_grid
+from .annotation import CLASS_COLORS, render_image, renderer
+from .detection_result import RESULT_SCHEMA, DetectionResult
+
+
+def extract_boxes(result, min_conf=None):
+    """
+    Boxes of one ultralytics result as arrays, with a single device-to-host copy
+    Args:
+        result: ultralytics Results
+        min_conf: Drop boxes below this confidence
+    Returns:
+        tuple: (N, 4) float32 x1, y1, x2, y2, (N,) float32 confidences, (N,) int64 class ids
+    """
+    boxes = result.boxes
+    if boxes is None or not len(boxes):
+        return np.empty((0, 4), np.float32), np.empty(0, np.float32), np.empty(0, np.int64)
+    
+    # x1, y1, x2, y2, [track id,] conf, cls
+    data = boxes.data.cpu().numpy()
+    if min_conf is not None:
+        data = data[data[:, -2] >= min_conf]
+    return data[:, :4].astype(np.float32), data[:, -2].astype(np.float32), data[:, -1].astype(np.int64)
+
+
+def class_name_table(names, fallback=None):
+    """
+    Array mapping class id -> class name, for vectorized lookups
+    Args:
+        names: {class id: name} of the model
+        fallback: {class id: name} used for ids the model does not name
+    """
+    names = {**(fallback or {}), **(names or {})}
+    size = max(names, default=-1) + 1
+    return np.array([names.get(i, f'class_{i}') for i in range(size)], dtype=object)
+
 
 class YOLODetector:
-    def __init__(self, model_path=None):
+    def __init__(self, model_path=None, conf=0.5, iou=0.45, backend='pytorch', int8_data=None,
+                 profiles=None):
         """
         Initialize YOLO detector with your trained model
         Args:
             model_path: Path to your trained model (best.pt)
+            conf: Confidence threshold of every detect method
+            iou: NMS IoU threshold of every detect method
+            backend: Inference backend, one of model_export.BACKENDS; anything but
+                     'pytorch' is exported next to the weights on first use
+            int8_data: Calibration dataset YAML for the 'openvino-int8' backend
+            profiles: Inference size / tiling per caller, {LIVE: ..., UPLOAD: ...}
+                      (default from the DETECTION_*_IMGSZ / DETECTION_TILE_* settings)
         """
         self.model_path = model_path
+        self.backend = backend
+        self.int8_data = int8_data
+        self.profiles = profiles or load_inference_profiles()
         self.model = None
         self.is_model_loaded = False
+        self.loaded_weights = None
+        self.conf = conf
+        self.iou = iou
+        # Ultralytics sets the predictor's imgsz before taking its own lock, so
+        # concurrent calls with different profiles could swap input sizes
+        self._predict_lock = threading.Lock()
         
         # Load model
         self._load_model()
@@ -27,20 +82,23 @@ class YOLODetector:
         }
         
         # Define colors for each class (BGR format for OpenCV)
-        self.class_colors = {
-            'green_bean': (0, 255, 0),      # Green
-            'light_roast': (0, 165, 255),   # Orange
-            'medium_roast': (0, 0, 255),    # Red
-            'dark_roast': (128, 0, 128)     # Purple
-        }
+        self.class_colors = CLASS_COLORS
+        
+        self._name_table = class_name_table(getattr(self.model, 'names', None), self.class_names)
+        self.renderer = renderer
         
     def _load_model(self):
         """Load the YOLO model"""
         try:
+            # Imported here so importing this module does not pull in torch
+            from ultralytics import YOLO
+            
             if self.model_path and os.path.exists(self.model_path):
-                print(f"Loading trained model from: {self.model_path}")
-                self.model = YOLO(self.model_path)
+                weights = self._exported_weights()
+                print(f"Loading trained model from: {weights}")
+                self.model = YOLO(weights, task='detect')
                 self.is_model_loaded = True
+                self.loaded_weights = weights
                 print("✓ Trained model loaded successfully!")
                 
                 # Print model info
@@ -51,69 +109,168 @@ class YOLODetector:
                 print("Using YOLOv8n as fallback...")
                 self.model = YOLO('yolov8n.pt')
                 self.is_model_loaded = True
+                self.loaded_weights = 'yolov8n.pt'
                 
         except Exception as e:
             print(f"Error loading model: {e}")
             print("Model loading failed, will use placeholder detection")
             self.model = None
             self.is_model_loaded = False
+    
+    def _exported_weights(self):
+        """
+        The ONNX/OpenVINO export of the weights for the configured backend
+        (exported once and cached next to best.pt), or the .pt itself
+        """
+        if self.backend == 'pytorch':
+            return self.model_path
+        
+        from .model_export import export_model
+        try:
+            return export_model(self.model_path, self.backend, int8_data=self.int8_data)
+        except Exception as e:
+            print(f"Could not export model for the {self.backend} backend: {e}")
+            print("Falling back to PyTorch weights")
+            return self.model_path
+        
+    def model_identity(self, profile=UPLOAD):
+        """
+        Identify the loaded weights, thresholds and inference profile, for caching detect() results
+        Returns:
+            str: Identity string, or None when placeholder detection is in use
+        """
+        if not (self.is_model_loaded and self.model):
+            return None
         
-    def detect(self, image_path):
+        weights = self.loaded_weights
+        if weights and os.path.exists(weights):
+            stat = os.stat(weights)
+            weights = f"{os.path.abspath(weights)}:{stat.st_size}:{int(stat.st_mtime)}"
+        return (f"{weights}|conf={self.conf}|iou={self.iou}|{self.profiles[profile].identity()}"
+                f"|schema={RESULT_SCHEMA}")
+    
+    def detect(self, image_path, profile=UPLOAD):
         """
         Perform detection on image
         Args:
             image_path: Path to input image
+            profile: Inference profile name, uploads by default
         Returns:
-            dict: Detection results
+            DetectionResult: Detection results
         """
         try:
             if self.is_model_loaded and self.model:
-                return self._detect_with_model(image_path)
+                return self._detect_with_model(image_path, self.profiles[profile])
             else:
                 return self._placeholder_detection(image_path)
                 
         except Exception as e:
             raise Exception(f"Detection failed: {str(e)}")
     
-    def _detect_with_model(self, image_path):
+    def _detect_with_model(self, image_path, profile):
         """Real YOLO detection with trained model"""
+        if self._should_tile(image_path, profile):
+            return self._detect_tiled(image_path, profile)
+        
         # Run inference
-        results = self.model(image_path, conf=0.5, iou=0.45)
-        
-        detections = []
-        confidence_scores = []
-        classes = []
-        
-        for result in results:
-            boxes = result.boxes
-            if boxes is not None:
-                for box in boxes:
-                    # Get box coordinates
-                    x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-                    confidence = float(box.conf[0].cpu().numpy())
-                    class_id = int(box.cls[0].cpu().numpy())
-                    
-                    # Get class name
-                    if hasattr(self.model, 'names') and class_id in self.model.names:
-                        class_name = self.model.names[class_id]
-                    else:
-                        class_name = self.class_names.get(class_id, f'class_{class_id}')
-                    
-                    detections.append({
-                        'class': class_name,
-                        'confidence': confidence,
-                        'bbox': [int(x1), int(y1), int(x2), int(y2)]
-                    })
-                    
-                    confidence_scores.append(confidence)
-                    classes.append(class_name)
-        
-        return {
-            'detections': detections,
-            'confidence_scores': confidence_scores,
-            'classes': classes,
-            'total_detections': len(detections)
-        }
+        results = self._predict(image_path, profile.imgsz, verbose=True)
+        return self._format_result(results[0])
+    
+    def _predict(self, source, imgsz, verbose=False):
+        """One forward pass of the shared model, one caller at a time"""
+        with self._predict_lock:
+            return self.model(source, imgsz=imgsz, conf=self.conf, iou=self.iou, verbose=verbose)
+    
+    def detect_many(self, image_paths, profile=UPLOAD):
+        """
+        Perform detection on several images in one batched forward pass
+        Args:
+            image_paths: List of paths to input images
+            profile: Inference profile name, uploads by default
+        Returns:
+            list: One DetectionResult per input path
+        """
+        if not (self.is_model_loaded and self.model):
+            return [self._placeholder_detection(path) for path in image_paths]
+        
+        profile = self.profiles[profile]
+        results = [None] * len(image_paths)
+        batched = []
+        for i, path in enumerate(image_paths):
+            if self._should_tile(path, profile):
+                # Large images are batched tile by tile instead
+                results[i] = self._detect_tiled(path, profile)
+            else:
+                batched.append(i)
+        
+        if batched:
+            outputs = self._predict([image_paths[i] for i in batched], profile.imgsz)
+            for i, output in zip(batched, outputs):
+                results[i] = self._format_result(output)
+        return results
+    
+    def _should_tile(self, image_path, profile):
+        """Whether the image is large enough for tiled inference, judged from its header"""
+        if not profile.tile_size:
+            return False
+        
+        try:
+            with open(image_path, 'rb') as f:
+                info = sniff_image(f.read(SNIFF_BYTES))
+        except (OSError, ImageRejected):
+            return False
+        return info is not None and profile.should_tile(info[1], info[2])
+    
+    def _detect_tiled(self, image_path, profile):
+        """
+        Sliced inference: overlapping tiles (and optionally the whole image)
+        are run in batches and their boxes merged with NMS, so objects that
+        the full-image resize would shrink to a few pixels are still found
+        """
+        image = cv2.imread(image_path)
+        if image is None:
+            raise ValueError("Could not load image")
+        
+        height, width = image.shape[:2]
+        tiles = tile_grid(width, height, profile.tile_size, profile.tile_overlap)
+        inputs = [image[y1:y2, x1:x2] for x1, y1, x2, y2 in tiles]
+        offsets = [(x1, y1) for x1, y1, _, _ in tiles]
+        if profile.tile_full_pass:
+            inputs.append(image)
+            offsets.append((0, 0))
+        
+        boxes, confidences, class_ids = [], [], []
+        for start in range(0, len(inputs), profile.tile_batch):
+            outputs = self._predict(inputs[start:start + profile.tile_batch], profile.imgsz)
+            for (dx, dy), output in zip(offsets[start:start + profile.tile_batch], outputs):
+                tile_boxes, tile_confidences, tile_class_ids = extract_boxes(output)
+                boxes.append(tile_boxes + np.array([dx, dy, dx, dy], dtype=np.float32))
+                confidences.append(tile_confidences)
+                class_ids.append(tile_class_ids)
+        
+        boxes, confidences, class_ids = np.concatenate(boxes), np.concatenate(confidences), np.concatenate(class_ids)
+        keep = merge_detections(boxes, confidences, class_ids)
+        return self._result_from_arrays(boxes[keep], confidences[keep], class_ids[keep])
+    
+    def _class_name(self, class_id):
+        if hasattr(self.model, 'names') and class_id in self.model.names:
+            return self.model.names[class_id]
+        return self.class_names.get(class_id, f'class_{class_id}')
+    
+    def _format_result(self, result):
+        """Convert one ultralytics result into a DetectionResult"""
+        boxes, confidences, class_ids = extract_boxes(result)
+        return self._result_from_arrays(boxes, confidences, class_ids)
+    
+    def _result_from_arrays(self, boxes, confidences, class_ids):
+        return DetectionResult(boxes, confidences, class_ids, self.class_names_for(class_ids))
+    
+    def class_names_for(self, class_ids):
+        """Class names of an array of class ids"""
+        class_ids = np.asarray(class_ids, dtype=np.int64)
+        if class_ids.size and (class_ids.min() < 0 or class_ids.max() >= len(self._name_table)):
+            return [self._class_name(int(class_id)) for class_id in class_ids]
+        return self._name_table[class_ids].tolist()
     
     def _placeholder_detection(self, image_path):
         """Placeholder detection for testing when model is not available"""
@@ -127,38 +284,25 @@ class YOLODetector:
         # Generate random detections for testing
         import random
         
-        detections = []
-        confidence_scores = []
-        classes = []
+        boxes = []
+        class_ids = []
+        confidences = []
         
         # Generate 1-4 random detections
         num_detections = random.randint(1, 4)
         
         for i in range(num_detections):
-            class_name = random.choice(list(self.class_names.values()))
-            confidence = random.uniform(0.7, 0.95)
+            class_ids.append(random.choice(list(self.class_names)))
+            confidences.append(random.uniform(0.7, 0.95))
             
             # Random bounding box
             x1 = random.randint(0, w//2)
             y1 = random.randint(0, h//2)
             x2 = x1 + random.randint(50, min(200, w-x1))
             y2 = y1 + random.randint(50, min(200, h-y1))
-            
-            detections.append({
-                'class': class_name,
-                'confidence': confidence,
-                'bbox': [x1, y1, x2, y2]
-            })
-            
-            confidence_scores.append(confidence)
-            classes.append(class_name)
-        
-        return {
-            'detections': detections,
-            'confidence_scores': confidence_scores,
-            'classes': classes,
-            'total_detections': len(detections)
-        }
+            boxes.append([x1, y1, x2, y2])
+        
+        return DetectionResult(boxes, confidences, class_ids, [self.class_names[i] for i in class_ids])
     
     def save_results(self, input_path, output_path, results):
         """
@@ -166,42 +310,10 @@ class YOLODetector:
         Args:
             input_path: Path to input image
             output_path: Path to save annotated image
-            results: Detection results from detect()
+            results: DetectionResult from detect()
         """
         try:
-            # Load original image
-            image = cv2.imread(input_path)
-            if image is None:
-                raise ValueError("Could not load input image")
-            
-            # Draw detections
-            for detection in results['detections']:
-                class_name = detection['class']
-                confidence = detection['confidence']
-                x1, y1, x2, y2 = detection['bbox']
-                
-                # Get color for class
-                color = self.class_colors.get(class_name, (255, 255, 255))
-                
-                # Draw bounding box
-                cv2.rectangle(image, (x1, y1), (x2, y2), color, 3)
-                
-                # Draw label
-                label = f"{class_name}: {confidence:.2f}"
-                label_size = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.7, 2)[0]
-                
-                # Draw label background
-                cv2.rectangle(image, (x1, y1 - label_size[1] - 15), 
-                            (x1 + label_size[0] + 10, y1), color, -1)
-                
-                # Draw label text
-                cv2.putText(image, label, (x1 + 5, y1 - 5), 
-                          cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-            
-            # Add detection count
-            detection_text = f"Total Detections: {results['total_detections']}"
-            cv2.putText(image, detection_text, (10, 30), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+            image = self.render_results(input_path, results)
             
             # Save annotated image
             cv2.imwrite(output_path, image)
@@ -209,21 +321,30 @@ class YOLODetector:
             
         except Exception as e:
             raise Exception(f"Could not save results: {str(e)}")
+    
+    def render_results(self, input_path, results):
+        """
+        Draw detection results on the input image
+        Args:
+            input_path: Path to input image
+            results: DetectionResult from detect()
+        Returns:
+            numpy.ndarray: Annotated BGR image
+        """
+        return render_image(input_path, results)
         
-    def detect_image(self, image):
-        results = self.model(image)
-        detections = []
+    def detect_image(self, image, profile=LIVE):
+        return self.detect_batch([image], profile)[0]
 
-        for r in results:
-            for box in r.boxes.data.tolist():
-                x1, y1, x2, y2, score, cls_id = box
-                detections.append({
-                "x": x1,
-                "y": y1,
-                "width": x2 - x1,
-                "height": y2 - y1,
-                "confidence": score,
-                "label": self.model.names[int(cls_id)]
-            })
+    def detect_batch(self, images, profile=LIVE):
+        """
+        Perform detection on several in-memory images in one forward pass
+        Args:
+            images: List of PIL images or numpy arrays
+            profile: Inference profile name, the fast live-stream size by default
+        Returns:
+            list: One DetectionResult per input image
+        """
+        results = self._predict(list(images), self.profiles[profile].imgsz)
+        return [self._format_result(r) for r in results]
 
-        return {"detections": detections}
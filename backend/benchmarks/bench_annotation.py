@@ -0,0 +1,116 @@
+"""
+Per-frame Python overhead of turning model output into results and drawing it, at 10/100/500 boxes.
+
+extract: per-box loop with three .cpu().numpy() calls per box (previous _format_result)
+         vs. one boxes.data transfer, array slicing and a class-name table (extract_boxes)
+render:  per-box cv2.getTextSize (previous drawing loops) vs. AnnotationRenderer's per-class cache
+
+The extract rows need torch and ultralytics (boxes are built as ultralytics Boxes
+on the CPU); the render rows only need OpenCV. The model is not run.
+
+Usage (from the backend directory):
+    python benchmarks/bench_annotation.py --boxes 10 100 500
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.annotation import AnnotationRenderer
+from app.utils.detection_result import DetectionResult
+from app.utils.yolo_detector import class_name_table, extract_boxes
+
+NAMES = {0: 'green_bean', 1: 'light_roast', 2: 'medium_roast', 3: 'dark_roast'}
+
+
+def make_boxes(count, width, height, rng):
+    x1 = rng.uniform(0, width - 60, count)
+    y1 = rng.uniform(30, height - 60, count)
+    return np.stack([
+        x1, y1, x1 + rng.uniform(20, 60, count), y1 + rng.uniform(20, 60, count),
+        rng.uniform(0.5, 1.0, count), rng.integers(0, len(NAMES), count)
+    ], axis=1).astype(np.float32)
+
+
+def legacy_extract(result, names):
+    detections = []
+    for box in result.boxes:
+        x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
+        confidence = float(box.conf[0].cpu().numpy())
+        class_id = int(box.cls[0].cpu().numpy())
+        detections.append({
+            'class': names[class_id] if class_id in names else f'class_{class_id}',
+            'confidence': confidence,
+            'bbox': [int(x1), int(y1), int(x2), int(y2)]
+        })
+    return detections
+
+
+def vectorized_extract(result, table):
+    boxes, confidences, class_ids = extract_boxes(result)
+    return DetectionResult(boxes, confidences, class_ids, table[class_ids].tolist()).to_dict()
+
+
+def legacy_render(image, data):
+    for x1, y1, x2, y2, confidence, class_id in data.tolist():
+        x1, y1, x2, y2 = int(x1), int(y1), int(x2), int(y2)
+        label = f"{NAMES[int(class_id)]}: {confidence:.2f}"
+        cv2.rectangle(image, (x1, y1), (x2, y2), (0, 255, 0), 2)
+        label_size = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 2)[0]
+        cv2.rectangle(image, (x1, y1 - label_size[1] - 10), (x1 + label_size[0], y1), (0, 255, 0), -1)
+        cv2.putText(image, label, (x1, y1 - 5), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 0), 2)
+
+
+def timed(function, repeats):
+    function()
+    start = time.perf_counter()
+    for _ in range(repeats):
+        function()
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--boxes', nargs='+', type=int, default=[10, 100, 500])
+    parser.add_argument('--width', type=int, default=1600)
+    parser.add_argument('--height', type=int, default=1200)
+    parser.add_argument('--repeats', type=int, default=50)
+    args = parser.parse_args()
+
+    try:
+        import torch
+        from ultralytics.engine.results import Results
+    except ImportError as e:
+        torch = None
+        print(f"extract rows skipped: {e}")
+
+    rng = np.random.default_rng(0)
+    frame = np.zeros((args.height, args.width, 3), dtype=np.uint8)
+    # Same style as the legacy loop, so only the per-box overhead differs
+    renderer = AnnotationRenderer(colors={}, default_color=(0, 255, 0), text_color=(0, 0, 0),
+                                  font_scale=0.5, box_thickness=2, padding=0, show_total=False)
+    table = class_name_table(NAMES)
+
+    print(f"{'boxes':>6} {'stage':<8} {'before ms':>10} {'after ms':>9} {'speedup':>8}")
+    for count in args.boxes:
+        data = make_boxes(count, args.width, args.height, rng)
+
+        if torch is not None:
+            result = Results(frame, path='bench.jpg', names=NAMES, boxes=torch.from_numpy(data))
+            before = timed(lambda: legacy_extract(result, NAMES), args.repeats)
+            after = timed(lambda: vectorized_extract(result, table), args.repeats)
+            print(f"{count:>6} {'extract':<8} {before:>10.3f} {after:>9.3f} {before / after:>7.1f}x")
+
+        names = table[data[:, 5].astype(np.int64)].tolist()
+        before = timed(lambda: legacy_render(frame, data), args.repeats)
+        after = timed(lambda: renderer.draw(frame, data[:, :4], data[:, 4], names), args.repeats)
+        print(f"{count:>6} {'render':<8} {before:>10.3f} {after:>9.3f} {before / after:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+CPU latency and detection parity of the inference backends YOLODetector can load.
+
+pytorch:        best.pt through ultralytics/torch (reference)
+onnx:           ONNX export run by onnxruntime
+onnx-int8:      ONNX export with dynamically quantized (INT8) weights
+openvino:       OpenVINO IR export
+openvino-int8:  OpenVINO IR quantized with NNCF (needs --int8-data)
+
+Exports are cached next to the weights, so only the first run pays for them.
+Each backend is timed on the same frames after a warm-up; parity compares its
+boxes with the pytorch boxes (same class, IoU >= 0.5).
+
+Usage (from the backend directory):
+    python benchmarks/bench_backends.py --images ../dataset/test/images --backends pytorch onnx openvino
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.model_export import BACKENDS, parity_report
+from app.utils.yolo_detector import YOLODetector
+
+
+def load_images(directory, limit):
+    names = sorted(
+        name for name in os.listdir(directory)
+        if name.lower().endswith(('.jpg', '.jpeg', '.png'))
+    )[:limit]
+    if not names:
+        raise SystemExit(f"No images in {directory}")
+    return [os.path.join(directory, name) for name in names]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default=os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'best.pt'))
+    parser.add_argument('--images', required=True, help='Directory of test images')
+    parser.add_argument('--limit', type=int, default=50)
+    parser.add_argument('--backends', nargs='+', choices=BACKENDS, default=['pytorch', 'onnx', 'openvino'])
+    parser.add_argument('--int8-data', help='Calibration dataset YAML for openvino-int8')
+    parser.add_argument('--warmup', type=int, default=3)
+    args = parser.parse_args()
+
+    paths = load_images(args.images, args.limit)
+    frames = [cv2.imread(path) for path in paths]
+    print(f"{len(frames)} image(s) from {args.images}")
+
+    reference = None
+    print(f"{'backend':<14} {'p50 ms':>8} {'p95 ms':>8} {'recall':>7} {'precision':>9} {'mean IoU':>9} {'max dconf':>9}")
+    for backend in ['pytorch'] + [b for b in args.backends if b != 'pytorch']:
+        detector = YOLODetector(args.model, backend=backend, int8_data=args.int8_data)
+        if not detector.is_model_loaded:
+            print(f"{backend:<14} failed to load")
+            continue
+        if backend != 'pytorch' and detector.loaded_weights == args.model:
+            print(f"{backend:<14} export failed, skipped")
+            continue
+
+        for frame in frames[:args.warmup]:
+            detector.detect_batch([frame])
+        latencies = []
+        for frame in frames:
+            start = time.perf_counter()
+            detector.detect_batch([frame])
+            latencies.append((time.perf_counter() - start) * 1000)
+        latencies.sort()
+        p50 = statistics.median(latencies)
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+
+        results = [detector.detect(path) for path in paths]
+        if reference is None:
+            reference = results
+        if backend not in args.backends:
+            # Only loaded as the parity reference
+            continue
+        report = parity_report(reference, results)
+        mean_iou = f"{report['mean_iou']:.3f}" if report['mean_iou'] is not None else '-'
+        delta = f"{report['max_confidence_delta']:.3f}" if report['max_confidence_delta'] is not None else '-'
+        print(f"{backend:<14} {p50:>8.1f} {p95:>8.1f} {report['recall']:>7.3f} {report['precision']:>9.3f} {mean_iou:>9} {delta:>9}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Throughput / latency benchmark for the micro-batching inference engine.
+
+Simulates several ESP32-CAM units posting frames concurrently and reports
+frames/s next to p50/p99 latency for each max batch size.
+
+Usage (from the backend directory):
+    python benchmarks/bench_batching.py --frames 64 --batch-sizes 1 4 8
+    python benchmarks/bench_batching.py --images /path/to/sample/frames
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.yolo_detector import YOLODetector  # noqa: E402
+from app.utils.batch_engine import BatchInferenceEngine  # noqa: E402
+
+
+def load_frames(image_dir, count, width, height):
+    """Load sample frames from a folder, or generate random VGA-sized frames"""
+    if image_dir:
+        import cv2
+        frames = []
+        for name in sorted(os.listdir(image_dir)):
+            image = cv2.imread(os.path.join(image_dir, name))
+            if image is not None:
+                frames.append(image)
+        if not frames:
+            raise SystemExit(f"No readable images in {image_dir}")
+        return [frames[i % len(frames)] for i in range(count)]
+
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 255, (height, width, 3), dtype=np.uint8) for _ in range(count)]
+
+
+def percentile(values, pct):
+    return float(np.percentile(values, pct)) * 1000 if values else 0.0
+
+
+def run_case(detector, frames, batch_size, window_ms, cameras):
+    engine = BatchInferenceEngine(detector, max_batch_size=batch_size, batch_window=window_ms / 1000)
+    engine.start()
+
+    # Warm up so the first graph build does not land in the measurement
+    engine.detect(frames[0])
+
+    latencies = []
+    lock = threading.Lock()
+    per_camera = [frames[i::cameras] for i in range(cameras)]
+
+    def camera(camera_frames):
+        for frame in camera_frames:
+            start = time.perf_counter()
+            engine.detect(frame)
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+
+    threads = [threading.Thread(target=camera, args=(f,)) for f in per_camera]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall_time = time.perf_counter() - start
+
+    stats = engine.stats()
+    engine.stop()
+
+    return {
+        'batch_size': batch_size,
+        'fps': len(latencies) / wall_time if wall_time else 0,
+        'p50_ms': percentile(latencies, 50),
+        'p99_ms': percentile(latencies, 99),
+        'avg_batch': stats['avg_batch_size']
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default=os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'best.pt'))
+    parser.add_argument('--images', help='Folder with sample frames (default: random 640x480 frames)')
+    parser.add_argument('--frames', type=int, default=64, help='Frames per case')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 4, 8])
+    parser.add_argument('--window-ms', type=float, default=10)
+    parser.add_argument('--cameras', type=int, default=0, help='Concurrent cameras (default: batch size)')
+    parser.add_argument('--width', type=int, default=640)
+    parser.add_argument('--height', type=int, default=480)
+    args = parser.parse_args()
+
+    detector = YOLODetector(args.model)
+    frames = load_frames(args.images, args.frames, args.width, args.height)
+
+    print(f"{'batch':>5} {'frames/s':>10} {'p50 ms':>10} {'p99 ms':>10} {'avg batch':>10}")
+    for batch_size in args.batch_sizes:
+        cameras = args.cameras or batch_size
+        row = run_case(detector, frames, batch_size, args.window_ms, cameras)
+        print(f"{row['batch_size']:>5} {row['fps']:>10.2f} {row['p50_ms']:>10.1f} "
+              f"{row['p99_ms']:>10.1f} {row['avg_batch']:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Per-stage timing of the live-stream frame path: legacy PIL chain vs shared decode.
+
+Legacy: PIL decode -> np.array -> cvtColor -> model(PIL) -> copy -> annotate -> imencode -> base64
+Shared: cv2.imdecode to BGR -> model(ndarray) -> annotate in place -> imencode -> base64
+
+Usage (from the backend directory):
+    python benchmarks/bench_frame_pipeline.py --images /path/to/esp32/frames --repeat 50
+"""
+import argparse
+import base64
+import io
+import os
+import sys
+
+import cv2
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.yolo_detector import YOLODetector  # noqa: E402
+from app.utils.annotation import renderer  # noqa: E402
+from app.utils.frame_pipeline import StageTimer, process_frame  # noqa: E402
+
+
+def load_jpegs(image_dir, width, height):
+    if image_dir:
+        jpegs = []
+        for name in sorted(os.listdir(image_dir)):
+            if name.lower().endswith(('.jpg', '.jpeg')):
+                with open(os.path.join(image_dir, name), 'rb') as f:
+                    jpegs.append(f.read())
+        if not jpegs:
+            raise SystemExit(f"No JPEG files in {image_dir}")
+        return jpegs
+
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    return [cv2.imencode('.jpg', image)[1].tobytes()]
+
+
+def legacy_frame(image_bytes, detector):
+    """The pre-pipeline detect_live_stream chain, stage by stage"""
+    timer = StageTimer()
+
+    with timer.stage('decode'):
+        image = Image.open(io.BytesIO(image_bytes))
+        cv_image = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
+
+    with timer.stage('infer'):
+        results = detector.detect_image(image)
+
+    with timer.stage('annotate'):
+        annotated = cv_image.copy()
+        renderer.draw_result(annotated, results)
+
+    with timer.stage('encode'):
+        _, buffer = cv2.imencode('.jpg', annotated)
+        base64.b64encode(buffer).decode('utf-8')
+
+    return timer.timings
+
+
+def summarize(name, rows):
+    stages = ['decode_ms', 'infer_ms', 'annotate_ms', 'encode_ms']
+    means = {stage: float(np.mean([row[stage] for row in rows])) for stage in stages}
+    total = sum(means.values())
+    print(f"{name:<8} " + ' '.join(f"{means[stage]:>11.2f}" for stage in stages) + f" {total:>11.2f}")
+    return means
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default=os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'best.pt'))
+    parser.add_argument('--images', help='Folder with JPEG frames (default: one random 640x480 frame)')
+    parser.add_argument('--repeat', type=int, default=30)
+    parser.add_argument('--width', type=int, default=640)
+    parser.add_argument('--height', type=int, default=480)
+    args = parser.parse_args()
+
+    detector = YOLODetector(args.model)
+    jpegs = load_jpegs(args.images, args.width, args.height)
+
+    # Warm up both paths
+    legacy_frame(jpegs[0], detector)
+    process_frame(jpegs[0], detector.detect_image)
+
+    legacy_rows, shared_rows = [], []
+    for i in range(args.repeat):
+        image_bytes = jpegs[i % len(jpegs)]
+        legacy_rows.append(legacy_frame(image_bytes, detector))
+        shared_rows.append(process_frame(image_bytes, detector.detect_image)['timings'])
+
+    print(f"{'path':<8} {'decode ms':>11} {'infer ms':>11} {'annotate ms':>11} {'encode ms':>11} {'total ms':>11}")
+    legacy = summarize('legacy', legacy_rows)
+    shared = summarize('shared', shared_rows)
+    print(f"saved per frame: {sum(legacy.values()) - sum(shared.values()):.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
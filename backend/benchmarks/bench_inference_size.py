@@ -0,0 +1,112 @@
+"""
+Accuracy vs. latency of inference sizes and tiled inference on a fixture set.
+
+Each config is IMGSZ or IMGSZ:tile[=TILE_SIZE], e.g. 480 640 1024 1024:tile.
+Tiled configs slice every image into overlapping TILE_SIZE tiles (default
+IMGSZ), run them in batches together with the whole image and merge the boxes
+with NMS; images are tiled regardless of DETECTION_TILE_MIN_PIXELS.
+
+With --labels (YOLO txt files: class cx cy w h, normalized) recall and
+precision are measured against the ground truth at IoU >= 0.5; without
+labels the last config is used as the reference.
+
+Usage (from the backend directory):
+    python benchmarks/bench_inference_size.py --images ../dataset/test/images --labels ../dataset/test/labels --configs 480 640 1024 1024:tile
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.detection_result import DetectionResult
+from app.utils.inference_profiles import InferenceProfile
+from app.utils.model_export import BACKENDS, parity_report
+from app.utils.yolo_detector import YOLODetector
+
+
+def parse_config(config):
+    imgsz, _, tile = config.partition(':')
+    tile_size = 0
+    if tile:
+        _, _, size = tile.partition('=')
+        tile_size = int(size or imgsz)
+    return InferenceProfile(config, imgsz=int(imgsz), tile_size=tile_size, tile_min_pixels=0)
+
+
+def load_labels(label_dir, image_path, class_names):
+    """Ground-truth boxes of one image as a DetectionResult"""
+    name = os.path.splitext(os.path.basename(image_path))[0]
+    label_path = os.path.join(label_dir, f"{name}.txt")
+    height, width = cv2.imread(image_path).shape[:2]
+    boxes, class_ids = [], []
+    if os.path.exists(label_path):
+        with open(label_path) as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) < 5:
+                    continue
+                cx, cy, w, h = (float(v) for v in parts[1:5])
+                class_ids.append(int(parts[0]))
+                boxes.append([(cx - w / 2) * width, (cy - h / 2) * height,
+                              (cx + w / 2) * width, (cy + h / 2) * height])
+    labels = [class_names.get(class_id, f'class_{class_id}') for class_id in class_ids]
+    return DetectionResult(boxes, [1.0] * len(boxes), class_ids, labels)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default=os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'best.pt'))
+    parser.add_argument('--backend', choices=BACKENDS, default='pytorch')
+    parser.add_argument('--images', required=True, help='Directory of fixture images')
+    parser.add_argument('--labels', help='Directory of YOLO label files for the images')
+    parser.add_argument('--limit', type=int, default=50)
+    parser.add_argument('--configs', nargs='+', default=['480', '640', '1024', '1024:tile'])
+    args = parser.parse_args()
+
+    paths = sorted(
+        os.path.join(args.images, name) for name in os.listdir(args.images)
+        if name.lower().endswith(('.jpg', '.jpeg', '.png'))
+    )[:args.limit]
+    if not paths:
+        raise SystemExit(f"No images in {args.images}")
+
+    detector = YOLODetector(args.model, backend=args.backend)
+    if not detector.is_model_loaded:
+        raise SystemExit('Model could not be loaded')
+    profiles = [parse_config(config) for config in args.configs]
+
+    runs = {}
+    for profile in profiles:
+        detector.profiles[profile.name] = profile
+        detector.detect(paths[0], profile=profile.name)  # warm-up at this size
+        latencies, results = [], []
+        for path in paths:
+            start = time.perf_counter()
+            results.append(detector.detect(path, profile=profile.name))
+            latencies.append((time.perf_counter() - start) * 1000)
+        runs[profile.name] = (latencies, results)
+
+    if args.labels:
+        class_names = dict(getattr(detector.model, 'names', None) or detector.class_names)
+        reference = [load_labels(args.labels, path, class_names) for path in paths]
+        print(f"{len(paths)} image(s), ground truth from {args.labels}")
+    else:
+        reference = runs[profiles[-1].name][1]
+        print(f"{len(paths)} image(s), no labels: reference is {profiles[-1].name}")
+
+    print(f"{'config':<14} {'p50 ms':>8} {'max ms':>8} {'boxes':>6} {'recall':>7} {'precision':>9} {'mean IoU':>9}")
+    for profile in profiles:
+        latencies, results = runs[profile.name]
+        report = parity_report(reference, results)
+        mean_iou = f"{report['mean_iou']:.3f}" if report['mean_iou'] is not None else '-'
+        print(f"{profile.name:<14} {statistics.median(latencies):>8.1f} {max(latencies):>8.1f} "
+              f"{report['candidate']:>6} {report['recall']:>7.3f} {report['precision']:>9.3f} {mean_iou:>9}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+"""
+Peak RSS and time to get one uploaded frame decoded, per ingest path.
+
+pil:    file.read() -> io.BytesIO -> PIL -> np.array -> cvtColor (original endpoints)
+read:   file.read() -> cv2.imdecode (bytes copy of the upload)
+buffer: header check -> memoryview of Werkzeug's spooled upload -> np.frombuffer -> cv2.imdecode
+raw:    image/jpeg body read into one buffer, header checked after the first bytes -> cv2.imdecode
+
+Every path runs in a fresh process so ru_maxrss reflects that path alone; the
+request body is built before the baseline is taken. A second, traced run
+reports the peak of Python/numpy allocations, which shows the buffer copies
+that the decoded frame hides in RSS. The model is not run.
+
+Usage (from the backend directory):
+    python benchmarks/bench_ingest.py --width 4000 --height 3000 --modes pil read buffer raw
+"""
+import argparse
+import io
+import multiprocessing
+import os
+import resource
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+MODES = ('pil', 'read', 'buffer', 'raw')
+
+
+def make_jpeg(width, height, quality):
+    rng = np.random.default_rng(0)
+    # Smooth noise compresses like a photo instead of like static
+    small = rng.integers(0, 255, (max(1, height // 16), max(1, width // 16), 3), dtype=np.uint8)
+    image = cv2.resize(small, (width, height), interpolation=cv2.INTER_CUBIC)
+    return cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, quality])[1].tobytes()
+
+
+def build_request(mode, jpeg):
+    from werkzeug.test import EnvironBuilder
+    from werkzeug.wrappers import Request
+
+    if mode == 'raw':
+        builder = EnvironBuilder(method='POST', data=jpeg, content_type='image/jpeg')
+    else:
+        builder = EnvironBuilder(method='POST', data={'image': (io.BytesIO(jpeg), 'frame.jpg')})
+    return Request(builder.get_environ())
+
+
+def ingest(mode, request):
+    from app.utils.frame_pipeline import decode_frame
+    from app.utils.image_ingest import check_image, read_body, upload_buffer
+
+    max_pixels = 100_000_000
+    if mode == 'pil':
+        from PIL import Image
+        image = Image.open(io.BytesIO(request.files['image'].read()))
+        return cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
+    if mode == 'read':
+        return decode_frame(request.files['image'].read())
+    if mode == 'buffer':
+        with upload_buffer(request.files['image']) as buffer:
+            check_image(buffer, max_pixels)
+            return decode_frame(buffer)
+    buffer, _ = read_body(request.stream, request.content_length, 1 << 30, max_pixels)
+    try:
+        return decode_frame(buffer)
+    finally:
+        buffer.release()
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(mode, jpeg, small_jpeg, results):
+    # Warm up imports, allocator arenas and codec tables on a small frame
+    ingest(mode, build_request(mode, small_jpeg))
+
+    request = build_request(mode, jpeg)
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    frame = ingest(mode, request)
+    elapsed = time.perf_counter() - start
+    peak = peak_rss_mb()
+    request.close()
+    del frame
+
+    request = build_request(mode, jpeg)
+    tracemalloc.start()
+    ingest(mode, request)
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    request.close()
+
+    results[mode] = {
+        'peak_delta_mb': peak - baseline,
+        'traced_peak_mb': traced_peak / 1024 / 1024,
+        'ms': elapsed * 1000
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--width', type=int, default=4000)
+    parser.add_argument('--height', type=int, default=3000)
+    parser.add_argument('--quality', type=int, default=95)
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+    args = parser.parse_args()
+
+    jpeg = make_jpeg(args.width, args.height, args.quality)
+    small_jpeg = make_jpeg(64, 48, args.quality)
+    decoded_mb = args.width * args.height * 3 / 1024 / 1024
+    print(f"Frame: {args.width}x{args.height}, {len(jpeg) / 1024 / 1024:.1f} MB JPEG, {decoded_mb:.1f} MB decoded")
+
+    context = multiprocessing.get_context('spawn')
+    with context.Manager() as manager:
+        results = manager.dict()
+        print(f"{'mode':<8} {'peak RSS +MB':>13} {'alloc peak MB':>14} {'ms':>8}")
+        for mode in args.modes:
+            process = context.Process(target=measure, args=(mode, jpeg, small_jpeg, results))
+            process.start()
+            process.join()
+            if mode not in results:
+                print(f"{mode:<8} failed")
+                continue
+            result = results[mode]
+            print(f"{mode:<8} {result['peak_delta_mb']:>13.1f} {result['traced_peak_mb']:>14.1f} {result['ms']:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
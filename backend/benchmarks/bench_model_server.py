@@ -0,0 +1,128 @@
+"""
+Memory and throughput of N worker processes sending camera frames, per model placement.
+
+local:  every worker loads its own YOLODetector (one model copy per web worker)
+server: one model server process holds the model; workers are ModelClients that
+        hand frames over through shared memory (DETECTION_SERVER_ADDRESS)
+
+Each worker sends --frames frames one at a time, as a web worker handling one
+camera does. Reported memory is the sum of the resident set sizes of all
+processes involved (workers, plus the server), measured after the run.
+
+Usage (from the backend directory):
+    python benchmarks/bench_model_server.py --workers 1 2 4 --frames 100
+"""
+import argparse
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.model_export import BACKENDS
+
+
+def rss_mb(pid='self'):
+    with open(f'/proc/{pid}/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def serve(model, backend, address, max_batch_size):
+    from app.utils.detector_service import DetectorService
+    from app.utils.model_server import ModelServer
+
+    service = DetectorService(model, warmup_batch=max_batch_size, backend=backend)
+    ModelServer(service, address, None, max_batch_size=max_batch_size).serve_forever()
+
+
+def worker(mode, model, backend, address, frames, width, height, barrier, results):
+    if mode == 'server':
+        from app.utils.model_server import ModelClient
+        detector = ModelClient(address, None)
+    else:
+        from app.utils.yolo_detector import YOLODetector
+        detector = YOLODetector(model, backend=backend)
+
+    frame = np.random.default_rng(os.getpid()).integers(0, 255, (height, width, 3), dtype=np.uint8)
+    detector.detect_image(frame)  # warm-up
+    barrier.wait()
+
+    latencies = []
+    for _ in range(frames):
+        start = time.perf_counter()
+        detector.detect_image(frame)
+        latencies.append((time.perf_counter() - start) * 1000)
+    results.put((latencies, rss_mb()))
+    barrier.wait()  # stay alive until every worker has reported
+
+
+def run(mode, args, count):
+    context = multiprocessing.get_context('spawn')
+    address = os.path.join(tempfile.mkdtemp(), 'model.sock')
+    server = None
+    if mode == 'server':
+        server = context.Process(target=serve, args=(args.model, args.backend, address, args.max_batch_size), daemon=True)
+        server.start()
+
+    barrier = context.Barrier(count + 1)
+    results = context.Queue()
+    workers = [
+        context.Process(target=worker, args=(mode, args.model, args.backend, address, args.frames,
+                                             args.width, args.height, barrier, results))
+        for _ in range(count)
+    ]
+    for process in workers:
+        process.start()
+
+    barrier.wait(timeout=600)
+    start = time.perf_counter()
+    reports = [results.get(timeout=600) for _ in workers]
+    elapsed = time.perf_counter() - start
+    server_rss = rss_mb(server.pid) if server is not None else 0.0
+    barrier.wait(timeout=60)
+
+    for process in workers:
+        process.join()
+    if server is not None:
+        server.terminate()
+        server.join()
+
+    latencies = sorted(latency for report, _ in reports for latency in report)
+    return {
+        'fps': len(latencies) / elapsed,
+        'p50': statistics.median(latencies),
+        'p99': latencies[int(len(latencies) * 0.99) - 1],
+        'rss': sum(rss for _, rss in reports) + server_rss
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default=os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'best.pt'))
+    parser.add_argument('--backend', choices=BACKENDS, default='pytorch')
+    parser.add_argument('--workers', nargs='+', type=int, default=[1, 2, 4])
+    parser.add_argument('--modes', nargs='+', choices=('local', 'server'), default=['local', 'server'])
+    parser.add_argument('--frames', type=int, default=100, help='Frames per worker')
+    parser.add_argument('--width', type=int, default=800)
+    parser.add_argument('--height', type=int, default=600)
+    parser.add_argument('--max-batch-size', type=int, default=8, help='Model server batch size')
+    args = parser.parse_args()
+
+    print(f"{'workers':>7} {'mode':<7} {'frames/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'total RSS MB':>13}")
+    for count in args.workers:
+        for mode in args.modes:
+            report = run(mode, args, count)
+            print(f"{count:>7} {mode:<7} {report['fps']:>9.1f} {report['p50']:>8.1f} "
+                  f"{report['p99']:>8.1f} {report['rss']:>13.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Import time and first-request latency of the detection service.
+
+eager:  model loaded while the blueprint is imported, no warm-up (previous behaviour)
+lazy:   nothing loaded at import; the first /api/live-stream request loads and warms up the model
+ready:  nothing loaded at import; a readiness probe (/api/ready) warms the model before the first frame
+
+Each mode runs in a fresh interpreter so import caches do not carry over.
+
+Usage (from the backend directory):
+    python benchmarks/bench_startup.py --modes eager lazy ready
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODES = ('eager', 'lazy', 'ready')
+
+
+def child(mode, width, height):
+    start = time.perf_counter()
+    if mode == 'eager':
+        os.environ['DETECTION_WARMUP_RUNS'] = '0'
+    sys.path.insert(0, BACKEND_DIR)
+    from app import create_app
+    from app.api import detection as detection_api
+    if mode == 'eager':
+        detection_api.get_detector()
+    app = create_app()
+    import_time = time.perf_counter() - start
+    torch_imported = 'torch' in sys.modules or 'ultralytics' in sys.modules
+
+    import cv2
+    import numpy as np
+    frame = cv2.imencode('.jpg', np.random.default_rng(0).integers(0, 255, (height, width, 3), dtype=np.uint8))[1]
+    client = app.test_client()
+
+    ready_time = None
+    if mode == 'ready':
+        start = time.perf_counter()
+        while client.get('/api/ready').status_code != 200:
+            time.sleep(0.05)
+        ready_time = time.perf_counter() - start
+
+    latencies = []
+    for _ in range(3):
+        start = time.perf_counter()
+        response = client.post('/api/live-stream', data=frame.tobytes(), content_type='image/jpeg')
+        latencies.append(time.perf_counter() - start)
+        if response.status_code != 200:
+            raise SystemExit(f"Request failed: {response.status_code} {response.get_data(as_text=True)}")
+
+    print(json.dumps({
+        'import_s': import_time,
+        'torch_at_import': torch_imported,
+        'ready_s': ready_time,
+        'first_ms': latencies[0] * 1000,
+        'next_ms': min(latencies[1:]) * 1000
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+    parser.add_argument('--width', type=int, default=800)
+    parser.add_argument('--height', type=int, default=600)
+    parser.add_argument('--child', choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.width, args.height)
+        return
+
+    print(f"{'mode':<6} {'import+app s':>12} {'torch at import':>16} {'probe s':>8} {'1st req ms':>11} {'next ms':>8}")
+    for mode in args.modes:
+        env = dict(os.environ)
+        env['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+        env['DETECTION_JOB_WORKERS'] = '0'
+        env['LIVE_STREAM_CHANGE_THRESHOLD'] = '0'
+        completed = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--child', mode,
+             '--width', str(args.width), '--height', str(args.height)],
+            cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+        )
+        lines = [line for line in completed.stdout.splitlines() if line.startswith('{')]
+        if completed.returncode != 0 or not lines:
+            print(f"{mode:<6} failed: {completed.stderr.strip().splitlines()[-1:] or completed.stdout[-200:]}")
+            continue
+        r = json.loads(lines[-1])
+        probe = f"{r['ready_s']:.2f}" if r['ready_s'] is not None else '-'
+        print(f"{mode:<6} {r['import_s']:>12.2f} {str(r['torch_at_import']):>16} {probe:>8} "
+              f"{r['first_ms']:>11.1f} {r['next_ms']:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -59,7 +59,11 @@ httpd_handle_t stream_httpd = NULL;
 // 👈 Global variables for detection
 bool detection_enabled = false;
 unsigned long last_detection_time = 0;
-const unsigned long detection_interval = 2000; // 2 seconds between detections
+const unsigned long default_detection_interval = 2000; // 2 seconds between detections while the backend sends no hint
+// X-Target-FPS can slow the camera down but not below the default rate; lower this to let the backend speed it up
+const unsigned long min_detection_interval = 2000;
+const unsigned long max_detection_interval = 10000;
+unsigned long detection_interval = default_detection_interval;
 
 // 👈 NEW: Send frame to backend for detection
 bool sendFrameToBackend(camera_fb_t* fb) {
@@ -92,9 +96,26 @@ bool sendFrameToBackend(camera_fb_t* fb) {
     
     int total_length = multipart.length() + fb->len + footer.length();
     
+    // Backend pacing hints (backpressure)
+    const char* headerKeys[] = {"X-Target-FPS", "Retry-After"};
+    http.collectHeaders(headerKeys, 2);
+    
     int httpResponseCode = http.POST(buffer, total_length);
     free(buffer);
     
+    detection_interval = default_detection_interval;
+    if (http.hasHeader("X-Target-FPS")) {
+        float target_fps = http.header("X-Target-FPS").toFloat();
+        if (target_fps > 0) {
+            detection_interval = constrain((unsigned long)(1000.0 / target_fps), min_detection_interval, max_detection_interval);
+        }
+    }
+    if (httpResponseCode == 429 && http.hasHeader("Retry-After")) {
+        // Frame was dropped by the backend: back off before sending the next one
+        unsigned long retry_ms = http.header("Retry-After").toInt() * 1000UL;
+        detection_interval = constrain(retry_ms, min_detection_interval, max_detection_interval);
+    }
+    
     if (httpResponseCode > 0) {
         String response = http.getString();
         Serial.printf("Backend response: %d, %s\n", httpResponseCode, response.c_str());
@@ -72,7 +72,7 @@ const PredictionPage = () => {
 
     if (detectionEnabled) {
       setStreamUrl(apiService.getRaspiDetectionStreamUrl(raspiIP));
-      setProcessedImageUrl(apiService.getProcessedImageUrl());
+      setProcessedImageUrl(apiService.getProcessedStreamUrl());
     } else {
       setStreamUrl(apiService.getRaspiStreamUrl(raspiIP));
       setProcessedImageUrl("");
@@ -100,7 +100,7 @@ const PredictionPage = () => {
         await apiService.enableRaspiDetection(raspiIP);
         setDetectionEnabled(true);
         setStreamUrl(apiService.getRaspiDetectionStreamUrl(raspiIP));
-        setProcessedImageUrl(apiService.getProcessedImageUrl());
+        setProcessedImageUrl(apiService.getProcessedStreamUrl());
         console.log("Live detection enabled");
       } else {
         await apiService.disableRaspiDetection(raspiIP);
@@ -115,26 +115,6 @@ const PredictionPage = () => {
     }
   };
 
-  // Fetch latest detection results
-  const fetchLatestDetection = async () => {
-    if (!detectionEnabled) return;
-
-    try {
-      const response = await apiService.getLatestDetection();
-      if (response.success) {
-        setLiveDetections(response.detections || []);
-        setLastDetectionTime(new Date(response.timestamp * 1000));
-
-        // Update processed image URL with timestamp to force refresh
-        setProcessedImageUrl(
-          `${apiService.getProcessedImageUrl()}?t=${Date.now()}`
-        );
-      }
-    } catch (error) {
-      console.error("Failed to fetch latest detection:", error);
-    }
-  };
-
   // Enhanced capture with multiple strategies for Raspberry Pi
   const handleSaveCaptureRaspi = async () => {
     if (!raspiConnected || !isRealTimeMode) {
@@ -217,7 +197,11 @@ const PredictionPage = () => {
     // Draw bounding boxes if any
     if (liveDetections.length > 0) {
       liveDetections.forEach((detection) => {
-        const { x, y, width, height, label, confidence } = detection;
+        const { bbox, label, confidence } = detection;
+        // bbox: [x1, y1, x2, y2] dalam piksel gambar
+        const [x, y] = bbox;
+        const width = bbox[2] - bbox[0];
+        const height = bbox[3] - bbox[1];
 
         // Draw bounding box
         ctx.strokeStyle = "#00ff00";
@@ -414,10 +398,10 @@ const PredictionPage = () => {
             key={index}
             className="absolute border-2 border-green-400"
             style={{
-              left: `${detection.x}px`,
-              top: `${detection.y}px`,
-              width: `${detection.width}px`,
-              height: `${detection.height}px`,
+              left: `${detection.bbox[0]}px`,
+              top: `${detection.bbox[1]}px`,
+              width: `${detection.bbox[2] - detection.bbox[0]}px`,
+              height: `${detection.bbox[3] - detection.bbox[1]}px`,
             }}>
             <div className="absolute -top-6 left-0 bg-green-400 text-white px-2 py-1 text-xs rounded">
               {detection.label}: {Math.round(detection.confidence * 100)}%
@@ -447,15 +431,20 @@ const PredictionPage = () => {
     };
   }, []);
 
-  // Fetch detection results periodically when live detection is enabled
+  // Terima hasil deteksi lewat SSE selama live detection aktif
+  // (gambar beranotasi datang dari MJPEG stream, bukan polling)
   useEffect(() => {
     if (!detectionEnabled) return;
 
-    const interval = setInterval(() => {
-      fetchLatestDetection();
-    }, 2000); // Fetch every 2 seconds
+    const unsubscribe = apiService.subscribeLiveDetections(
+      (data) => {
+        setLiveDetections(data.detections || []);
+        setLastDetectionTime(new Date(data.timestamp * 1000));
+      },
+      (error) => console.error("Live detection stream error:", error)
+    );
 
-    return () => clearInterval(interval);
+    return unsubscribe;
   }, [detectionEnabled]);
 
   // Loading overlay
@@ -680,7 +669,7 @@ const PredictionPage = () => {
                     <div className="relative">
                       <img
                         ref={imgRef}
-                        src={streamUrl}
+                        src={processedImageUrl || streamUrl}
                         alt="Raspberry Pi Stream"
                         className="w-full h-auto min-h-[450px] max-h-[600px] object-cover bg-coffee-dark"
                         style={{ aspectRatio: "16/9" }}
@@ -696,8 +685,10 @@ const PredictionPage = () => {
                         }}
                       />
 
-                      {/* Bounding boxes overlay */}
-                      {isRealTimeMode && renderBoundingBoxes()}
+                      {/* Bounding boxes overlay (MJPEG dari backend sudah beranotasi) */}
+                      {isRealTimeMode &&
+                        !processedImageUrl &&
+                        renderBoundingBoxes()}
 
                       {/* Detection status overlay */}
                       {detectionEnabled && (
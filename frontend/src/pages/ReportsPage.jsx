@@ -897,10 +897,19 @@ const ReportsPage = () => {
                     <img
                       src={
                         detection.result_path
-                          ? apiService.getResultImageUrl(detection.id)
-                          : apiService.getOriginalImageUrl(detection.id)
+                          ? apiService.getResultImageUrl(
+                              detection.id,
+                              "thumb",
+                              detection.result_path
+                            )
+                          : apiService.getOriginalImageUrl(
+                              detection.id,
+                              "thumb",
+                              detection.original_path
+                            )
                       }
                       alt={detection.filename}
+                      loading="lazy"
                       className="w-full h-full object-cover"
                       onError={(e) => {
                         e.target.src = "/placeholder-image.jpg";
@@ -1158,7 +1167,11 @@ const ReportsPage = () => {
                     </Button>
                   </div>
                   <img
-                    src={apiService.getOriginalImageUrl(selectedDetection.id)}
+                    src={apiService.getOriginalImageUrl(
+                      selectedDetection.id,
+                      "medium",
+                      selectedDetection.original_path
+                    )}
                     alt="Gambar Asli"
                     className="w-full rounded-lg border border-coffee-cream shadow-coffee"
                     onError={(e) => {
@@ -1208,7 +1221,11 @@ const ReportsPage = () => {
                       </div>
                     </div>
                     <img
-                      src={apiService.getResultImageUrl(selectedDetection.id)}
+                      src={apiService.getResultImageUrl(
+                        selectedDetection.id,
+                        "medium",
+                        selectedDetection.result_path
+                      )}
                       alt="Hasil Deteksi"
                       className="w-full rounded-lg border border-coffee-cream shadow-coffee"
                       onError={(e) => {
@@ -70,7 +70,31 @@ class ApiService {
       method: "POST",
     });
 
-    return this.handleResponse(response);
+    const data = await this.handleResponse(response);
+
+    // Detection berjalan di background (202), tunggu sampai selesai
+    if (response.status === 202) {
+      return this.waitForDetection(detectionId);
+    }
+
+    return data;
+  }
+
+  // Long-poll status job deteksi sampai completed/failed
+  async waitForDetection(detectionId, waitSeconds = 25) {
+    for (;;) {
+      const response = await fetch(
+        `${API_BASE_URL}/detect/${detectionId}/status?wait=${waitSeconds}`
+      );
+      const data = await this.handleResponse(response);
+
+      if (data.status === "failed") {
+        throw new Error("Detection failed.");
+      }
+      if (data.done) {
+        return data;
+      }
+    }
   }
 
   // Get all detections
@@ -94,12 +118,23 @@ class ApiService {
   }
 
   // Get image URLs
-  getOriginalImageUrl(detectionId) {
-    return `${API_BASE_URL}/detection/${detectionId}/image`;
+  // size: "thumb" / "medium" untuk versi kecil; path: original_path / result_path
+  // dari detection, menjadi versi URL sehingga browser boleh cache selamanya
+  getOriginalImageUrl(detectionId, size = null, path = null) {
+    return this.imageUrl(`${API_BASE_URL}/detection/${detectionId}/image`, size, path);
   }
 
-  getResultImageUrl(detectionId) {
-    return `${API_BASE_URL}/detection/${detectionId}/result`;
+  getResultImageUrl(detectionId, size = null, path = null) {
+    return this.imageUrl(`${API_BASE_URL}/detection/${detectionId}/result`, size, path);
+  }
+
+  imageUrl(url, size, path) {
+    const params = new URLSearchParams();
+    if (size) params.set("size", size);
+    // Gambar disimpan dengan nama hash isinya: ab/cd/<sha256>.jpg
+    if (path) params.set("v", path.split("/").pop().split(".")[0]);
+    const query = params.toString();
+    return query ? `${url}?${query}` : url;
   }
 
   // Health check
@@ -123,7 +158,7 @@ class ApiService {
 
       return {
         success: true,
-        boxes: data.boxes || [],
+        detections: data.detections || [],
       };
     } catch (error) {
       console.error("Detection error:", error);
@@ -142,6 +177,26 @@ class ApiService {
     return `${API_BASE_URL}/live-stream/processed-image?t=${Date.now()}`;
   }
 
+  // MJPEG stream berisi frame hasil deteksi (dipakai langsung di <img>)
+  getProcessedStreamUrl() {
+    return `${API_BASE_URL}/live-stream/mjpeg`;
+  }
+
+  // Subscribe metadata deteksi live-stream lewat Server-Sent Events
+  subscribeLiveDetections(onDetection, onError) {
+    const source = new EventSource(`${API_BASE_URL}/live-stream/events`);
+
+    source.addEventListener("detection", (event) => {
+      onDetection(JSON.parse(event.data));
+    });
+    if (onError) {
+      source.onerror = onError;
+    }
+
+    // Panggil fungsi ini untuk menutup koneksi
+    return () => source.close();
+  }
+
   // Raspberry Pi specific endpoints
   async checkRaspiStatus(raspiIP) {
     try {